@@ -0,0 +1,99 @@
+# Opóźnienia pod naporem czytelników: bezpośrednie wywołania menedżerów w pętli
+# asyncio vs AsyncLibrary. Uruchomienie z katalogu projekt/:
+#   python -m benchmarks.bench_async [liczba_książek] [liczba_czytelników]
+import asyncio
+import sys
+import time
+
+from src.async_library import AsyncLibrary
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.user_manager import UserManager
+
+QUERIES = ("ta", "książk", "Autor 1", "Tytuł 99")
+
+
+def open_managers(book_count, patrons):
+    books = BookManager(thread_safe=True)
+    users = UserManager(thread_safe=True)
+    loans = LoanManager(books, users, thread_safe=True)
+    for i in range(book_count):
+        books.add_book(f"Tytuł książki {i}", f"Autor {i % 500}", "9788328704442")
+    for i in range(patrons):
+        users.add_user(f"Czytelnik {i}", f"czytelnik{i}@example.com")
+    return books, users, loans
+
+
+class DirectLibrary:
+    # wywołania synchroniczne wprost w pętli zdarzeń - punkt odniesienia
+    def __init__(self, books, loans):
+        self.books = books
+        self.loans = loans
+
+    async def find_books_by_title(self, title):
+        return self.books.find_books_by_title(title)
+
+    async def get_book(self, book_id):
+        return self.books.get_book(book_id)
+
+    async def loan_book(self, user_id, book_id):
+        return self.loans.loan_book(user_id, book_id)
+
+    async def return_book(self, loan_id):
+        return self.loans.return_book(loan_id)
+
+
+async def burst(library, patrons):
+    latencies = []
+
+    async def patron(index):
+        # czas obsługi czytelnika od początku naporu: wyszukanie, podgląd, wypożyczenie, zwrot
+        await library.find_books_by_title(QUERIES[index % len(QUERIES)])
+        await library.get_book(index + 1)
+        loan_id = await library.loan_book(index + 1, index + 1)
+        await library.return_book(loan_id)
+        latencies.append(time.perf_counter() - start)
+
+    lag = []
+    stop = False
+
+    async def ticker():
+        # spóźnienie pętli zdarzeń względem planowanego wybudzenia
+        while not stop:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag.append(time.perf_counter() - start - 0.001)
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(patron(i) for i in range(patrons)))
+    stop = True
+    await ticking
+    return latencies, lag
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+async def main():
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    patrons = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    books, users, loans = open_managers(book_count, patrons)
+    books.find_books_by_title("rozgrzewka")  # zbudowanie indeksów przed pomiarem
+
+    print(f"{book_count} książek, {patrons} czytelników naraz")
+    print(f"  {'':<14} {'obsługa p50':>12} {'p99':>10} {'opóźnienie pętli p99':>21}")
+    for name, library in (("bezpośrednio", DirectLibrary(books, loans)),
+                          ("AsyncLibrary", AsyncLibrary(books, users, loans))):
+        latencies, lag = await burst(library, patrons)
+        print(f"  {name:<14} {percentile(latencies, 0.5):9.1f} ms {percentile(latencies, 0.99):7.1f} ms"
+              f" {percentile(lag, 0.99):18.1f} ms")
+        if isinstance(library, AsyncLibrary):
+            await library.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+# Pamięć zajmowana przez rekordy książek i użytkowników: słowniki vs ColumnarTable.
+# Uruchomienie z katalogu projekt/: python -m benchmarks.bench_memory [liczba_rekordów]
+import gc
+import sys
+import tracemalloc
+
+from src.columnar_storage import columnar_books, columnar_users
+
+
+def fill_books(table, count):
+    for book_id in range(1, count + 1):
+        book = {"title": f"Tytuł książki {book_id}", "author": f"Autor {book_id % 5000}",
+                "isbn": f"978{book_id:010d}", "available": book_id % 7 != 0}
+        if book_id % 4:
+            book["year"] = 1900 + book_id % 120
+        table[book_id] = book
+
+
+def fill_users(table, count):
+    for user_id in range(1, count + 1):
+        table[user_id] = {"name": f"Czytelnik {user_id}", "email": f"czytelnik{user_id}@example.com"}
+
+
+def measure(fill, factory, count):
+    gc.collect()
+    tracemalloc.start()
+    table = factory()
+    fill(table, count)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del table
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print(f"{count} rekordów")
+    for name, fill, factory in (("książki", fill_books, columnar_books),
+                                ("użytkownicy", fill_users, columnar_users)):
+        plain = measure(fill, dict, count)
+        columnar = measure(fill, factory, count)
+        print(f"  {name:<12} słowniki {plain / 2 ** 20:8.1f} MiB ({plain / count:5.0f} B/rekord)   "
+              f"kolumny {columnar / 2 ** 20:8.1f} MiB ({columnar / count:5.0f} B/rekord)   "
+              f"oszczędność {1 - columnar / plain:5.1%}")
+
+
+if __name__ == "__main__":
+    main()
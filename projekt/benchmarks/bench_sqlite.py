@@ -0,0 +1,76 @@
+# Porównanie magazynu SQLite ze słownikami w pamięci.
+# Uruchomienie z katalogu projekt/: python -m benchmarks.bench_sqlite [liczba_książek]
+import os
+import sys
+import tempfile
+import time
+
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.sqlite_storage import SqliteBackend
+from src.user_manager import UserManager
+
+
+def measure(label, count, function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f} s  {count / elapsed:12,.0f} op/s")
+
+
+def run(name, books, users, loans, count, batch):
+    print(name)
+
+    def add_books():
+        with batch():
+            for i in range(count):
+                books.add_book(f"Tytuł {i}", f"Autor {i % 1000}", "9788328704442")
+
+    def add_users():
+        with batch():
+            for i in range(count // 10):
+                users.add_user(f"Czytelnik {i}", f"czytelnik{i}@example.com")
+
+    def get_books():
+        for book_id in range(1, count + 1):
+            books.get_book(book_id)
+
+    def loan_and_return():
+        with batch():
+            for book_id in range(1, count // 10 + 1):
+                loan_id = loans.loan_book(book_id, book_id)
+                loans.return_book(loan_id)
+
+    measure("add_book (w partii)", count, add_books)
+    measure("add_user (w partii)", count // 10, add_users)
+    measure("get_book", count, get_books)
+    measure("loan_book + return_book", count // 10, loan_and_return)
+    measure("get_user_active_loans", count // 10,
+            lambda: [loans.get_user_active_loans(user_id) for user_id in range(1, count // 10 + 1)])
+
+
+class NoBatch:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    books = BookManager()
+    users = UserManager()
+    run(f"słowniki w pamięci ({count} książek)", books, users, LoanManager(books, users), count, NoBatch)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SqliteBackend(os.path.join(directory, "library.db")) as backend:
+            books = BookManager(storage=backend.table("books"))
+            users = UserManager(storage=backend.table("users"))
+            loans = LoanManager(books, users, storage=backend.table("loans"))
+            run(f"SQLite, WAL ({count} książek)", books, users, loans, count, backend.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+# Czas każdej publicznej metody menedżerów na syntetycznych bibliotekach różnej
+# wielkości, z porównaniem do zapisanego wzorca. Uruchomienie z katalogu projekt/:
+#   python -m benchmarks.bench_suite [--scales 1000,100000,1000000] [--output wyniki.json]
+#       [--baseline benchmarks/baseline.json] [--threshold 0.5] [--save-baseline]
+# Kod wyjścia 1 oznacza regresję: metoda wolniejsza od wzorca o więcej niż threshold.
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.library_generator import CATEGORIES, LAST_NAMES, TITLE_WORDS, SyntheticLibrary
+
+DEFAULT_SCALES = (1000, 100000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def distinct(sample, seen):
+    # kolejne argumenty w jednej serii pomiarów nie mogą się powtarzać (np. dwa
+    # wypożyczenia tej samej książki); None kończy serię, gdy nie ma już kandydatów
+    for _ in range(1000):
+        value = sample()
+        if value is not None and value not in seen:
+            seen.add(value)
+            return value
+    return None
+
+
+def existing(sample, records):
+    key = sample()
+    return key if key in records else None
+
+
+def pop_random(lib, items):
+    if not items:
+        return None
+    index = lib.rng.randrange(len(items))
+    items[index], items[-1] = items[-1], items[index]
+    return items.pop()
+
+
+def reservation_with_status(lib, status):
+    def sample():
+        reservation_id = lib.rng.randrange(1, lib.reservations.next_id)
+        reservation = lib.reservations.reservations.get(reservation_id)
+        return reservation_id if reservation is not None and reservation["status"] == status else None
+    return sample
+
+
+def unavailable_pair(lib):
+    # rezerwacja ma sens tylko dla wypożyczonej książki
+    if not lib.active_loans:
+        return None
+    user_id = lib.user()
+    book_id = lib.loans.get_loan(lib.rng.choice(lib.active_loans))["book_id"]
+    if (user_id, book_id) in lib.reservations.active_reservations:
+        return None
+    return user_id, book_id
+
+
+def new_book(lib):
+    return next(lib.book_records(1))
+
+
+def category_query(lib):
+    first, second = lib.category(), lib.category()
+    return f'"{first}" AND NOT "{second}"' if first != second else f'"{first}" OR Horror'
+
+
+# (nazwa, przygotowanie argumentów jednej serii, wywołanie); przygotowanie dostaje
+# bibliotekę i zbiór użytych w serii wartości, zwraca krotkę argumentów albo None.
+# Kolejność: odczyty, zapisy, na końcu usuwanie.
+CASES = (
+    ("BookManager.get_book", lambda lib, seen: (lib.book(),),
+     lambda lib, book_id: lib.books.get_book(book_id)),
+    ("BookManager.get_book_by_isbn", lambda lib, seen: (lib.books.books[lib.book()]["isbn"],),
+     lambda lib, isbn: lib.books.get_book_by_isbn(isbn)),
+    ("BookManager.find_books_by_title", lambda lib, seen: (lib.rng.choice(TITLE_WORDS),),
+     lambda lib, title: lib.books.find_books_by_title(title)),
+    ("BookManager.find_books_by_title(words)", lambda lib, seen: (lib.rng.choice(TITLE_WORDS),),
+     lambda lib, title: lib.books.find_books_by_title(title, "words")),
+    ("BookManager.find_books_by_author", lambda lib, seen: (lib.author(),),
+     lambda lib, author: lib.books.find_books_by_author(author)),
+    ("BookManager.get_books_by_author", lambda lib, seen: (lib.author(),),
+     lambda lib, author: lib.books.get_books_by_author(author)),
+    ("BookManager.list_books", lambda lib, seen: (),
+     lambda lib: lib.books.list_books()),
+    ("BookManager.list_books_page", lambda lib, seen: (lib.rng.randrange(lib.books.next_id),),
+     lambda lib, cursor: lib.books.list_books_page(50, cursor)),
+    ("UserManager.get_user", lambda lib, seen: (lib.user(),),
+     lambda lib, user_id: lib.users.get_user(user_id)),
+    ("UserManager.get_user_by_email", lambda lib, seen: (lib.users.users[lib.user()]["email"],),
+     lambda lib, email: lib.users.get_user_by_email(email)),
+    ("UserManager.find_users_by_name", lambda lib, seen: (lib.rng.choice(LAST_NAMES),),
+     lambda lib, name: lib.users.find_users_by_name(name)),
+    ("UserManager.list_users", lambda lib, seen: (),
+     lambda lib: lib.users.list_users()),
+    ("UserManager.list_users_page", lambda lib, seen: (lib.rng.randrange(lib.users.next_id),),
+     lambda lib, cursor: lib.users.list_users_page(50, cursor)),
+    ("LoanManager.get_loan", lambda lib, seen: (lib.rng.randrange(1, lib.loans.next_id),),
+     lambda lib, loan_id: lib.loans.get_loan(loan_id)),
+    ("LoanManager.get_user_active_loans", lambda lib, seen: (lib.user(),),
+     lambda lib, user_id: lib.loans.get_user_active_loans(user_id)),
+    ("LoanManager.get_book_active_loan", lambda lib, seen: (lib.book(),),
+     lambda lib, book_id: lib.loans.get_book_active_loan(book_id)),
+    ("LoanManager.get_user_loan_history", lambda lib, seen: (lib.user(),),
+     lambda lib, user_id: lib.loans.get_user_loan_history(user_id)),
+    ("LoanManager.list_loans", lambda lib, seen: (),
+     lambda lib: lib.loans.list_loans()),
+    ("LoanManager.list_loans_page(active)", lambda lib, seen: (lib.rng.randrange(lib.loans.next_id),),
+     lambda lib, cursor: lib.loans.list_loans_page(50, cursor, active=True)),
+    ("LoanManager.count_active_loans", lambda lib, seen: (),
+     lambda lib: lib.loans.count_active_loans()),
+    ("ReservationManager.get_reservation",
+     lambda lib, seen: (lib.rng.randrange(1, lib.reservations.next_id),),
+     lambda lib, reservation_id: lib.reservations.get_reservation(reservation_id)),
+    ("ReservationManager.list_reservations", lambda lib, seen: (),
+     lambda lib: lib.reservations.list_reservations()),
+    ("ReservationManager.list_reservations(waiting)", lambda lib, seen: (),
+     lambda lib: lib.reservations.list_reservations("waiting")),
+    ("ReservationManager.list_reservations_page",
+     lambda lib, seen: (lib.rng.randrange(lib.reservations.next_id),),
+     lambda lib, cursor: lib.reservations.list_reservations_page(50, cursor)),
+    ("ReservationManager.get_user_reservations", lambda lib, seen: (lib.user(),),
+     lambda lib, user_id: lib.reservations.get_user_reservations(user_id)),
+    ("ReservationManager.get_book_reservations", lambda lib, seen: (lib.book(),),
+     lambda lib, book_id: lib.reservations.get_book_reservations(book_id)),
+    ("ReservationManager.get_position_in_queue",
+     lambda lib, seen: (lib.rng.randrange(1, lib.reservations.next_id),),
+     lambda lib, reservation_id: lib.reservations.get_position_in_queue(reservation_id)),
+    ("ReservationManager.next_expiry", lambda lib, seen: (),
+     lambda lib: lib.reservations.next_expiry()),
+    ("CategoryManager.get_all_categories", lambda lib, seen: (),
+     lambda lib: lib.categories.get_all_categories()),
+    ("CategoryManager.get_books_by_category", lambda lib, seen: (lib.category(),),
+     lambda lib, category: lib.categories.get_books_by_category(category)),
+    ("CategoryManager.query_books", lambda lib, seen: (category_query(lib),),
+     lambda lib, expression: lib.categories.query_books(expression)),
+
+    ("BookManager.add_book", lambda lib, seen: (new_book(lib),),
+     lambda lib, record: lib.books.add_book(record["title"], record["author"], record["isbn"], record["year"])),
+    ("BookManager.bulk_add_books(1000)", lambda lib, seen: (list(lib.book_records(1000)),),
+     lambda lib, records: lib.books.bulk_add_books(records)),
+    ("BookManager.update_book", lambda lib, seen: (lib.book(), lib.rng.randint(1800, 2025)),
+     lambda lib, book_id, year: lib.books.update_book(book_id, new_year=year)),
+    ("BookManager.set_available", lambda lib, seen: (lib.book(),),
+     lambda lib, book_id: lib.books.set_available(book_id, lib.books.books[book_id]["available"])),
+    ("UserManager.add_user", lambda lib, seen: (next(lib.user_records(1)),),
+     lambda lib, record: lib.users.add_user(record["name"], record["email"])),
+    ("UserManager.bulk_add_users(1000)", lambda lib, seen: (list(lib.user_records(1000)),),
+     lambda lib, records: lib.users.bulk_add_users(records)),
+    ("UserManager.update_user", lambda lib, seen: (lib.user(), lib.rng.choice(LAST_NAMES)),
+     lambda lib, user_id, name: lib.users.update_user(user_id, new_name=f"Jan {name}")),
+    ("LoanManager.loan_book", lambda lib, seen: (lib.user(), distinct(lib.available_book, seen)),
+     lambda lib, user_id, book_id: lib.active_loans.append(lib.loans.loan_book(user_id, book_id))),
+    ("ReservationManager.reserve_book", lambda lib, seen: (distinct(lambda: unavailable_pair(lib), seen),),
+     lambda lib, pair: lib.reservations.reserve_book(*pair)),
+    ("LoanManager.return_book", lambda lib, seen: (pop_random(lib, lib.active_loans),),
+     lambda lib, loan_id: lib.loans.return_book(loan_id)),
+    ("ReservationManager.book_returned", lambda lib, seen: (lib.book(),),
+     lambda lib, book_id: lib.reservations.book_returned(book_id)),
+    ("ReservationManager.cancel_reservation",
+     lambda lib, seen: (distinct(reservation_with_status(lib, "waiting"), seen),),
+     lambda lib, reservation_id: lib.reservations.cancel_reservation(reservation_id)),
+    ("ReservationManager.set_expiry_date",
+     lambda lib, seen: (distinct(reservation_with_status(lib, "ready"), seen), datetime.now() + timedelta(days=7)),
+     lambda lib, reservation_id, expiry_date: lib.reservations.set_expiry_date(reservation_id, expiry_date)),
+    ("ReservationManager.complete_reservation",
+     lambda lib, seen: (distinct(reservation_with_status(lib, "ready"), seen),),
+     lambda lib, reservation_id: lib.reservations.complete_reservation(reservation_id)),
+    ("ReservationManager.check_expired_reservations", lambda lib, seen: (datetime.now(),),
+     lambda lib, now: lib.reservations.check_expired_reservations(now)),
+    ("CategoryManager.assign_category", lambda lib, seen: (lib.book(), lib.category()),
+     lambda lib, book_id, category: lib.categories.assign_category(book_id, category)),
+    ("CategoryManager.remove_category_from_book", lambda lib, seen: (lib.book(), lib.category()),
+     lambda lib, book_id, category: lib.categories.remove_category_from_book(book_id, category)),
+    ("CategoryManager.add_category", lambda lib, seen: (f"Nowa {lib.rng.random()}",),
+     lambda lib, category: lib.categories.add_category(category)),
+    ("CategoryManager.remove_category",
+     lambda lib, seen: (distinct(lambda: lib.rng.choice(lib.categories.get_all_categories()[len(CATEGORIES):] or [None]),
+                                 seen),),
+     lambda lib, category: lib.categories.remove_category(category)),
+    ("BookManager.remove_book", lambda lib, seen: (distinct(lambda: existing(lib.book, lib.books.books), seen),),
+     lambda lib, book_id: lib.books.remove_book(book_id)),
+    ("UserManager.remove_user", lambda lib, seen: (distinct(lambda: existing(lib.user, lib.users.users), seen),),
+     lambda lib, user_id: lib.users.remove_user(user_id)),
+)
+
+
+def prepare_series(lib, prepare, count):
+    seen = set()
+    series = []
+    for _ in range(count):
+        args = prepare(lib, seen)
+        if None in args:
+            break
+        series.append(args)
+    return series
+
+
+def time_series(lib, call, series):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for args in series:
+            call(lib, *args)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure(lib, prepare, call, min_time, max_ops, repeats):
+    # seria jednego wywołania szacuje koszt, potem repeats serii po ok. min_time
+    # sekund; wynikiem jest najlepsza średnia (najmniej zakłócona przez system)
+    series = prepare_series(lib, prepare, 1)
+    if not series:
+        return None
+    estimate = time_series(lib, call, series)
+    count = max(1, min(max_ops, int(min_time / max(estimate, 1e-7))))
+    best = None
+    ops = 0
+    for _ in range(repeats):
+        series = prepare_series(lib, prepare, count)
+        if not series:
+            break
+        mean = time_series(lib, call, series) / len(series)
+        best = mean if best is None else min(best, mean)
+        ops += len(series)
+    return {"mean_us": round(best * 1e6, 3), "ops": ops} if best is not None else None
+
+
+def run_scale(scale, seed, min_time, max_ops, repeats, only=None):
+    start = time.perf_counter()
+    lib = SyntheticLibrary(scale, seed=seed)
+    build = time.perf_counter() - start
+    lib.books.find_books_by_title("rozgrzewka")  # indeksy budowane leniwie - przed pomiarem
+    result = {
+        "build_seconds": round(build, 3),
+        "library": {"books": len(lib.books.books), "users": len(lib.users.users), "loans": len(lib.loans.loans),
+                    "active_loans": lib.loans.count_active_loans(),
+                    "reservations": len(lib.reservations.reservations)},
+        "methods": {},
+    }
+    for name, prepare, call in CASES:
+        if only and not any(part in name for part in only):
+            continue
+        lib.rng.seed(f"{seed}:{name}")  # te same argumenty niezależnie od wcześniejszych pomiarów
+        measured = measure(lib, prepare, call, min_time, max_ops, repeats)
+        if measured is not None:
+            result["methods"][name] = measured
+        print(f"  {name:<52} {measured['mean_us'] if measured else float('nan'):12,.2f} µs", flush=True)
+    return result
+
+
+def scaling(results):
+    # wykładnik k w czas ~ n^k między najmniejszą a największą skalą:
+    # ~0 - koszt stały, ~1 - metoda przegląda całą tabelę
+    scales = sorted(results, key=int)
+    if len(scales) < 2:
+        return {}
+    small, large = results[scales[0]]["methods"], results[scales[-1]]["methods"]
+    ratio = math.log(int(scales[-1]) / int(scales[0]))
+    return {name: round(math.log(large[name]["mean_us"] / small[name]["mean_us"]) / ratio, 2)
+            for name in small if name in large and small[name]["mean_us"] > 0 and large[name]["mean_us"] > 0}
+
+
+def compare(results, baseline, threshold, min_delta_us):
+    regressions = []
+    for scale, result in results.items():
+        base_methods = baseline.get("results", {}).get(scale, {}).get("methods", {})
+        for name, measured in result["methods"].items():
+            base = base_methods.get(name)
+            if base is None:
+                continue
+            current, previous = measured["mean_us"], base["mean_us"]
+            if current > previous * (1 + threshold) and current - previous > min_delta_us:
+                regressions.append((scale, name, previous, current))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark metod menedżerów biblioteki")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="liczby książek, np. 1000,100000,1000000")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-time", type=float, default=0.05, help="czas jednej serii pomiarów [s]")
+    parser.add_argument("--max-ops", type=int, default=2000, help="najwięcej wywołań w serii")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", default="", help="tylko metody zawierające podane napisy, np. BookManager,list_")
+    parser.add_argument("--output", help="plik JSON z wynikami")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="wzorzec do porównania")
+    parser.add_argument("--threshold", type=float, default=0.5, help="dopuszczalne spowolnienie (0.5 = 50%%)")
+    parser.add_argument("--min-delta-us", type=float, default=1.0,
+                        help="pomijane różnice mniejsze niż tyle µs (szum szybkich metod)")
+    parser.add_argument("--save-baseline", action="store_true", help="zapisz wyniki jako nowy wzorzec")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    only = [part for part in args.only.split(",") if part]
+    results = {}
+    for scale in scales:
+        print(f"{scale} książek", flush=True)
+        results[str(scale)] = run_scale(scale, args.seed, args.min_time, args.max_ops, args.repeats, only)
+        print(f"  (budowa biblioteki: {results[str(scale)]['build_seconds']:.1f} s)")
+
+    report = {
+        "meta": {"date": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "platform": platform.platform(), "seed": args.seed, "scales": scales},
+        "results": results,
+        "scaling": scaling(results),
+    }
+    if report["scaling"]:
+        print(f"wykładnik skalowania (czas ~ n^k, {scales[0]} → {scales[-1]} książek):")
+        for name, exponent in sorted(report["scaling"].items(), key=lambda item: -item[1]):
+            print(f"  {name:<52} {exponent:6.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"zapisano wzorzec: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("brak wzorca - porównanie pominięte")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_us)
+    for scale, name, previous, current in regressions:
+        print(f"REGRESJA [{scale}] {name}: {previous:,.2f} µs → {current:,.2f} µs ({current / previous - 1:+.0%})")
+    if regressions:
+        return 1
+    print(f"bez regresji względem wzorca (próg {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# Przepustowość wypożyczeń i zwrotów w zależności od liczby wątków.
+# Uruchomienie z katalogu projekt/: python -m benchmarks.bench_threads [opóźnienie_ms]
+# Opóźnienie symuluje magazyn zwalniający GIL przy odczycie (dysk, sieć); przy 0
+# dane są w pamięci i o przepustowości decyduje GIL, a nie zamki.
+import sys
+import threading
+import time
+
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.locking import LockTable
+from src.user_manager import UserManager
+
+OPERATIONS = 2000
+BOOKS_PER_THREAD = 50
+
+
+class LatencyStorage(dict):
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def __getitem__(self, key):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().__getitem__(key)
+
+
+def run(thread_count, latency, stripes):
+    books = BookManager(storage=LatencyStorage(latency), thread_safe=True)
+    users = UserManager(thread_safe=True)
+    if stripes is not None:
+        books.locks = LockTable(stripes)
+    loans = LoanManager(books, users, thread_safe=True)
+    for i in range(thread_count * BOOKS_PER_THREAD):
+        books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+    for i in range(thread_count):
+        users.add_user(f"Czytelnik {i}", f"czytelnik{i}@example.com")
+
+    per_thread = OPERATIONS // thread_count
+
+    def worker(index):
+        first_book = index * BOOKS_PER_THREAD + 1
+        for i in range(per_thread):
+            book_id = first_book + i % BOOKS_PER_THREAD
+            loans.return_book(loans.loan_book(index + 1, book_id))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert loans.count_active_loans() == 0
+    return per_thread * thread_count / elapsed
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.0005
+    print(f"wypożyczenie + zwrot, opóźnienie odczytu {latency * 1000:g} ms")
+    print(f"  {'wątki':>5}  {'zamek na książkę':>18}  {'jeden zamek':>14}")
+    for thread_count in (1, 2, 4, 8, 16):
+        striped = run(thread_count, latency, None)
+        single = run(thread_count, latency, 1)
+        print(f"  {thread_count:>5}  {striped:>12,.0f} op/s  {single:>9,.0f} op/s")
+
+
+if __name__ == "__main__":
+    main()
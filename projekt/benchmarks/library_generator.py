@@ -0,0 +1,129 @@
+# Generator syntetycznych bibliotek do benchmarków: książki, autorzy, kategorie,
+# czytelnicy oraz ruch wypożyczeń i rezerwacji. Popularność książek, autorów,
+# kategorii i aktywność czytelników mają rozkład Zipfa - niewielka część
+# katalogu i czytelników odpowiada za większość ruchu, jak w prawdziwej bibliotece.
+import random
+from bisect import bisect
+from itertools import accumulate
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+FIRST_NAMES = ("Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Michał", "Agnieszka",
+               "Paweł", "Joanna", "Krzysztof", "Ewa", "Marcin", "Aleksandra", "Łukasz", "Zofia")
+LAST_NAMES = ("Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kamiński", "Lewandowski", "Zieliński",
+              "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur", "Krawczyk")
+TITLE_WORDS = ("Lalka", "Pan", "Wiedźmin", "Ogniem", "Mieczem", "Potop", "Dziady", "Ferdydurke",
+               "Solaris", "Quo", "Vadis", "Chłopi", "Przedwiośnie", "Zbrodnia", "Kara", "Hobbit",
+               "Noc", "Dzień", "Miasto", "Las", "Morze", "Góry", "Cień", "Wiatr", "Sekret", "Droga")
+CATEGORIES = ("Fantasy", "Kryminał", "Reportaż", "Poezja", "Historia", "Biografia", "Dla dzieci",
+              "Science Fiction", "Horror", "Romans", "Klasyka", "Podróże", "Nauka", "Poradnik",
+              "Komiks", "Dramat", "Thriller", "Filozofia", "Ekonomia", "Sztuka")
+
+
+def isbn13(number):
+    # poprawny ISBN-13 (prefiks 978, cyfra kontrolna) dla kolejnego numeru
+    digits = f"978{number % 10 ** 9:09d}"
+    total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+class ZipfSampler:
+    # losuje elementy z prawdopodobieństwem ~ 1 / ranga ** exponent; rangi są
+    # przetasowane, więc popularność nie zależy od kolejności ID
+    def __init__(self, items, rng, exponent=1.1):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cumulative = list(accumulate(1 / rank ** exponent for rank in range(1, len(self.items) + 1)))
+        self.total = self.cumulative[-1]
+        self.rng = rng
+
+    def __call__(self):
+        return self.items[bisect(self.cumulative, self.rng.random() * self.total)]
+
+
+class SyntheticLibrary:
+    # Biblioteka z book_count książkami i user_count czytelnikami; traffic zdarzeń
+    # (wypożyczenie, a gdy książka jest wypożyczona - rezerwacja; część wypożyczeń
+    # wraca) trafia do menedżerów przez ich zwykłe API.
+
+    def __init__(self, book_count, user_count=None, traffic=None, seed=1, exponent=1.1):
+        user_count = user_count if user_count is not None else max(book_count // 10, 10)
+        traffic = traffic if traffic is not None else book_count // 2
+        self.rng = random.Random(seed)
+        self.exponent = exponent
+        self.books = BookManager()
+        self.users = UserManager()
+        self.loans = LoanManager(self.books, self.users)
+        self.reservations = ReservationManager(self.books, self.users)
+        self.categories = CategoryManager(self.books)
+        self.book_count = 0
+        self.user_count = 0
+
+        authors = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+        authors += [f"Autor {i}" for i in range(max(book_count // 20 - len(authors), 0))]
+        self.author = ZipfSampler(authors, self.rng, exponent)
+        self.category = ZipfSampler(CATEGORIES, self.rng, exponent)
+
+        self.books.bulk_add_books(self.book_records(book_count), batch_size=10000)
+        self.users.bulk_add_users(self.user_records(user_count), batch_size=10000)
+        for category in CATEGORIES:
+            self.categories.add_category(category)
+        for book_id in range(1, self.books.next_id):
+            for _ in range(self.rng.randint(1, 2)):
+                self.categories.assign_category(book_id, self.category())
+
+        self.book = ZipfSampler(range(1, self.books.next_id), self.rng, exponent)
+        self.user = ZipfSampler(range(1, self.users.next_id), self.rng, exponent)
+        self.active_loans = []  # ID aktywnych wypożyczeń (losowy zwrot w O(1))
+        self.generate_traffic(traffic)
+
+    def book_records(self, count):
+        rng = self.rng
+        for _ in range(count):
+            self.book_count += 1
+            words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+            yield {"title": " ".join(words) + f" {self.book_count}", "author": self.author(),
+                   "isbn": isbn13(self.book_count), "year": rng.randint(1800, 2025)}
+
+    def user_records(self, count):
+        rng = self.rng
+        for _ in range(count):
+            self.user_count += 1
+            yield {"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                   "email": f"czytelnik{self.user_count}@example.com"}
+
+    def generate_traffic(self, events, return_ratio=0.25):
+        rng = self.rng
+        for _ in range(events):
+            if self.active_loans and rng.random() < return_ratio:
+                self.return_random_loan()
+                continue
+            user_id = self.user()
+            book_id = self.book()
+            if self.books.get_book(book_id)["available"]:
+                self.active_loans.append(self.loans.loan_book(user_id, book_id))
+            elif (user_id, book_id) not in self.reservations.active_reservations:
+                self.reservations.reserve_book(user_id, book_id)
+
+    def return_random_loan(self):
+        loans = self.active_loans
+        index = self.rng.randrange(len(loans))
+        loans[index], loans[-1] = loans[-1], loans[index]
+        loan_id = loans.pop()
+        book_id = self.loans.get_loan(loan_id)["book_id"]
+        self.loans.return_book(loan_id)
+        self.reservations.book_returned(book_id)
+        return loan_id
+
+    def available_book(self, attempts=1000):
+        # popularna, ale dostępna książka (do wypożyczenia); None, gdy wszystkie wypożyczone
+        for _ in range(attempts):
+            book_id = self.book()
+            book = self.books.books.get(book_id)
+            if book is not None and book["available"]:
+                return book_id
+        return None
@@ -0,0 +1,189 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from src.locking import NO_LOCK
+
+
+class AsyncLibrary:
+    # Fasada asyncio nad menedżerami. Ciężkie odczyty (wyszukiwanie, skany) idą
+    # do puli wątków, a identyczne zapytania w toku dzielą jeden wynik. Zapisy
+    # trafiają do kolejki i są wykonywane partiami, po kolei, w jednym wątku
+    # puli - kolejność zapisów jest zachowana, a pętla zdarzeń nie czeka na nie.
+    # Odczyty biegną równolegle z zapisami, więc menedżery muszą mieć thread_safe=True.
+
+    def __init__(self, book_manager, user_manager, loan_manager=None, reservation_manager=None,
+                 category_manager=None, executor=None, max_workers=4, batch_window=0.001, max_batch=128):
+        for manager in (book_manager, user_manager, loan_manager, reservation_manager, category_manager):
+            if manager is not None and getattr(manager, "lock", NO_LOCK) is NO_LOCK:
+                raise ValueError("AsyncLibrary wymaga menedżerów z thread_safe=True")
+        self.books = book_manager
+        self.users = user_manager
+        self.loans = loan_manager
+        self.reservations = reservation_manager
+        self.categories = category_manager
+        self.executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="library")
+        self.own_executor = executor is None
+        self.batch_window = batch_window  # ile sekund zbieramy zapisy przed wykonaniem partii
+        self.max_batch = max_batch
+        self.in_flight = {}  # (metoda, argumenty) -> Future trwającego odczytu
+        self.pending_writes = []  # (metoda, argumenty, Future)
+        self.writer = None  # zadanie wykonujące kolejne partie zapisów
+
+    async def _read(self, method, *args):
+        key = (method, args)
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # shield: anulowanie jednego z oczekujących nie przerywa odczytu pozostałym
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+
+    def _write(self, method, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending_writes.append((method, args, future))
+        if self.writer is None:
+            self.writer = loop.create_task(self._write_batches())
+        return future
+
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.sleep(self.batch_window)
+            while self.pending_writes:
+                batch = self.pending_writes[:self.max_batch]
+                del self.pending_writes[:self.max_batch]
+                outcomes = await loop.run_in_executor(self.executor, self._apply_writes, batch)
+                for (_, _, future), (error, result) in zip(batch, outcomes):
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+        finally:
+            self.writer = None
+
+    def _apply_writes(self, batch):
+        # błąd jednego zapisu trafia tylko do jego wywołującego
+        outcomes = []
+        storage_batch = getattr(self.books.books, "batch", None)
+        with storage_batch() if storage_batch is not None else nullcontext():
+            for method, args, _ in batch:
+                try:
+                    outcomes.append((None, method(*args)))
+                except Exception as error:
+                    outcomes.append((error, None))
+        return outcomes
+
+    async def flush(self):
+        while self.writer is not None:
+            await asyncio.shield(self.writer)
+
+    async def close(self):
+        await self.flush()
+        if self.own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # odczyty słownikowe w czasie O(1) - bez przełączania wątków
+    async def get_book(self, book_id):
+        return self.books.get_book(book_id)
+
+    async def get_user(self, user_id):
+        return self.users.get_user(user_id)
+
+    async def get_loan(self, loan_id):
+        return self.loans.get_loan(loan_id)
+
+    async def get_reservation(self, reservation_id):
+        return self.reservations.get_reservation(reservation_id)
+
+    # ciężkie odczyty - pula wątków i łączenie identycznych zapytań
+    async def find_books_by_title(self, title, match="substring"):
+        return await self._read(self.books.find_books_by_title, title, match)
+
+    async def find_books_by_author(self, author, match="substring"):
+        return await self._read(self.books.find_books_by_author, author, match)
+
+    async def get_books_by_author(self, author):
+        return await self._read(self.books.get_books_by_author, author)
+
+    async def get_book_by_isbn(self, isbn):
+        return await self._read(self.books.get_book_by_isbn, isbn)
+
+    async def list_books(self):
+        return await self._read(self.books.list_books)
+
+    async def find_users_by_name(self, name):
+        return await self._read(self.users.find_users_by_name, name)
+
+    async def get_user_by_email(self, email):
+        return await self._read(self.users.get_user_by_email, email)
+
+    async def get_user_active_loans(self, user_id):
+        return await self._read(self.loans.get_user_active_loans, user_id)
+
+    async def get_user_loan_history(self, user_id):
+        return await self._read(self.loans.get_user_loan_history, user_id)
+
+    async def list_reservations(self, status=None):
+        return await self._read(self.reservations.list_reservations, status)
+
+    async def list_books_page(self, limit=50, cursor=None, author=None, available=None):
+        return await self._read(self.books.list_books_page, limit, cursor, author, available)
+
+    async def list_users_page(self, limit=50, cursor=None):
+        return await self._read(self.users.list_users_page, limit, cursor)
+
+    async def list_loans_page(self, limit=50, cursor=None, user_id=None, active=None):
+        return await self._read(self.loans.list_loans_page, limit, cursor, user_id, active)
+
+    async def list_reservations_page(self, limit=50, cursor=None, status=None, user_id=None, book_id=None):
+        return await self._read(self.reservations.list_reservations_page, limit, cursor, status, user_id, book_id)
+
+    async def get_books_by_category(self, category):
+        return await self._read(self.categories.get_books_by_category, category)
+
+    async def query_books(self, expression):
+        return await self._read(self.categories.query_books, expression)
+
+    # zapisy - kolejka i partie
+    async def add_book(self, title, author, isbn, year=None):
+        return await self._write(self.books.add_book, title, author, isbn, year)
+
+    async def add_user(self, name, email):
+        return await self._write(self.users.add_user, name, email)
+
+    async def loan_book(self, user_id, book_id):
+        return await self._write(self.loans.loan_book, user_id, book_id)
+
+    async def return_book(self, loan_id):
+        return await self._write(self.loans.return_book, loan_id)
+
+    async def reserve_book(self, user_id, book_id):
+        return await self._write(self.reservations.reserve_book, user_id, book_id)
+
+    async def cancel_reservation(self, reservation_id):
+        return await self._write(self.reservations.cancel_reservation, reservation_id)
+
+    async def complete_reservation(self, reservation_id):
+        return await self._write(self.reservations.complete_reservation, reservation_id)
+
+    async def book_returned(self, book_id):
+        return await self._write(self.reservations.book_returned, book_id)
+
+    async def check_expired_reservations(self, now=None):
+        return await self._write(self.reservations.check_expired_reservations, now)
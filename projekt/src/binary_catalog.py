@@ -0,0 +1,204 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import MutableMapping
+
+# Układ pliku (little-endian):
+#   nagłówek | tablica ID (uint32, rosnąco) | tablica rekordów stałej długości | sterta napisów
+# Rekord wskazuje w stercie kolejne napisy UTF-8: tytuł, autor, ISBN oraz JSON pozostałych pól.
+MAGIC = b"PKAT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQ")  # magic, wersja, zarezerwowane, liczba rekordów, offset rekordów, offset sterty
+BOOK_ID = struct.Struct("<I")
+RECORD = struct.Struct("<QIIHIiB")  # offset w stercie, długości napisów, rok, flagi
+FLAG_AVAILABLE = 1
+FLAG_HAS_YEAR = 2
+BASE_FIELDS = ("title", "author", "isbn", "available", "year")
+
+
+def write_catalog(path, books):
+    book_ids = sorted(books)
+    records = bytearray()
+    heap = bytearray()
+
+    for book_id in book_ids:
+        book = books[book_id]
+        title = book["title"].encode("utf-8")
+        author = book["author"].encode("utf-8")
+        isbn = book["isbn"].encode("utf-8")
+        extra = {key: value for key, value in book.items() if key not in BASE_FIELDS}
+        year = book.get("year")
+        flags = FLAG_AVAILABLE if book.get("available", True) else 0
+        if isinstance(year, int) and -2 ** 31 <= year < 2 ** 31:
+            flags |= FLAG_HAS_YEAR
+        else:
+            if year is not None:
+                extra["year"] = year
+            year = 0
+        extra = json.dumps(extra, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if extra else b""
+
+        records += RECORD.pack(len(heap), len(title), len(author), len(isbn), len(extra), year, flags)
+        heap += title + author + isbn + extra
+
+    records_offset = HEADER.size + BOOK_ID.size * len(book_ids)
+    heap_offset = records_offset + len(records)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(book_ids), records_offset, heap_offset))
+        f.write(struct.pack(f"<{len(book_ids)}I", *book_ids))
+        f.write(records)
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MappedCatalog:
+    # Katalog tylko do odczytu otwarty przez mmap; rekord dekodujemy dopiero przy odczycie.
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if len(self.buffer) < HEADER.size:
+            raise ValueError(f"Plik {path} nie jest katalogiem książek")
+        magic, version, _, self.count, self.records_offset, self.heap_offset = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Plik {path} nie jest katalogiem książek w wersji {VERSION}")
+
+    def __len__(self):
+        return self.count
+
+    def _position(self, book_id):
+        low, high = 0, self.count
+        buffer = self.buffer
+        while low < high:
+            middle = (low + high) // 2
+            if BOOK_ID.unpack_from(buffer, HEADER.size + middle * BOOK_ID.size)[0] < book_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and BOOK_ID.unpack_from(buffer, HEADER.size + low * BOOK_ID.size)[0] == book_id:
+            return low
+        return -1
+
+    def __contains__(self, book_id):
+        return isinstance(book_id, int) and 0 <= book_id < 2 ** 32 and self._position(book_id) != -1
+
+    def __getitem__(self, book_id):
+        position = self._position(book_id) if isinstance(book_id, int) and 0 <= book_id < 2 ** 32 else -1
+        if position == -1:
+            raise KeyError(book_id)
+        return self._decode(position)
+
+    def _decode(self, position):
+        offset, title_len, author_len, isbn_len, extra_len, year, flags = RECORD.unpack_from(
+            self.buffer, self.records_offset + position * RECORD.size)
+        start = self.heap_offset + offset
+        data = self.buffer[start:start + title_len + author_len + isbn_len + extra_len]
+        book = {
+            "title": data[:title_len].decode("utf-8"),
+            "author": data[title_len:title_len + author_len].decode("utf-8"),
+            "isbn": data[title_len + author_len:title_len + author_len + isbn_len].decode("utf-8"),
+            "available": bool(flags & FLAG_AVAILABLE),
+        }
+        if flags & FLAG_HAS_YEAR:
+            book["year"] = year
+        if extra_len:
+            book.update(json.loads(data[title_len + author_len + isbn_len:].decode("utf-8")))
+        return book
+
+    def __iter__(self):
+        if not self.count:
+            return iter(())
+        ids = memoryview(self.buffer)[HEADER.size:self.records_offset]
+        if sys.byteorder == "little":
+            return iter(ids.cast("I"))
+        return (book_id for (book_id,) in BOOK_ID.iter_unpack(ids))
+
+    def items(self):
+        for position, book_id in enumerate(self):
+            yield book_id, self._decode(position)
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+class CatalogStorage(MutableMapping):
+    # Mapowanie dla BookManager(storage=...): odczyty idą do pliku, a zapisy do
+    # nakładki w pamięci. Zmieniony rekord trzeba przypisać ponownie (books[id] = book),
+    # co menedżery robią same. save() zapisuje całość jako nowy katalog.
+
+    def __init__(self, path):
+        self.base = MappedCatalog(path)
+        self.overlay = {}  # ID -> rekord zmieniony lub dodany w tej sesji
+        self.deleted = set()  # ID z pliku usunięte w tej sesji
+
+    def __getitem__(self, book_id):
+        if book_id in self.overlay:
+            return self.overlay[book_id]
+        if book_id in self.deleted:
+            raise KeyError(book_id)
+        return self.base[book_id]
+
+    def __setitem__(self, book_id, book):
+        self.overlay[book_id] = book
+        self.deleted.discard(book_id)
+
+    def __delitem__(self, book_id):
+        if book_id not in self:
+            raise KeyError(book_id)
+        self.overlay.pop(book_id, None)
+        if book_id in self.base:
+            self.deleted.add(book_id)
+
+    def __contains__(self, book_id):
+        if book_id in self.overlay:
+            return True
+        return book_id not in self.deleted and book_id in self.base
+
+    def __iter__(self):
+        if not self.overlay and not self.deleted:
+            return iter(self.base)
+        return self._merged_ids()
+
+    def _merged_ids(self):
+        deleted = self.deleted
+        base = self.base
+        for book_id in base:
+            if book_id not in deleted:
+                yield book_id
+        for book_id in sorted(book_id for book_id in self.overlay if book_id not in base):
+            yield book_id
+
+    def __len__(self):
+        base = self.base
+        added = sum(1 for book_id in self.overlay if book_id not in base)
+        return len(base) - len(self.deleted) + added
+
+    def items(self):
+        # skan bez budowania wszystkich słowników naraz: rekord z pliku dekodujemy w locie
+        overlay = self.overlay
+        deleted = self.deleted
+        base = self.base
+        for position, book_id in enumerate(base):
+            if book_id in overlay:
+                yield book_id, overlay[book_id]
+            elif book_id not in deleted:
+                yield book_id, base._decode(position)
+        for book_id in sorted(book_id for book_id in overlay if book_id not in base):
+            yield book_id, overlay[book_id]
+
+    def values(self):
+        for _, book in self.items():
+            yield book
+
+    def save(self, path):
+        write_catalog(path, self)
+
+    def close(self):
+        self.base.close()
@@ -1,11 +1,46 @@
 
+from src.catalog_import import import_in_batches
+from src.interning import StringDictionary
+from src.locking import make_locks
+from src.pagination import keys_after, take_page
+from src.text_index import TokenIndex, TrigramIndex
+from src.utils import next_key, normalize_isbn, validate_isbn
+
+
 class BookManager:
-    def __init__(self):
-        self.books = {}
-        self.next_id = 1
+    def __init__(self, unique_isbn=False, storage=None, dictionary=None, thread_safe=False):
+        # storage: dowolne mapowanie ID -> rekord, np. tabela dziennika; domyślnie słownik
+        self.books = storage if storage is not None else {}
+        self.next_id = next_key(self.books)
+        self.unique_isbn = unique_isbn
+        # wspólny z CategoryManager i ReservationManager słownik autorów, kategorii i statusów
+        if dictionary is None:
+            dictionary = getattr(self.books, "dictionary", None)
+        self.dictionary = dictionary if dictionary is not None else StringDictionary()
+        self.isbn_index = {}  # znormalizowany ISBN -> lista ID książek
+        # magazyn z indeksem ISBN (SQLite: find_keys) zastępuje isbn_index
+        self.find_keys = getattr(self.books, "find_keys", None)
+        self.author_ids = {}  # kod autora -> zbiór ID książek
+        self.title_index = TokenIndex()
+        self.author_index = TokenIndex()
+        self.title_trigrams = TrigramIndex()
+        self.author_trigrams = TrigramIndex()
+        # indeksy budujemy przy pierwszym wyszukiwaniu, żeby start na dużym
+        # katalogu (np. z pliku mmap) nie dekodował od razu wszystkich rekordów
+        self.indexed = not self.books
+        # thread_safe: zamek na książkę (locks) dla zmian rekordu i krótki zamek
+        # (lock) dla next_id i indeksów; LoanManager i ReservationManager używają
+        # tych samych zamków książek
+        self.locks, self.lock = make_locks(thread_safe, self.books)
 
-    def add_book(self, title, author, isbn, year=None):
+    def _ensure_indexes(self):
+        with self.lock:
+            if not self.indexed:
+                for book_id, book in self.books.items():
+                    self._index_book(book_id, book)
+                self.indexed = True
 
+    def _validate_book(self, title, author, isbn):
         if not title or not isinstance(title, str):
             raise ValueError("Tytuł musi być niepustym ciągiem znaków")
         if not author or not isinstance(author, str):
@@ -15,9 +50,19 @@ class BookManager:
         if len(title) > 200:
             raise ValueError("Tytuł jest zbyt długi")
 
+    def add_book(self, title, author, isbn, year=None):
+        self._validate_book(title, author, isbn)
+
+        with self.lock:
+            if self.unique_isbn and self._isbn_ids(isbn):
+                raise ValueError(f"Książka o ISBN {isbn} już istnieje")
+
+            return self._insert_book(title, author, isbn, year)
+
+    def _insert_book(self, title, author, isbn, year):
         book = {
             "title": title,
-            "author": author,
+            "author": self.dictionary.intern(author),
             "isbn": isbn,
             "available": True
         }
@@ -26,50 +71,193 @@ class BookManager:
             book["year"] = year
 
 
-        book_id = self.next_id
-        self.books[book_id] = book
-        self.next_id += 1
+        with self.lock:
+            book_id = self.next_id
+            self.books[book_id] = book
+            self.next_id += 1
+            if self.indexed:
+                self._index_book(book_id, book)
 
         return book_id
 
+    def bulk_add_books(self, records, batch_size=1000, check_isbn=True, report=None):
+        # records: dowolny iterator słowników (title, author, isbn, year), np. z
+        # read_catalog_records; w pamięci jest naraz tylko jedna partia rekordów
+        if self.unique_isbn and self.find_keys is None:
+            self._ensure_indexes()
+
+        def validate(record, batch_isbns):
+            title, author, isbn, year = self._validate_record(record, check_isbn)
+            if self.unique_isbn:
+                isbn_key = normalize_isbn(isbn)
+                if isbn_key in batch_isbns or self._isbn_ids(isbn_key):
+                    raise ValueError(f"Książka o ISBN {isbn} już istnieje")
+                batch_isbns.add(isbn_key)
+            return title, author, isbn, year
+
+        return import_in_batches(records, validate, self._insert_book, storage=self.books,
+                                 batch_size=batch_size, report=report)
+
+    def _validate_record(self, record, check_isbn):
+        if not isinstance(record, dict):
+            raise ValueError("Rekord musi być obiektem z polami title, author, isbn")
+        title = record.get("title")
+        author = record.get("author")
+        isbn = record.get("isbn")
+        self._validate_book(title, author, isbn)
+        if check_isbn and not validate_isbn(isbn, checksum=True):
+            raise ValueError(f"Nieprawidłowy ISBN {isbn}")
+        year = record.get("year")
+        if year == "":
+            year = None
+        elif isinstance(year, str):
+            if not year.strip().lstrip("-").isdigit():
+                raise ValueError(f"Nieprawidłowy rok {year}")
+            year = int(year)
+        elif year is not None and (not isinstance(year, int) or isinstance(year, bool)):
+            raise ValueError(f"Nieprawidłowy rok {year}")
+        return title, author, isbn, year
+
     def remove_book(self, book_id):
-        if book_id not in self.books:
-            raise ValueError(f"Książka o ID {book_id} nie istnieje")
-        del self.books[book_id]
+        with self.locks(book_id), self.lock:
+            if book_id not in self.books:
+                raise ValueError(f"Książka o ID {book_id} nie istnieje")
+            if self.indexed:
+                self._unindex_book(book_id, self.books[book_id])
+            del self.books[book_id]
+
+    def _isbn_ids(self, isbn):
+        if self.find_keys is not None:
+            return self.find_keys("isbn", isbn)
+        self._ensure_indexes()
+        return self.isbn_index.get(normalize_isbn(isbn), [])
+
+    def _index_book(self, book_id, book):
+        if self.find_keys is None:
+            self.isbn_index.setdefault(normalize_isbn(book["isbn"]), []).append(book_id)
+        self.title_index.add(book_id, book["title"])
+        self.author_index.add(book_id, book["author"])
+        self.author_ids.setdefault(self.dictionary.encode(book["author"]), set()).add(book_id)
+        self.title_trigrams.add(book_id, book["title"])
+        self.author_trigrams.add(book_id, book["author"])
+
+    def _unindex_book(self, book_id, book):
+        if self.find_keys is None:
+            isbn_key = normalize_isbn(book["isbn"])
+            book_ids = self.isbn_index[isbn_key]
+            book_ids.remove(book_id)
+            if not book_ids:
+                del self.isbn_index[isbn_key]
+        self.title_index.remove(book_id)
+        self.author_index.remove(book_id)
+        self._unindex_author(book_id, book["author"])
+        self.title_trigrams.remove(book_id)
+        self.author_trigrams.remove(book_id)
+
+    def _unindex_author(self, book_id, author):
+        author_code = self.dictionary.encode(author)
+        book_ids = self.author_ids[author_code]
+        book_ids.discard(book_id)
+        if not book_ids:
+            del self.author_ids[author_code]
 
     def get_book(self, book_id):
         if book_id not in self.books:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
         return self.books[book_id]
 
-    def find_books_by_title(self, title):
-        return [book for book_id, book in self.books.items()
-                if title.lower() in book["title"].lower()]
+    def get_book_by_isbn(self, isbn):
+        with self.lock:
+            book_ids = self._isbn_ids(isbn)
+            if not book_ids:
+                raise ValueError(f"Książka o ISBN {isbn} nie istnieje")
+            return self.books[book_ids[0]]
+
+    def find_books_by_title(self, title, match="substring"):
+        return self._find_books(self.title_index, self.title_trigrams, title, match)
+
+    def find_books_by_author(self, author, match="substring"):
+        return self._find_books(self.author_index, self.author_trigrams, author, match)
 
-    def find_books_by_author(self, author):
-        return [book for book_id, book in self.books.items()
-                if author.lower() in book["author"].lower()]
+    def get_books_by_author(self, author):
+        # dokładne dopasowanie autora - porównanie kodów zamiast napisów
+        self._ensure_indexes()
+        author_code = self.dictionary.lookup(author)
+        if author_code is None:
+            return []
+        with self.lock:
+            return [self.books[book_id] for book_id in sorted(self.author_ids.get(author_code, ()))]
+
+    def _find_books(self, word_index, trigram_index, query, match):
+        self._ensure_indexes()
+        with self.lock:
+            if match == "words":
+                book_ids = word_index.search(query)
+            elif match == "substring":
+                book_ids = trigram_index.search(query)
+            else:
+                raise ValueError(f"Nieznany tryb wyszukiwania: {match}")
+            return [self.books[book_id] for book_id in sorted(book_ids)]
 
     def update_book(self, book_id, new_title=None, new_author=None, new_year=None):
-        if book_id not in self.books:
-            raise ValueError(f"Książka o ID {book_id} nie istnieje")
+        with self.locks(book_id), self.lock:
+            if book_id not in self.books:
+                raise ValueError(f"Książka o ID {book_id} nie istnieje")
 
-        book = self.books[book_id]
+            book = self.books[book_id]
 
-        if new_title:
-            if not isinstance(new_title, str) or len(new_title) == 0:
-                raise ValueError("Tytuł musi być niepustym ciągiem znaków")
-            book["title"] = new_title
+            if new_title:
+                if not isinstance(new_title, str) or len(new_title) == 0:
+                    raise ValueError("Tytuł musi być niepustym ciągiem znaków")
+                book["title"] = new_title
+                if self.indexed:
+                    self.title_index.update(book_id, new_title)
+                    self.title_trigrams.update(book_id, new_title)
 
-        if new_author:
-            if not isinstance(new_author, str) or len(new_author) == 0:
-                raise ValueError("Autor musi być niepustym ciągiem znaków")
-            book["author"] = new_author
+            if new_author:
+                if not isinstance(new_author, str) or len(new_author) == 0:
+                    raise ValueError("Autor musi być niepustym ciągiem znaków")
+                new_author = self.dictionary.intern(new_author)
+                if self.indexed:
+                    self._unindex_author(book_id, book["author"])
+                    self.author_ids.setdefault(self.dictionary.encode(new_author), set()).add(book_id)
+                    self.author_index.update(book_id, new_author)
+                    self.author_trigrams.update(book_id, new_author)
+                book["author"] = new_author
 
-        if new_year is not None:
-            book["year"] = new_year
+            if new_year is not None:
+                book["year"] = new_year
 
-        return True
+            self.books[book_id] = book
+            return True
+
+    def set_available(self, book_id, available):
+        with self.locks(book_id):
+            book = self.get_book(book_id)
+            book["available"] = available
+            self.books[book_id] = book
 
     def list_books(self):
-        return list(self.books.values())
+        with self.lock:
+            return list(self.books.values())
+
+    def iter_books(self, after=0, author=None, available=None):
+        # leniwie pary (ID, książka) rosnąco po ID większym od after;
+        # filtr autora korzysta z indeksu kodów, dostępność sprawdzamy na rekordzie
+        if author is not None:
+            self._ensure_indexes()
+            author_code = self.dictionary.lookup(author)
+            with self.lock:
+                book_ids = sorted(book_id for book_id in self.author_ids.get(author_code, ()) if book_id > after)
+        else:
+            book_ids = keys_after(self.books, after, self.next_id)
+        for book_id in book_ids:
+            book = self.books.get(book_id)
+            if book is None:
+                continue
+            if available is not None and book.get("available") is not available:
+                continue
+            yield book_id, book
+
+    def list_books_page(self, limit=50, cursor=None, author=None, available=None):
+        return take_page(self.iter_books(cursor or 0, author, available), limit)
@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+CATALOG_FIELDS = ("title", "author", "isbn", "year")
+USER_FIELDS = ("name", "email")
+
+
+class ImportReport:
+    # Wynik importu: liczniki, pierwsze max_errors odrzuconych rekordów w pamięci
+    # i opcjonalnie wszystkie odrzucone w pliku JSON Lines (error_path).
+
+    def __init__(self, max_errors=1000, error_path=None):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.error_file = open(error_path, "w", encoding="utf-8", newline="\n") if error_path else None
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def reject(self, number, record, message):
+        self.rejected += 1
+        error = {"record": number, "error": message, "data": record}
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
+        if self.error_file is not None:
+            self.error_file.write(json.dumps(error, ensure_ascii=False, default=str) + "\n")
+
+    def finish(self):
+        if self.elapsed is None:
+            self.elapsed = time.perf_counter() - self.started
+        if self.error_file is not None:
+            self.error_file.close()
+            self.error_file = None
+
+    @property
+    def records_per_second(self):
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        return (self.imported + self.rejected) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"Zaimportowano {self.imported}, odrzucono {self.rejected} "
+                f"({self.records_per_second:,.0f} rekordów/s)")
+
+
+def import_in_batches(records, validate, insert, storage=None, batch_size=1000, report=None):
+    # validate(record, batch_keys) zwraca argumenty dla insert albo zgłasza ValueError;
+    # batch_keys to zbiór kluczy zajętych w bieżącej partii (duplikaty wewnątrz partii)
+    report = report if report is not None else ImportReport()
+    records = iter(records)
+    number = 0
+    batch_context = getattr(storage, "batch", None)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        valid = []
+        batch_keys = set()
+        for record in batch:
+            number += 1
+            try:
+                valid.append(validate(record, batch_keys))
+            except ValueError as error:
+                report.reject(number, record, str(error))
+
+        # partia trafia do magazynu naraz, np. w jednej transakcji SQLite
+        with batch_context() if batch_context is not None else nullcontext():
+            for values in valid:
+                insert(*values)
+        report.imported += len(valid)
+
+    report.finish()
+    return report
+
+
+def read_csv_records(path, fields=CATALOG_FIELDS):
+    # nagłówek z nazwami kolumn, np. title,author,isbn,year; pozostałe kolumny są pomijane
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {field: row[field] for field in fields if row.get(field) is not None}
+
+
+def read_jsonl_records(path):
+    # uszkodzona linia staje się rekordem-napisem, który walidacja odrzuci z numerem rekordu
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line.rstrip("\n")
+
+
+def read_catalog_records(path, format=None, fields=CATALOG_FIELDS):
+    if format is None:
+        extension = os.path.splitext(path)[1].lower()
+        format = "csv" if extension == ".csv" else "jsonl"
+    if format == "csv":
+        return read_csv_records(path, fields)
+    if format == "jsonl":
+        return read_jsonl_records(path)
+    raise ValueError(f"Nieznany format katalogu: {format}")
+
+
+def import_catalog(book_manager, path, format=None, batch_size=1000, check_isbn=True,
+                   max_errors=1000, error_path=None):
+    report = ImportReport(max_errors=max_errors, error_path=error_path)
+    try:
+        return book_manager.bulk_add_books(read_catalog_records(path, format), batch_size=batch_size,
+                                           check_isbn=check_isbn, report=report)
+    finally:
+        report.finish()
+
+
+def import_users(user_manager, path, format=None, batch_size=1000, max_errors=1000, error_path=None):
+    report = ImportReport(max_errors=max_errors, error_path=error_path)
+    try:
+        return user_manager.bulk_add_users(read_catalog_records(path, format, USER_FIELDS),
+                                           batch_size=batch_size, report=report)
+    finally:
+        report.finish()
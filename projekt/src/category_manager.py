@@ -1,38 +1,146 @@
+from src.category_query import parse_query, ids_to_bitmap, bitmap_to_ids
+from src.interning import StringDictionary
+from src.locking import NO_LOCKS, make_locks
+from src.snapshots import atomic
+
+
 class CategoryManager:
-    def __init__(self, book_manager):
+    def __init__(self, book_manager, storage=None, thread_safe=False):
         self.book_manager = book_manager
-        self.categories = set()
+        self.categories = storage if storage is not None else {}  # nazwa kategorii -> True
+        # indeksy trzymają kody kategorii ze słownika współdzielonego z BookManager
+        dictionary = getattr(book_manager, "dictionary", None)
+        self.dictionary = dictionary if dictionary is not None else StringDictionary()
+        self.category_books = {}  # kod kategorii -> zbiór ID książek
+        self.book_categories = {}  # ID książki -> zbiór kodów kategorii
+        self.category_bitmaps = {}  # kod kategorii -> bitmapa ID książek (int), budowana leniwie
+        # indeksy z istniejących książek budujemy przy pierwszym użyciu - przegląd
+        # katalogu (np. CatalogStorage) dekodowałby przy starcie każdy rekord
+        self.indexed = not book_manager.books
+        # thread_safe: lista "categories" książki zmienia się pod zamkiem książki
+        # z BookManager, a indeksy kategorii pod self.lock (zawsze w tej kolejności)
+        _, self.lock = make_locks(thread_safe, self.categories)
+        self.book_locks = getattr(book_manager, "locks", NO_LOCKS)
 
-    def add_category(self, category):
-        if category in self.categories:
-            raise ValueError("Category already exists")
-        self.categories.add(category)
+    def _ensure_indexes(self):
+        with self.lock:
+            if not self.indexed:
+                for book_id, book in self.book_manager.books.items():
+                    for category in book.get("categories", ()):
+                        self._link(book_id, self.dictionary.encode(category))
+                self.indexed = True
 
-    def remove_category(self, category):
+    def _link(self, book_id, code):
+        self.book_categories.setdefault(book_id, set()).add(code)
+        self.category_books.setdefault(code, set()).add(book_id)
+        self.category_bitmaps.pop(code, None)
+
+    def _code(self, category):
         if category not in self.categories:
             raise ValueError("Category does not exist")
-        self.categories.remove(category)
-        for book in self.book_manager.books.values():
-            if category in book["categories"]:
-                book["categories"].remove(category)
+        return self.dictionary.encode(category)
+
+    def add_category(self, category):
+        with self.lock:
+            if category in self.categories:
+                raise ValueError("Category already exists")
+            self.categories[category] = True
+            self.category_books.setdefault(self.dictionary.encode(category), set())
+
+    def remove_category(self, category):
+        self._ensure_indexes()
+        with atomic(self.categories):
+            with self.lock:
+                code = self._code(category)
+                del self.categories[category]
+                self.category_bitmaps.pop(code, None)
+                book_ids = self.category_books.pop(code, ())
+                for book_id in book_ids:
+                    self.book_categories[book_id].discard(code)
+
+            books = self.book_manager.books
+            for book_id in book_ids:
+                with self.book_locks(book_id):
+                    book = books.get(book_id)
+                    if book is not None and category in book.get("categories", ()):
+                        book["categories"].remove(category)
+                        books[book_id] = book
 
     def get_all_categories(self):
-        return list(self.categories)
+        with self.lock:
+            return list(self.categories)
 
     def assign_category(self, book_id, category):
-        if category not in self.categories:
-            raise ValueError("Category does not exist")
-        book = self.book_manager.get_book(book_id)
-        if category not in book["categories"]:
-            book["categories"].append(category)
+        self._ensure_indexes()
+        with self.book_locks(book_id), self.lock:
+            code = self._code(category)
+            book = self.book_manager.get_book(book_id)
+            if code not in self.book_categories.get(book_id, ()):
+                self._link(book_id, code)
+                categories = book.setdefault("categories", [])
+                if category not in categories:
+                    categories.append(self.dictionary.decode(code))
+                    self.book_manager.books[book_id] = book
 
     def remove_category_from_book(self, book_id, category):
-        book = self.book_manager.get_book(book_id)
-        if category in book["categories"]:
-            book["categories"].remove(category)
+        self._ensure_indexes()
+        with self.book_locks(book_id), self.lock:
+            book = self.book_manager.get_book(book_id)
+            code = self.dictionary.lookup(category)
+            codes = self.book_categories.get(book_id)
+            if codes and code in codes:
+                codes.discard(code)
+                self.category_books[code].discard(book_id)
+                self.category_bitmaps.pop(code, None)
+                if category in book.get("categories", ()):
+                    book["categories"].remove(category)
+                    self.book_manager.books[book_id] = book
 
     def get_books_by_category(self, category):
-        if category not in self.categories:
-            raise ValueError("Category does not exist")
-        return [book_id for book_id, book in self.book_manager.books.items()
-                if category in book["categories"]]
+        self._ensure_indexes()
+        with self.lock:
+            code = self._code(category)
+            books = self.book_manager.books
+            # książki usunięte z BookManagera pomijamy przy odczycie
+            return sorted(book_id for book_id in self.category_books[code]
+                          if book_id in books)
+
+    def query_books(self, expression):
+        # np. 'Fantasy AND Polish AND NOT Children' albo '"Science Fiction" OR (Horror AND NOT Children)'
+        tree = parse_query(expression)
+        self._ensure_indexes()
+        with self.lock:
+            bitmap = self._evaluate(tree)
+        books = self.book_manager.books
+        return [book_id for book_id in bitmap_to_ids(bitmap) if book_id in books]
+
+    def _evaluate(self, node):
+        kind = node[0]
+        if kind == "category":
+            return self._bitmap(node[1])
+        if kind == "not":
+            return self._all_books_bitmap() & ~self._evaluate(node[1])
+        bitmaps = [self._evaluate(child) for child in node[1]]
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if kind == "and":
+                result &= bitmap
+            else:
+                result |= bitmap
+        return result
+
+    def _bitmap(self, category):
+        code = self._code(category)
+        bitmap = self.category_bitmaps.get(code)
+        if bitmap is None:
+            bitmap = ids_to_bitmap(self.category_books[code])
+            self.category_bitmaps[code] = bitmap
+        return bitmap
+
+    def _all_books_bitmap(self):
+        # ID książek są gęste, więc zakres 1..max ID zastępuje listę wszystkich książek;
+        # ID usuniętych książek odrzuca query_books
+        books = self.book_manager.books
+        max_id = getattr(self.book_manager, "next_id", None)
+        max_id = max_id - 1 if max_id is not None else max(books, default=0)
+        return (1 << (max_id + 1)) - 2
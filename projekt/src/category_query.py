@@ -0,0 +1,104 @@
+OPERATORS = ("AND", "OR", "NOT")
+
+
+def tokenize_query(expression):
+    tokens = []
+    i = 0
+    length = len(expression)
+    while i < length:
+        char = expression[i]
+        if char.isspace():
+            i += 1
+        elif char in "()":
+            tokens.append(char)
+            i += 1
+        elif char == '"':
+            end = expression.find('"', i + 1)
+            if end == -1:
+                raise ValueError("Niezamknięty cudzysłów w zapytaniu")
+            tokens.append(("quoted", expression[i + 1:end]))
+            i = end + 1
+        else:
+            start = i
+            while i < length and not expression[i].isspace() and expression[i] not in '()"':
+                i += 1
+            word = expression[start:i]
+            if word in OPERATORS:
+                tokens.append(word)
+            elif tokens and isinstance(tokens[-1], tuple) and tokens[-1][0] == "name":
+                # kolejne słowa bez operatora tworzą jedną nazwę, np. Science Fiction
+                tokens[-1] = ("name", tokens[-1][1] + " " + word)
+            else:
+                tokens.append(("name", word))
+    return tokens
+
+
+def parse_query(expression):
+    # gramatyka: or := and (OR and)* ; and := not (AND not)* ; not := NOT not | atom
+    tokens = tokenize_query(expression)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise ValueError("Nieoczekiwany koniec zapytania")
+        position += 1
+        return token
+
+    def parse_or():
+        terms = [parse_and()]
+        while peek() == "OR":
+            take()
+            terms.append(parse_and())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def parse_and():
+        terms = [parse_not()]
+        while peek() == "AND":
+            take()
+            terms.append(parse_not())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def parse_not():
+        if peek() == "NOT":
+            take()
+            return ("not", parse_not())
+        token = take()
+        if token == "(":
+            node = parse_or()
+            if take() != ")":
+                raise ValueError("Brak nawiasu zamykającego w zapytaniu")
+            return node
+        if isinstance(token, tuple):
+            return ("category", token[1])
+        raise ValueError(f"Nieoczekiwany element zapytania: {token}")
+
+    tree = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Nieoczekiwany element zapytania: {peek()}")
+    return tree
+
+
+def ids_to_bitmap(ids):
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for record_id in ids:
+        buffer[record_id >> 3] |= 1 << (record_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def bitmap_to_ids(bitmap):
+    # odwrócony zapis binarny: znak na pozycji i odpowiada bitowi i
+    bits = format(bitmap, "b")[::-1]
+    ids = []
+    i = bits.find("1")
+    while i != -1:
+        ids.append(i)
+        i = bits.find("1", i + 1)
+    return ids
@@ -0,0 +1,229 @@
+from array import array
+from collections.abc import MutableMapping
+
+from src.interning import StringDictionary
+
+MISSING_INT = -2 ** 31  # brak wartości w kolumnie liczbowej ('i')
+INT_RANGE = range(MISSING_INT + 1, 2 ** 31)
+# kolumna logiczna: 0 - brak pola, 1 - False, 2 - True
+BOOL_MISSING, BOOL_FALSE, BOOL_TRUE = 0, 1, 2
+
+
+class ColumnarTable(MutableMapping):
+    # Rekordy trzymane kolumnami zamiast osobnego słownika na każdy rekord.
+    # Numer wiersza to ID rekordu (menedżery nadają kolejne ID), więc ID nie
+    # zajmują pamięci. Napisy są w listach, liczby w array('i'), wartości logiczne
+    # w bytearray, a powtarzające się napisy (np. autor) jako kody ze słownika
+    # (coded_fields, -1 - brak). Pola spoza schematu (np. "categories") i wartości, które nie
+    # pasują do typu kolumny, trafiają do słownika extra.
+    # Odczyt zwraca RecordView - widok wiersza, który zapisuje zmiany wprost w kolumnach.
+    # Dopisanie wiersza rozszerza kilka kolumn naraz bez zamka - tylko jeden wątek.
+    thread_safe = False
+
+    def __init__(self, text_fields=(), int_fields=(), bool_fields=(), coded_fields=(), dictionary=None):
+        self.text_fields = tuple(text_fields)
+        self.int_fields = tuple(int_fields)
+        self.bool_fields = tuple(bool_fields)
+        self.coded_fields = tuple(coded_fields)
+        self.field_order = self.text_fields + self.coded_fields + self.int_fields + self.bool_fields
+        self.dictionary = dictionary if dictionary is not None else StringDictionary()
+        self.text_columns = {field: [] for field in self.text_fields}
+        self.coded_columns = {field: array("i") for field in self.coded_fields}
+        self.int_columns = {field: array("i") for field in self.int_fields}
+        self.bool_columns = {field: bytearray() for field in self.bool_fields}
+        self.present = bytearray()  # 1 - wiersz zajęty
+        self.extra = {}  # ID -> słownik pól spoza kolumn
+        self.count = 0
+
+    def _grow(self, size):
+        missing = size - len(self.present)
+        if missing <= 0:
+            return
+        self.present.extend(bytes(missing))
+        for column in self.text_columns.values():
+            column.extend([None] * missing)
+        for column in self.coded_columns.values():
+            column.extend(array("i", [-1]) * missing)
+        for column in self.int_columns.values():
+            column.extend(array("i", [MISSING_INT]) * missing)
+        for column in self.bool_columns.values():
+            column.extend(bytes(missing))
+
+    def _row(self, key):
+        if isinstance(key, int) and not isinstance(key, bool) and 0 <= key < len(self.present) and self.present[key]:
+            return key
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        return RecordView(self, self._row(key))
+
+    def __setitem__(self, key, record):
+        if isinstance(record, RecordView) and record.table is self and record.key == key:
+            return  # zmiany z widoku są już w kolumnach
+        if not isinstance(key, int) or isinstance(key, bool) or key < 0:
+            raise KeyError(key)
+        record = dict(record)
+        self._grow(key + 1)
+        if self.present[key]:
+            self._clear(key)
+        else:
+            self.present[key] = 1
+            self.count += 1
+        for field, value in record.items():
+            self.set_field(key, field, value)
+
+    def __delitem__(self, key):
+        row = self._row(key)
+        self._clear(row)
+        self.present[row] = 0
+        self.count -= 1
+
+    def _clear(self, row):
+        for column in self.text_columns.values():
+            column[row] = None
+        for column in self.coded_columns.values():
+            column[row] = -1
+        for column in self.int_columns.values():
+            column[row] = MISSING_INT
+        for column in self.bool_columns.values():
+            column[row] = BOOL_MISSING
+        self.extra.pop(row, None)
+
+    def __contains__(self, key):
+        try:
+            self._row(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return self.keys_after(-1)
+
+    def keys_after(self, after):
+        present = self.present
+        row = present.find(1, after + 1)
+        while row != -1:
+            yield row
+            row = present.find(1, row + 1)
+
+    def __len__(self):
+        return self.count
+
+    def get_field(self, row, field):
+        extra = self.extra.get(row)
+        if extra is not None and field in extra:
+            return extra[field]
+        if field in self.text_columns:
+            value = self.text_columns[field][row]
+            if value is not None:
+                return value
+        elif field in self.coded_columns:
+            code = self.coded_columns[field][row]
+            if code != -1:
+                return self.dictionary.decode(code)
+        elif field in self.int_columns:
+            value = self.int_columns[field][row]
+            if value != MISSING_INT:
+                return value
+        elif field in self.bool_columns:
+            value = self.bool_columns[field][row]
+            if value != BOOL_MISSING:
+                return value == BOOL_TRUE
+        raise KeyError(field)
+
+    def set_field(self, row, field, value):
+        stored = False
+        if field in self.text_columns and isinstance(value, str):
+            self.text_columns[field][row] = value
+            stored = True
+        elif field in self.coded_columns and isinstance(value, str):
+            self.coded_columns[field][row] = self.dictionary.encode(value)
+            stored = True
+        elif field in self.int_columns and type(value) is int and value in INT_RANGE:
+            self.int_columns[field][row] = value
+            stored = True
+        elif field in self.bool_columns and isinstance(value, bool):
+            self.bool_columns[field][row] = BOOL_TRUE if value else BOOL_FALSE
+            stored = True
+
+        if stored:
+            extra = self.extra.get(row)
+            if extra is not None and field in extra:
+                self._drop_extra(row, field)
+            return
+        # wartość nie pasuje do kolumny - czyścimy kolumnę i trzymamy ją osobno
+        self._reset_column(row, field)
+        self.extra.setdefault(row, {})[field] = value
+
+    def delete_field(self, row, field):
+        self.get_field(row, field)  # KeyError, gdy pola nie ma
+        self._reset_column(row, field)
+        if field in self.extra.get(row, ()):
+            self._drop_extra(row, field)
+
+    def _reset_column(self, row, field):
+        if field in self.text_columns:
+            self.text_columns[field][row] = None
+        elif field in self.coded_columns:
+            self.coded_columns[field][row] = -1
+        elif field in self.int_columns:
+            self.int_columns[field][row] = MISSING_INT
+        elif field in self.bool_columns:
+            self.bool_columns[field][row] = BOOL_MISSING
+
+    def _drop_extra(self, row, field):
+        extra = self.extra[row]
+        del extra[field]
+        if not extra:
+            del self.extra[row]
+
+    def fields(self, row):
+        for field in self.field_order:
+            try:
+                self.get_field(row, field)
+            except KeyError:
+                continue
+            yield field
+        for field in self.extra.get(row, ()):
+            if field not in self.field_order:
+                yield field
+
+
+class RecordView(MutableMapping):
+    # Lekki widok jednego wiersza ColumnarTable zachowujący się jak słownik rekordu.
+    __slots__ = ("table", "key")
+
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+
+    def __getitem__(self, field):
+        return self.table.get_field(self.table._row(self.key), field)
+
+    def __setitem__(self, field, value):
+        self.table.set_field(self.table._row(self.key), field, value)
+
+    def __delitem__(self, field):
+        self.table.delete_field(self.table._row(self.key), field)
+
+    def __iter__(self):
+        return self.table.fields(self.table._row(self.key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def columnar_books(dictionary=None):
+    # BookManager(storage=columnar_books()) przejmuje słownik tabeli jako swój
+    return ColumnarTable(text_fields=("title", "isbn"), coded_fields=("author",), int_fields=("year",),
+                         bool_fields=("available",), dictionary=dictionary)
+
+
+def columnar_users():
+    return ColumnarTable(text_fields=("name", "email"))
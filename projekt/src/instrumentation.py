@@ -0,0 +1,26 @@
+import inspect
+
+
+def public_methods(manager):
+    # publiczne metody klasy menedżera; generatory (iter_*) pomijamy - ich
+    # wywołanie tylko tworzy iterator, praca dzieje się dopiero przy czytaniu
+    return [name for name, function in inspect.getmembers(type(manager), inspect.isfunction)
+            if not name.startswith("_") and not inspect.isgeneratorfunction(function)]
+
+
+def wrap_methods(manager, wrap, names=None):
+    # Podmienia klasę jednego obiektu menedżera na podklasę, w której metody to
+    # wrap(nazwa, funkcja klasy). Inne obiekty tej klasy zostają bez zmian, a po
+    # restore_methods obiekt wraca do zwykłej klasy - nie zostaje żaden koszt.
+    # Zwraca poprzednią klasę do przekazania restore_methods.
+    cls = type(manager)
+    namespace = {name: wrap(name, getattr(cls, name))
+                 for name in (names if names is not None else public_methods(manager))}
+    namespace.update(__module__=cls.__module__, __qualname__=cls.__qualname__)
+    manager.__class__ = type(cls.__name__, (cls,), namespace)
+    return cls
+
+
+def restore_methods(manager, previous):
+    # kolejne warstwy (np. metryki i profiler) zdejmujemy w odwrotnej kolejności
+    manager.__class__ = previous
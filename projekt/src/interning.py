@@ -0,0 +1,42 @@
+import threading
+
+
+class StringDictionary:
+    # Kodowanie słownikowe: każda różna wartość (autor, kategoria, status) jest
+    # przechowywana raz i ma stały kod int. Menedżery korzystające z jednego
+    # słownika mają wspólne kody, a filtry równościowe porównują liczby.
+
+    def __init__(self, values=()):
+        self.values = []  # kod -> wartość
+        self.codes = {}  # wartość -> kod
+        self.lock = threading.Lock()  # tylko przy dodawaniu nowej wartości
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+
+    def lookup(self, value):
+        # kod bez dodawania nowej wartości; None, gdy wartość nie występuje
+        return self.codes.get(value)
+
+    def decode(self, code):
+        return self.values[code]
+
+    def intern(self, value):
+        # jedna wspólna kopia napisu dla wszystkich rekordów
+        return self.values[self.encode(value)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.codes
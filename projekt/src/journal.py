@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from collections.abc import MutableMapping
+
+
+class Journal:
+    # Dziennik JSON Lines dopisywany przy każdej zmianie rekordu. Wpis od razu
+    # trafia do systemu (flush), więc awaria samego procesu go nie gubi. fsync -
+    # ochronę przed awarią systemu - wykonujemy grupowo: co group_size wpisów, a
+    # wątek w tle pilnuje, żeby wpis czekał na fsync najwyżej group_interval sekund.
+
+    def __init__(self, path, group_size=64, group_interval=0.05, sequence=0, after_append=None):
+        self.path = path
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.after_append = after_append
+        last_entry = truncate_torn_tail(path)
+        # numer ostatniego wpisu; ciągły także po rotacji pliku za migawką
+        self.sequence = max(sequence, last_entry.get("seq", 0) if last_entry else 0)
+        self.file = open(path, "a", encoding="utf-8", newline="\n")
+        self.pending = 0
+        self.first_pending = None  # chwila dopisania najstarszego wpisu bez fsync
+        self.last_sync = time.monotonic()
+        self.lock = threading.Condition()  # wątek fsync w tle czeka na tym samym zamku
+        self.syncer = None
+        self.closed = False
+
+    def append(self, entry):
+        with self.lock:
+            self.sequence += 1
+            entry["seq"] = self.sequence
+            self.file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.group_size or not self.group_interval:
+                self._sync()
+            elif self.pending == 1:
+                self.first_pending = time.monotonic()
+                if self.syncer is None:
+                    self.syncer = threading.Thread(target=self._sync_loop, name="journal-fsync", daemon=True)
+                    self.syncer.start()
+                self.lock.notify()
+        if self.after_append is not None:
+            self.after_append(self)
+
+    def _sync_loop(self):
+        with self.lock:
+            while not self.closed:
+                if not self.pending:
+                    self.lock.wait()
+                    continue
+                remaining = self.first_pending + self.group_interval - time.monotonic()
+                if remaining > 0:
+                    self.lock.wait(remaining)
+                else:
+                    self._sync()
+
+    def put(self, table, key, record):
+        self.append({"table": table, "key": key, "record": record})
+
+    def delete(self, table, key):
+        self.append({"table": table, "key": key, "deleted": True})
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.first_pending = None
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.lock.notify()
+        if self.syncer is not None:
+            self.syncer.join()
+        with self.lock:
+            self._sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def table(self, name, data=None, max_deleted=0, lock=None):
+        return JournaledTable(self, name, data, max_deleted, lock)
+
+
+class JournaledTable(MutableMapping):
+    # Słownik rekordów, który każde przypisanie i usunięcie zapisuje w dzienniku.
+    # Menedżery po zmianie rekordu w miejscu przypisują go ponownie, np. books[id] = book.
+    # Zmiana słownika i wpis do dziennika idą pod jednym zamkiem (domyślnie zamkiem
+    # dziennika), więc kolejność wpisów zgadza się z kolejnością zmian.
+
+    def __init__(self, journal, name, data=None, max_deleted=0, lock=None):
+        self.journal = journal
+        self.name = name
+        self.data = {} if data is None else data
+        self.max_deleted = max_deleted  # największe usunięte ID - nie może wrócić do użycia
+        self.lock = lock if lock is not None else journal.lock
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, record):
+        with self.lock:
+            self.data[key] = record
+            self.journal.put(self.name, key, record)
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.data[key]
+            if isinstance(key, int) and key > self.max_deleted:
+                self.max_deleted = key
+            self.journal.delete(self.name, key)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def keys(self):
+        return self.data.keys()
+
+    def values(self):
+        return self.data.values()
+
+    def items(self):
+        return self.data.items()
+
+    def next_key(self):
+        return max(self.max_deleted, max(self.data, default=0)) + 1
+
+
+def truncate_torn_tail(path):
+    # obcina niedokończoną ostatnią linię, żeby nowe wpisy nie skleiły się z urwanym,
+    # i zwraca ostatni kompletny wpis (albo None)
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return None
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = None
+        position = size
+        tail = b""
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            if end is None:
+                newline = tail.rfind(b"\n")
+                if newline != -1:
+                    end = position + newline + 1
+                    tail = tail[:newline]
+            if end is not None and b"\n" in tail:
+                break
+        if end is None:
+            end = 0
+        if end != size:
+            f.truncate(end)
+        if end == 0:
+            return None
+        line = tail[tail.rfind(b"\n") + 1:]
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+
+def read_journal(path):
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        previous = None
+        for line_number, line in enumerate(f, 1):
+            if previous is not None:
+                # uszkodzony wpis, po którym są kolejne, to nie urwany zapis - nie zgadujemy
+                raise ValueError(f"Uszkodzony wpis dziennika {path} w linii {previous}")
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                previous = line_number
+                continue
+            yield entry
+        # ostatnia linia urwana w trakcie zapisu jest pomijana
+
+
+def replay_journal(path, tables=None, after_sequence=0, max_deleted=None):
+    # zwraca odtworzone tabele; wpisy o numerze <= after_sequence są już w migawce.
+    # max_deleted (tabela -> największe usunięte ID) uzupełniamy o usunięcia z dziennika
+    tables = {} if tables is None else tables
+    for entry in read_journal(path):
+        if entry.get("seq", after_sequence + 1) <= after_sequence:
+            continue
+        table = tables.setdefault(entry["table"], {})
+        if entry.get("deleted"):
+            table.pop(entry["key"], None)
+            if max_deleted is not None and isinstance(entry["key"], int):
+                max_deleted[entry["table"]] = max(max_deleted.get(entry["table"], 0), entry["key"])
+        else:
+            table[entry["key"]] = entry["record"]
+    return tables
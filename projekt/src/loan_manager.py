@@ -1,36 +1,68 @@
+from src.locking import make_locks, related_locks
+from src.pagination import keys_after, sorted_ids_after, take_page
+from src.snapshots import atomic
+from src.utils import next_key
+
 
 class LoanManager:
-    def __init__(self, book_manager, user_manager):
-        self.loans = {}
-        self.next_id = 1
+    def __init__(self, book_manager, user_manager, storage=None, thread_safe=False):
+        self.loans = storage if storage is not None else {}
+        self.next_id = next_key(self.loans)
         self.book_manager = book_manager
         self.user_manager = user_manager
+        self.active_by_user = {}  # user_id -> {loan_id: None} aktywnych wypożyczeń
+        self.active_by_book = {}  # book_id -> loan_id aktywnego wypożyczenia
+        self.user_history = {}  # user_id -> lista wszystkich loan_id użytkownika
+        # magazyn z własnymi indeksami (SQLite: find_keys) odpowiada na zapytania sam -
+        # bez skanu przy starcie i bez indeksów w pamięci
+        self.find_keys = getattr(self.loans, "find_keys", None)
+        if self.find_keys is None:
+            for loan_id in sorted(self.loans):
+                self._index_loan(loan_id, self.loans[loan_id])
+        # sprawdzenie dostępności i wypożyczenie odbywają się pod zamkiem książki
+        # z BookManager, więc dwa wypożyczenia tej samej książki nie mogą się udać;
+        # kolejność: zamek książki, zamek użytkownika, zamek indeksów (self.lock)
+        _, self.lock = make_locks(thread_safe, self.loans)
+        self.book_locks, self.user_locks = related_locks(book_manager, user_manager, thread_safe)
+
+    def _index_loan(self, loan_id, loan):
+        if self.find_keys is not None:
+            return
+        user_id = loan["user_id"]
+        self.user_history.setdefault(user_id, []).append(loan_id)
+        if not loan["returned"]:
+            self.active_by_user.setdefault(user_id, {})[loan_id] = None
+            self.active_by_book[loan["book_id"]] = loan_id
 
     def loan_book(self, user_id, book_id):
-        try:
-            self.user_manager.get_user(user_id)
-        except ValueError:
-            raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
-
-        try:
-            book = self.book_manager.get_book(book_id)
-        except ValueError:
-            raise ValueError(f"Książka o ID {book_id} nie istnieje")
-
-        if book.get("available") is False:
-            raise ValueError(f"Książka o ID {book_id} jest już wypożyczona")
-
-        book["available"] = False
-
-        loan = {
-            "user_id": user_id,
-            "book_id": book_id,
-            "returned": False
-        }
-
-        loan_id = self.next_id
-        self.loans[loan_id] = loan
-        self.next_id += 1
+        # atomic: migawka widzi książkę niedostępną tylko razem z wypożyczeniem
+        with self.book_locks(book_id), self.user_locks(user_id), atomic(self.loans):
+            try:
+                self.user_manager.get_user(user_id)
+            except ValueError:
+                raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
+
+            try:
+                book = self.book_manager.get_book(book_id)
+            except ValueError:
+                raise ValueError(f"Książka o ID {book_id} nie istnieje")
+
+            if book.get("available") is False:
+                raise ValueError(f"Książka o ID {book_id} jest już wypożyczona")
+
+            self.book_manager.set_available(book_id, False)
+
+            loan = {
+                "user_id": user_id,
+                "book_id": book_id,
+                "returned": False
+            }
+
+            with self.lock:
+                loan_id = self.next_id
+                self.loans[loan_id] = loan
+                self.next_id += 1
+                self._index_loan(loan_id, loan)
 
         return loan_id
 
@@ -38,22 +70,98 @@ class LoanManager:
         if loan_id not in self.loans:
             raise ValueError(f"Wypożyczenie o ID {loan_id} nie istnieje")
 
-        loan = self.loans[loan_id]
+        book_id = self.loans[loan_id]["book_id"]
+        with self.book_locks(book_id), atomic(self.loans):
+            loan = self.loans[loan_id]
 
-        if loan["returned"]:
-            raise ValueError(f"Książka z wypożyczenia o ID {loan_id} została już zwrócona")
+            if loan["returned"]:
+                raise ValueError(f"Książka z wypożyczenia o ID {loan_id} została już zwrócona")
 
-        loan["returned"] = True
+            loan["returned"] = True
+            with self.lock:
+                self.loans[loan_id] = loan
+                self._unindex_active(loan_id, loan)
 
-        book = self.book_manager.get_book(loan["book_id"])
-        book["available"] = True
+            self.book_manager.set_available(book_id, True)
 
         return True
 
+    def _unindex_active(self, loan_id, loan):
+        if self.find_keys is not None:
+            return
+        book_id = loan["book_id"]
+        user_loans = self.active_by_user[loan["user_id"]]
+        del user_loans[loan_id]
+        if not user_loans:
+            del self.active_by_user[loan["user_id"]]
+        if self.active_by_book.get(book_id) == loan_id:
+            del self.active_by_book[book_id]
+
+    def _user_active_ids(self, user_id):
+        if self.find_keys is not None:
+            return self.find_keys("user_id", user_id, returned=False)
+        return list(self.active_by_user.get(user_id, ()))
+
+    def _book_active_id(self, book_id):
+        if self.find_keys is not None:
+            loan_ids = self.find_keys("book_id", book_id, returned=False)
+            return loan_ids[0] if loan_ids else None
+        return self.active_by_book.get(book_id)
+
+    def _user_history_ids(self, user_id):
+        if self.find_keys is not None:
+            return self.find_keys("user_id", user_id)
+        return self.user_history.get(user_id, [])
+
+    def _active_ids(self):
+        # ID aktywnych wypożyczeń rosnąco
+        if self.find_keys is not None:
+            return self.find_keys("returned", False)
+        return sorted(self.active_by_book.values())
+
     def get_loan(self, loan_id):
         if loan_id not in self.loans:
             raise ValueError(f"Wypożyczenie o ID {loan_id} nie istnieje")
         return self.loans[loan_id]
 
     def list_loans(self):
-        return list(self.loans.values())
+        with self.lock:
+            return list(self.loans.values())
+
+    def get_user_active_loans(self, user_id):
+        with self.lock:
+            return [self.loans[loan_id] for loan_id in self._user_active_ids(user_id)]
+
+    def get_book_active_loan(self, book_id):
+        loan_id = self._book_active_id(book_id)
+        return self.loans[loan_id] if loan_id is not None else None
+
+    def get_user_loan_history(self, user_id):
+        with self.lock:
+            return [self.loans[loan_id] for loan_id in self._user_history_ids(user_id)]
+
+    def iter_loans(self, after=0, user_id=None, active=None):
+        # filtr użytkownika idzie przez jego historię (rosnąca lista ID),
+        # a sam filtr active=True przez indeks aktywnych wypożyczeń
+        if user_id is not None:
+            loan_ids = sorted_ids_after(self._user_history_ids(user_id), after)
+        elif active:
+            with self.lock:
+                loan_ids = sorted_ids_after(self._active_ids(), after)
+        else:
+            loan_ids = keys_after(self.loans, after, self.next_id)
+        for loan_id in loan_ids:
+            loan = self.loans.get(loan_id)
+            if loan is None:
+                continue
+            if active is not None and loan["returned"] is active:
+                continue
+            yield loan_id, loan
+
+    def list_loans_page(self, limit=50, cursor=None, user_id=None, active=None):
+        return take_page(self.iter_loans(cursor or 0, user_id, active), limit)
+
+    def count_active_loans(self):
+        if self.find_keys is not None:
+            return len(self.find_keys("returned", False))
+        return len(self.active_by_book)
@@ -0,0 +1,58 @@
+import threading
+
+
+class NoLock:
+    # zamek, który nic nie robi - tryb jednowątkowy nie płaci za synchronizację
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_LOCK = NoLock()
+
+
+class LockTable:
+    # Zamki dla pojedynczych kluczy (ID książki, ID użytkownika). Klucze dzielą
+    # stałą pulę zamków (striping), więc pamięć nie rośnie z liczbą rekordów,
+    # a niezależne klucze zwykle trafiają na różne zamki. Zamki są reentrant,
+    # bo np. LoanManager trzyma zamek książki, wywołując BookManager.set_available.
+    # Wątek trzyma naraz najwyżej jeden zamek z tabeli - dwa klucze mogłyby
+    # trafić na zamki w odwrotnej kolejności niż w innym wątku.
+
+    def __init__(self, stripes=1024):
+        self.locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self.locks[hash(key) % len(self.locks)]
+
+
+class NoLockTable:
+    def __call__(self, key):
+        return NO_LOCK
+
+
+NO_LOCKS = NoLockTable()
+
+
+def make_locks(thread_safe, storage=None):
+    # (zamki rekordów, zamek indeksów menedżera); kolejność pobierania: najpierw
+    # zamek rekordu, potem zamek indeksów - nigdy odwrotnie. Magazyn, który nie
+    # znosi współbieżnych zapisów (thread_safe = False w klasie, np. ColumnarTable),
+    # odrzucamy od razu zamiast psuć dane w trakcie pracy
+    if thread_safe and not getattr(storage, "thread_safe", True):
+        raise ValueError(f"Magazyn {type(storage).__name__} nie obsługuje trybu wielowątkowego")
+    if thread_safe:
+        return LockTable(), threading.RLock()
+    return NO_LOCKS, NO_LOCK
+
+
+def related_locks(book_manager, user_manager, thread_safe):
+    # zamki książek i użytkowników należą do ich menedżerów, żeby wypożyczenia
+    # i rezerwacje tej samej książki wykluczały się nawzajem
+    book_locks = getattr(book_manager, "locks", NO_LOCKS)
+    user_locks = getattr(user_manager, "locks", NO_LOCKS)
+    if thread_safe and (book_locks is NO_LOCKS or user_locks is NO_LOCKS):
+        raise ValueError("Tryb wielowątkowy wymaga BookManager i UserManager z thread_safe=True")
+    return book_locks, user_locks
@@ -0,0 +1,252 @@
+import os
+import threading
+from threading import get_ident
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+from src.instrumentation import restore_methods, wrap_methods
+
+# górne granice przedziałów histogramu czasu wywołania (sekundy)
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                   0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+RESERVATION_STATUSES = ("waiting", "ready", "completed", "cancelled", "expired")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MethodStats:
+    # liczniki jednej metody w jednym wątku - zmienia je tylko ten wątek, więc
+    # pomiar nie bierze zamka (render() sumuje wątki)
+    __slots__ = ("errors", "buckets", "total")
+
+    def __init__(self, bucket_count):
+        self.errors = {}  # nazwa klasy wyjątku -> liczba
+        self.buckets = [0] * (bucket_count + 1)  # ostatni przedział: powyżej największej granicy
+        self.total = 0.0
+
+
+class Metrics:
+    # Opcjonalne metryki menedżerów: liczba wywołań, błędów i histogram czasu każdej
+    # publicznej metody oraz wskaźniki stanu (długość kolejek rezerwacji, aktywne
+    # wypożyczenia, ...). Nic nie jest mierzone, dopóki menedżer nie zostanie
+    # podpięty przez instrument() - wtedy jego metody (tylko tego obiektu) dostają
+    # opakowanie mierzące czas; uninstrument() przywraca je bez śladu.
+    #
+    #   metrics = Metrics()
+    #   metrics.instrument(bm, um, lm, rm)
+    #   metrics.write("/var/lib/node_exporter/library.prom")  # albo metrics.serve(port=9464)
+
+    def __init__(self, buckets=LATENCY_BUCKETS, prefix="library"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.stats = {}  # (menedżer, metoda) -> {ID wątku: MethodStats}
+        self.gauges = []  # (nazwa, opis, funkcja, nazwa etykiety lub None)
+        self.instrumented = {}  # id(menedżera) -> (menedżer, poprzednie metody, wskaźniki)
+        self.server = None
+
+    def instrument(self, *managers):
+        for manager in managers:
+            if id(manager) in self.instrumented:
+                continue
+            label = type(manager).__name__
+            previous = wrap_methods(manager, lambda name, method: self._wrap(label, name, method))
+            gauges = manager_gauges(manager, self.prefix)
+            self.gauges.extend(gauges)
+            self.instrumented[id(manager)] = (manager, previous, gauges)
+
+    def uninstrument(self, *managers):
+        # bez argumentów - wszystkie podpięte menedżery
+        targets = managers or [manager for manager, _, _ in self.instrumented.values()]
+        for manager in targets:
+            entry = self.instrumented.pop(id(manager), None)
+            if entry is None:
+                continue
+            _, previous, gauges = entry
+            restore_methods(manager, previous)
+            self.gauges = [gauge for gauge in self.gauges if gauge not in gauges]
+
+    def _wrap(self, label, name, function):
+        with self.lock:
+            shards = self.stats.setdefault((label, name), {})
+        buckets = self.buckets
+
+        @wraps(function)
+        def measured(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception as error:
+                errors = self._shard(shards).errors
+                errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+                raise
+            finally:
+                elapsed = perf_counter() - start
+                stats = shards.get(get_ident()) or self._shard(shards)
+                stats.total += elapsed
+                stats.buckets[bisect_left(buckets, elapsed)] += 1
+        return measured
+
+    def _shard(self, shards):
+        stats = shards.get(get_ident())
+        if stats is None:
+            with self.lock:
+                stats = shards[get_ident()] = MethodStats(len(self.buckets))
+        return stats
+
+    def gauge(self, name, help_text, function, label=None):
+        # function() zwraca liczbę albo - z label - słownik {wartość etykiety: liczba}
+        self.gauges.append((name, help_text, function, label))
+
+    def reset(self):
+        with self.lock:
+            for shards in self.stats.values():
+                shards.clear()
+
+    def render(self):
+        # format tekstowy Prometheusa (wersja 0.0.4)
+        stats = []
+        with self.lock:
+            for key, shards in sorted(self.stats.items()):
+                buckets, errors, total = [0] * (len(self.buckets) + 1), {}, 0.0
+                for shard in list(shards.values()):
+                    buckets = [a + b for a, b in zip(buckets, shard.buckets)]
+                    for error, count in list(shard.errors.items()):
+                        errors[error] = errors.get(error, 0) + count
+                    total += shard.total
+                # liczba wywołań to suma przedziałów - zgodna z kubełkiem +Inf
+                stats.append((key, sum(buckets), errors, buckets, total))
+        prefix = self.prefix
+        lines = [f"# HELP {prefix}_calls_total Liczba wywołań metod menedżerów.",
+                 f"# TYPE {prefix}_calls_total counter"]
+        for (manager, method), calls, _, _, _ in stats:
+            lines.append(f"{prefix}_calls_total{format_labels([('manager', manager), ('method', method)])} {calls}")
+
+        lines += [f"# HELP {prefix}_errors_total Liczba wywołań zakończonych wyjątkiem.",
+                  f"# TYPE {prefix}_errors_total counter"]
+        for (manager, method), _, errors, _, _ in stats:
+            for error, count in sorted(errors.items()):
+                labels = format_labels([("manager", manager), ("method", method), ("error", error)])
+                lines.append(f"{prefix}_errors_total{labels} {count}")
+
+        lines += [f"# HELP {prefix}_call_duration_seconds Czas wywołania metod menedżerów.",
+                  f"# TYPE {prefix}_call_duration_seconds histogram"]
+        for (manager, method), calls, _, buckets, total in stats:
+            labels = [("manager", manager), ("method", method)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), buckets):
+                cumulative += count
+                bucket_labels = format_labels(labels + [("le", format_value(float(bound)))])
+                lines.append(f"{prefix}_call_duration_seconds_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{prefix}_call_duration_seconds_sum{format_labels(labels)} {format_value(total)}")
+            lines.append(f"{prefix}_call_duration_seconds_count{format_labels(labels)} {calls}")
+
+        for name, help_text, function, label in self.gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            value = function()
+            if label is None:
+                lines.append(f"{name} {format_value(value)}")
+            else:
+                for label_value, number in sorted(value.items()):
+                    lines.append(f"{name}{format_labels([(label, label_value)])} {format_value(number)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path):
+        # zapis przez plik tymczasowy i rename - kolektor plików tekstowych
+        # (node_exporter) nigdy nie przeczyta połowy pliku
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self.render())
+        os.replace(tmp_path, file_path)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        # lokalny endpoint GET /metrics w wątku w tle; port=0 - dowolny wolny port
+        if self.server is not None:
+            raise ValueError("Serwer metryk już działa")
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # bez wpisu na stderr przy każdym odczycie
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+        return self.server.server_address
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def manager_gauges(manager, prefix):
+    # wskaźniki stanu zależne od rodzaju menedżera (rozpoznajemy po atrybutach)
+    gauges = []
+    if hasattr(manager, "books"):
+        gauges.append((f"{prefix}_books", "Liczba książek w katalogu.", lambda: len(manager.books), None))
+    if hasattr(manager, "users"):
+        gauges.append((f"{prefix}_users", "Liczba czytelników.", lambda: len(manager.users), None))
+    if hasattr(manager, "count_active_loans"):
+        gauges.append((f"{prefix}_active_loans", "Aktywne wypożyczenia.", manager.count_active_loans, None))
+    if hasattr(manager, "book_queues") and manager.find_keys is None:
+        gauges += [
+            (f"{prefix}_reservation_queues", "Książki z niepustą kolejką rezerwacji.",
+             lambda: queue_lengths(manager)[0], None),
+            (f"{prefix}_reservation_queue_length_total", "Rezerwacje czekające we wszystkich kolejkach.",
+             lambda: queue_lengths(manager)[1], None),
+            (f"{prefix}_reservation_queue_length_max", "Długość najdłuższej kolejki rezerwacji.",
+             lambda: queue_lengths(manager)[2], None),
+        ]
+    if hasattr(manager, "book_queues"):
+        gauges.append((f"{prefix}_reservations", "Rezerwacje według statusu.",
+                       lambda: reservation_statuses(manager), "status"))
+    if hasattr(manager, "categories"):
+        gauges.append((f"{prefix}_categories", "Liczba kategorii.", lambda: len(manager.categories), None))
+    return gauges
+
+
+def queue_lengths(manager):
+    # (kolejki niepuste, suma długości, najdłuższa); pod zamkiem indeksów menedżera
+    with manager.lock:
+        lengths = [len(queue) for queue in manager.book_queues.values()]
+    lengths = [length for length in lengths if length]
+    return len(lengths), sum(lengths), max(lengths, default=0)
+
+
+def reservation_statuses(manager):
+    if manager.find_keys is not None:
+        # magazyn z indeksem statusu (SQLite) - kolejki i indeksy nie są w pamięci
+        counts = {status: len(manager.find_keys("status", status)) for status in RESERVATION_STATUSES}
+        return {status: count for status, count in counts.items() if count}
+    with manager.lock:
+        return {manager.dictionary.decode(code): len(ids) for code, ids in manager.status_index.items() if ids}
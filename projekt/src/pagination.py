@@ -0,0 +1,41 @@
+from bisect import bisect_right
+from itertools import islice
+
+
+class Page:
+    # Strona wyników: items to pary (ID, rekord) rosnąco po ID; next_cursor
+    # przekazujemy jako cursor po następną stronę (None - to ostatnia strona).
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keys_after(records, after, end):
+    # ID większe od after w kolejności rosnącej. Magazyn może podać je sam
+    # (np. SQLite przez WHERE key > ?); dla słownika idziemy po zakresie ID,
+    # bo menedżery nadają kolejne ID - koszt zależy od strony, nie od rozmiaru tabeli
+    own_keys_after = getattr(records, "keys_after", None)
+    if own_keys_after is not None:
+        return own_keys_after(after)
+    return (key for key in range(after + 1, end) if key in records)
+
+
+def sorted_ids_after(sorted_ids, after):
+    # indeksy trzymane jako rosnące listy ID (np. historia użytkownika)
+    return islice(sorted_ids, bisect_right(sorted_ids, after), None)
+
+
+def take_page(pairs, limit):
+    if not isinstance(limit, int) or limit <= 0:
+        raise ValueError("Rozmiar strony musi być dodatnią liczbą całkowitą")
+    items = list(islice(pairs, limit + 1))
+    if len(items) > limit:
+        return Page(items[:limit], items[limit - 1][0])
+    return Page(items, None)
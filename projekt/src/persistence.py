@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+from src.journal import Journal, replay_journal
+from src.utils import write_json_atomic
+
+
+class LibraryStore:
+    # Katalog z migawką całego stanu (snapshot.json) i dziennikiem zmian od tej
+    # migawki (journal.jsonl). Start to wczytanie migawki i odtworzenie ogona dziennika.
+    # Zapisy tabel, migawka i podmiana dziennika idą pod jednym zamkiem magazynu
+    # (lock), więc tabel można używać z wielu wątków (menedżery z thread_safe=True).
+
+    def __init__(self, directory, snapshot_every=10000, group_size=64, group_interval=0.05):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        self.snapshot_every = snapshot_every
+        self.group_size = group_size
+        self.group_interval = group_interval
+
+        self.tables, self.snapshot_sequence, self.max_deleted = load_snapshot(self.snapshot_path)
+        replay_journal(self.journal_path, self.tables, after_sequence=self.snapshot_sequence,
+                       max_deleted=self.max_deleted)
+        self.journal = self._open_journal(self.snapshot_sequence)
+        self.views = {}
+        self.lock = threading.RLock()  # reentrant: migawka startuje z wnętrza zapisu
+
+    def _open_journal(self, sequence):
+        return Journal(self.journal_path, group_size=self.group_size,
+                       group_interval=self.group_interval, sequence=sequence,
+                       after_append=self._after_append)
+
+    def table(self, name):
+        with self.lock:
+            if name not in self.views:
+                self.views[name] = self.journal.table(name, self.tables.setdefault(name, {}),
+                                                      self.max_deleted.get(name, 0), self.lock)
+            return self.views[name]
+
+    def _after_append(self, journal):
+        if self.snapshot_every and journal.sequence - self.snapshot_sequence >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        # pod zamkiem magazynu: żaden wątek nie zmienia tabel ani nie dopisuje do
+        # dziennika, gdy czytamy tabele i podmieniamy plik dziennika
+        with self.lock:
+            journal = self.journal
+            journal.sync()
+            sequence = journal.sequence
+            for name, view in self.views.items():
+                if view.max_deleted:
+                    self.max_deleted[name] = view.max_deleted
+            # pary [klucz, rekord] zachowują typ klucza (int dla ID, str dla kategorii);
+            # max_deleted pilnuje, żeby ID usuniętych rekordów nie wróciły po restarcie
+            data = {
+                "sequence": sequence,
+                "tables": {name: [[key, record] for key, record in table.items()]
+                           for name, table in self.tables.items()},
+            }
+            if self.max_deleted:
+                data["max_deleted"] = self.max_deleted
+            write_json_atomic(data, self.snapshot_path)
+            self.snapshot_sequence = sequence
+
+            # wpisy z numerem <= sequence są już w migawce; awaria przed obcięciem
+            # dziennika jest bezpieczna, bo przy starcie zostaną pominięte
+            journal.close()
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+            self.journal = self._open_journal(sequence)
+            for view in self.views.values():
+                view.journal = self.journal
+
+    def sync(self):
+        with self.lock:
+            self.journal.sync()
+
+    def close(self):
+        with self.lock:
+            self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_snapshot(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}, 0, {}
+    except json.JSONDecodeError as error:
+        raise ValueError(f"Uszkodzona migawka {path}: {error}") from error
+    tables = {name: {key: record for key, record in pairs}
+              for name, pairs in data["tables"].items()}
+    return tables, data["sequence"], data.get("max_deleted", {})
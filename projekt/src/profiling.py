@@ -0,0 +1,256 @@
+import cProfile
+import heapq
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from functools import wraps
+from itertools import count
+from threading import get_ident
+from time import perf_counter
+
+from src.instrumentation import restore_methods, wrap_methods
+
+
+def size_class(size):
+    # rząd wielkości zamiast dokładnej liczby - wywołania o podobnym rozmiarze trafiają do jednej grupy
+    if size == 0:
+        return "0"
+    low = 10 ** (len(str(size)) - 1)
+    return f"{low}-{low * 10 - 1}"
+
+
+def shape(value):
+    if isinstance(value, (str, bytes)):
+        return type(value).__name__
+    if hasattr(value, "__len__"):
+        return f"{type(value).__name__}[{size_class(len(value))}]"
+    return type(value).__name__
+
+
+def call_tag(label, name, args, kwargs, result, error):
+    # np. "BookManager.find_books_by_title(str)->list[10-99]"
+    arguments = [shape(arg) for arg in args] + [f"{key}={shape(value)}" for key, value in kwargs.items()]
+    outcome = f"raise {type(error).__name__}" if error is not None else shape(result)
+    return f"{label}.{name}({','.join(arguments)})->{outcome}"
+
+
+def frame_label(file_name, line, function_name):
+    if file_name == "~":  # funkcje wbudowane w danych cProfile
+        return function_name
+    return f"{function_name} ({os.path.basename(file_name)}:{line})"
+
+
+def code_label(code):
+    return frame_label(code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def write_collapsed(stacks, file_path):
+    # format "ramka;ramka;ramka liczba" - czytają go flamegraph.pl, speedscope, inferno
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        for stack, weight in sorted(stacks.items()):
+            f.write(f"{';'.join(stack)} {weight}\n")
+    os.replace(tmp_path, file_path)
+
+
+def profile_stacks(profile, function):
+    # cProfile zna tylko krawędzie wywołujący -> wywoływany, więc czas funkcji
+    # wywoływanej z kilku miejsc dzielimy proporcjonalnie do czasu na każdej
+    # krawędzi (jak flameprof); rekurencja jest ucinana. Wagi w mikrosekundach.
+    stats = pstats.Stats(profile).stats
+    callees = {}
+    for callee, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((callee, edge[3]))
+    code = function.__code__
+    root = (code.co_filename, code.co_firstlineno, code.co_name)
+    stacks = Counter()
+
+    def walk(key, share, path):
+        _, _, own, total, _ = stats[key]
+        scale = share / total if total else 0.0
+        path = path + (frame_label(*key),)
+        stacks[path] += own * scale
+        for callee, edge_time in callees.get(key, ()):
+            if callee in stats and frame_label(*callee) not in path:
+                walk(callee, edge_time * scale, path)
+
+    if root in stats:
+        walk(root, stats[root][3], ())
+    return Counter({stack: round(seconds * 1e6) for stack, seconds in stacks.items() if round(seconds * 1e6)})
+
+
+class Profiler:
+    # Profilowanie menedżerów włączane w działającym programie, w dwóch trybach:
+    #   sample(duration)     - wątek w tle co interval sekund zbiera stosy wątków
+    #                          będących w metodzie menedżera (próbkowanie, niski koszt)
+    #   capture_slowest(n)   - każde wywołanie działa pod cProfile; zostaje n najwolniejszych
+    # Stosy są oznaczone metodą i kształtem argumentów oraz wyniku (np. rozmiarem
+    # listy), więc w flamegraphie skan katalogu i przegląd rezerwacji to osobne
+    # wieże. Poza trybem metody menedżerów nie są opakowane - profiler nic nie kosztuje.
+    #
+    #   profiler = Profiler(bm, lm, rm)
+    #   profiler.sample(duration=30)          # albo: with profiler.sample(): ...
+    #   ...
+    #   profiler.write_samples("library.folded")   # flamegraph.pl library.folded > library.svg
+
+    def __init__(self, *managers):
+        self.managers = managers
+        self.lock = threading.Lock()
+        self.local = threading.local()  # czy wątek jest już w metodzie menedżera
+        self.mode = None
+        self.previous = []  # (menedżer, poprzednia klasa)
+        self.active = {}  # ID wątku -> próbki bieżącego wywołania
+        self.samples = Counter()  # stos -> liczba próbek
+        self.slowest = []  # kopiec (czas, kolejność, znacznik, profil, funkcja)
+        self.limit = 0
+        self.order = count()
+        self.stopped = None
+        self.sampler = None
+        self.timer = None
+
+    def sample(self, duration=None, interval=0.005):
+        # interval poniżej sys.getswitchinterval() niewiele daje - wątek próbkujący
+        # musi dostać GIL od wątku liczącego
+        self._start("sample", duration)
+        self.samples = Counter()
+        self.sampler = threading.Thread(target=self._sample_loop, args=(interval, self.stopped),
+                                        name="profiler", daemon=True)
+        self.sampler.start()
+        return self
+
+    def capture_slowest(self, n=10, duration=None):
+        self._start("slowest", duration)
+        self.slowest = []
+        self.limit = n
+        return self
+
+    def _start(self, mode, duration):
+        if self.mode is not None:
+            raise ValueError("Profilowanie już trwa")
+        self.mode = mode
+        self.stopped = threading.Event()
+        for manager in self.managers:
+            label = type(manager).__name__
+            self.previous.append((manager, wrap_methods(
+                manager, lambda name, function: self._wrap(mode, label, name, function))))
+        if duration is not None:
+            self.timer = threading.Timer(duration, self.stop)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def stop(self):
+        if self.mode is None:
+            return
+        self.mode = None
+        self.stopped.set()
+        while self.previous:
+            restore_methods(*self.previous.pop())
+        if self.timer is not None and self.timer is not threading.current_thread():
+            self.timer.cancel()
+        self.timer = None
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _wrap(self, mode, label, name, function):
+        local = self.local
+
+        @wraps(function)
+        def profiled(*args, **kwargs):
+            if getattr(local, "busy", False):
+                # wywołanie zagnieżdżone (np. set_available z loan_book) należy do zewnętrznego
+                return function(*args, **kwargs)
+            local.busy = True
+            result = error = profile = None
+            if mode == "sample":
+                samples = []
+                with self.lock:
+                    self.active[get_ident()] = samples
+            else:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    profile = None  # inny profiler już działa (Python 3.12+) - zostaje sam czas
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+                return result
+            except Exception as exc:
+                error = exc
+                raise
+            finally:
+                elapsed = perf_counter() - start
+                if profile is not None:
+                    profile.disable()
+                local.busy = False
+                tag = call_tag(label, name, args[1:], kwargs, result, error)
+                with self.lock:
+                    if mode == "sample":
+                        del self.active[get_ident()]
+                        for stack in samples:
+                            self.samples[(tag,) + stack] += 1
+                    else:
+                        entry = (elapsed, next(self.order), tag, profile, function)
+                        if len(self.slowest) < self.limit:
+                            heapq.heappush(self.slowest, entry)
+                        elif self.slowest and elapsed > self.slowest[0][0]:
+                            heapq.heapreplace(self.slowest, entry)
+        return profiled
+
+    def _sample_loop(self, interval, stopped):
+        while not stopped.wait(interval):
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, samples in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples.append(self._collapse(frame))
+
+    def _collapse(self, frame):
+        # stos od metody menedżera do bieżącej ramki; ramki opakowań (profiled)
+        # pomijamy, a wszystko nad najbardziej zewnętrznym z nich to kod wywołujący
+        stack, cut = [], 0
+        while frame is not None:
+            if frame.f_code.co_name == "profiled" and frame.f_code.co_filename == __file__:
+                cut = len(stack)
+            else:
+                stack.append(code_label(frame.f_code))
+            frame = frame.f_back
+        return tuple(reversed(stack[:cut]))
+
+    def slowest_calls(self):
+        # [(czas w sekundach, znacznik, pstats.Stats lub None)], od najwolniejszego
+        with self.lock:
+            entries = sorted(self.slowest, reverse=True)
+        return [(elapsed, tag, pstats.Stats(profile) if profile is not None else None)
+                for elapsed, _, tag, profile, _ in entries]
+
+    def write_samples(self, file_path):
+        # waga stosu to liczba próbek
+        with self.lock:
+            stacks = Counter(self.samples)
+        write_collapsed(stacks, file_path)
+
+    def write_slowest(self, file_path):
+        # każde wywołanie to osobna wieża "znacznik czas"; wagi w mikrosekundach
+        with self.lock:
+            entries = sorted(self.slowest, reverse=True)
+        stacks = Counter()
+        for elapsed, _, tag, profile, function in entries:
+            root = f"{tag} {elapsed * 1000:.2f}ms"
+            if profile is None:
+                stacks[(root,)] += round(elapsed * 1e6)
+                continue
+            for stack, weight in profile_stacks(profile, function).items():
+                stacks[(root,) + stack] += weight
+        write_collapsed(stacks, file_path)
@@ -1,15 +1,68 @@
+import heapq
 from datetime import datetime, timedelta
 
+from src.interning import StringDictionary
+from src.locking import make_locks, related_locks
+from src.pagination import keys_after, sorted_ids_after, take_page
+from src.snapshots import atomic
+from src.reservation_queue import ReservationQueue
+from src.utils import next_key
+
+ACTIVE_STATUSES = ("waiting", "ready")
+
+
 class ReservationManager:
-    def __init__(self, book_manager, user_manager):
-        self.reservations = {}
-        self.next_id = 1
+    def __init__(self, book_manager, user_manager, storage=None, thread_safe=False):
+        self.reservations = storage if storage is not None else {}
+        self.next_id = next_key(self.reservations)
         self.book_manager = book_manager
         self.user_manager = user_manager
         self.book_queues = {}
         self.reservation_expiry_days = 3
+        self.active_reservations = set()  # pary (user_id, book_id) z rezerwacją waiting/ready
+        self.expiry_heap = []  # kopiec (termin wygaśnięcia, ID rezerwacji, termin w ISO)
+        self.heap_expiry = {}  # ID rezerwacji -> ostatni termin (ISO) wstawiony do kopca
+        self.user_index = {}  # user_id -> lista ID rezerwacji
+        self.book_index = {}  # book_id -> lista ID rezerwacji
+        dictionary = getattr(book_manager, "dictionary", None)
+        self.dictionary = dictionary if dictionary is not None else StringDictionary()
+        self.status_index = {}  # kod statusu -> zbiór ID rezerwacji
+        # magazyn z własnymi indeksami (SQLite: find_keys) zastępuje kolejki i indeksy
+        # w pamięci; przy starcie czytamy tylko gotowe rezerwacje (kopiec terminów)
+        self.find_keys = getattr(self.reservations, "find_keys", None)
+        if self.find_keys is None:
+            for reservation_id in sorted(self.reservations):
+                self._index_reservation(reservation_id, self.reservations[reservation_id])
+        else:
+            for reservation_id in self.find_keys("status", "ready"):
+                self._index_reservation(reservation_id, self.reservations[reservation_id])
+        # thread_safe: rezerwacja powstaje pod zamkami książki i użytkownika, a kolejki,
+        # indeksy i kopiec terminów zmieniamy pod krótkim zamkiem self.lock
+        _, self.lock = make_locks(thread_safe, self.reservations)
+        self.book_locks, self.user_locks = related_locks(book_manager, user_manager, thread_safe)
+
+    def _index_reservation(self, reservation_id, reservation):
+        user_id = reservation["user_id"]
+        book_id = reservation["book_id"]
+        status = reservation["status"]
+        if status == "ready" and "expiry_date" in reservation:
+            self._push_expiry(reservation_id, reservation["expiry_date"])
+        if self.find_keys is not None:
+            return
+        self.user_index.setdefault(user_id, []).append(reservation_id)
+        self.book_index.setdefault(book_id, []).append(reservation_id)
+        self.status_index.setdefault(self.dictionary.encode(status), set()).add(reservation_id)
+        if status in ACTIVE_STATUSES:
+            self.active_reservations.add((user_id, book_id))
+            if book_id not in self.book_queues:
+                self.book_queues[book_id] = ReservationQueue()
+            self.book_queues[book_id].append(reservation_id)
 
     def reserve_book(self, user_id, book_id):
+        with self.book_locks(book_id), self.user_locks(user_id):
+            return self._reserve_book(user_id, book_id)
+
+    def _reserve_book(self, user_id, book_id):
         try:
             self.user_manager.get_user(user_id)
         except ValueError:
@@ -23,45 +76,84 @@ class ReservationManager:
         if book.get("available") is True:
             raise ValueError(f"Książka o ID {book_id} jest już dostępna, można ją wypożyczyć zamiast rezerwować")
 
-        for res_id, res in self.reservations.items():
-            if res["user_id"] == user_id and res["book_id"] == book_id and res["status"] in ["waiting", "ready"]:
-                raise ValueError(f"Użytkownik o ID {user_id} już zarezerwował książkę o ID {book_id}")
-
         reservation = {
             "user_id": user_id,
             "book_id": book_id,
-            "status": "waiting",  # waiting, ready, completed, cancelled
+            "status": self.dictionary.intern("waiting"),  # waiting, ready, completed, cancelled
             "reservation_date": datetime.now().isoformat(),
             "notification_sent": False
         }
 
-        reservation_id = self.next_id
-        self.reservations[reservation_id] = reservation
-        self.next_id += 1
+        with self.lock:
+            if self._has_active(user_id, book_id):
+                raise ValueError(f"Użytkownik o ID {user_id} już zarezerwował książkę o ID {book_id}")
 
-        if book_id not in self.book_queues:
-            self.book_queues[book_id] = []
-        self.book_queues[book_id].append(reservation_id)
+            reservation_id = self.next_id
+            self.reservations[reservation_id] = reservation
+            self.next_id += 1
+            self._index_reservation(reservation_id, reservation)
 
         return reservation_id
 
     def cancel_reservation(self, reservation_id):
-        if reservation_id not in self.reservations:
-            raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
+        with self.lock:
+            if reservation_id not in self.reservations:
+                raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
 
-        reservation = self.reservations[reservation_id]
-        book_id = reservation["book_id"]
+            reservation = self.reservations[reservation_id]
 
-        if reservation["status"] not in ["waiting", "ready"]:
-            raise ValueError(f"Nie można anulować rezerwacji o statusie {reservation['status']}")
+            if reservation["status"] not in ACTIVE_STATUSES:
+                raise ValueError(f"Nie można anulować rezerwacji o statusie {reservation['status']}")
 
-        reservation["status"] = "cancelled"
-        reservation["cancel_date"] = datetime.now().isoformat()
+            self._close_reservation(reservation_id, reservation, "cancelled", "cancel_date")
 
-        if book_id in self.book_queues and reservation_id in self.book_queues[book_id]:
-            self.book_queues[book_id].remove(reservation_id)
+            return True
 
-        return True
+    def _set_status(self, reservation_id, reservation, status):
+        code = self.dictionary.encode(status)
+        if self.find_keys is None:
+            self.status_index[self.dictionary.encode(reservation["status"])].discard(reservation_id)
+            self.status_index.setdefault(code, set()).add(reservation_id)
+        reservation["status"] = self.dictionary.decode(code)
+
+    def _close_reservation(self, reservation_id, reservation, status, date_field=None):
+        book_id = reservation["book_id"]
+        self._set_status(reservation_id, reservation, status)
+        if date_field is not None:
+            reservation[date_field] = datetime.now().isoformat()
+        self.reservations[reservation_id] = reservation
+        if self.find_keys is None:
+            self.active_reservations.discard((reservation["user_id"], book_id))
+            if book_id in self.book_queues:
+                self.book_queues[book_id].remove(reservation_id)
+
+    def _has_active(self, user_id, book_id):
+        if self.find_keys is not None:
+            return bool(self.find_keys("user_id", user_id, book_id=book_id, status=ACTIVE_STATUSES))
+        return (user_id, book_id) in self.active_reservations
+
+    def _ids(self, field, value):
+        # ID rezerwacji rosnąco według user_id, book_id albo status
+        if self.find_keys is not None:
+            return self.find_keys(field, value)
+        if field == "status":
+            return sorted(self.status_index.get(self.dictionary.lookup(value), ()))
+        index = self.user_index if field == "user_id" else self.book_index
+        return index.get(value, [])
+
+    def _queue_first(self, book_id):
+        if self.find_keys is not None:
+            queue = self.find_keys("book_id", book_id, status=ACTIVE_STATUSES)
+            return queue[0] if queue else None
+        queue = self.book_queues.get(book_id)
+        return queue.first() if queue is not None else None
+
+    def _queue_position(self, book_id, reservation_id):
+        if self.find_keys is not None:
+            queue = self.find_keys("book_id", book_id, status=ACTIVE_STATUSES)
+            return queue.index(reservation_id) + 1 if reservation_id in queue else -1
+        queue = self.book_queues.get(book_id)
+        return queue.position(reservation_id) if queue is not None else -1
 
     def get_reservation(self, reservation_id):
         if reservation_id not in self.reservations:
@@ -69,80 +161,147 @@ class ReservationManager:
         return self.reservations[reservation_id]
 
     def list_reservations(self, status=None):
-        if status:
-            return [res for res_id, res in self.reservations.items()
-                  if res["status"] == status]
-        return list(self.reservations.values())
+        with self.lock:
+            if status:
+                return [self.reservations[res_id] for res_id in self._ids("status", status)]
+            return list(self.reservations.values())
+
+    def iter_reservations(self, after=0, status=None, user_id=None, book_id=None):
+        # najpierw indeks użytkownika lub książki (rosnące listy ID), potem statusu;
+        # pozostałe filtry sprawdzamy na rekordzie
+        if user_id is not None:
+            reservation_ids = sorted_ids_after(self._ids("user_id", user_id), after)
+        elif book_id is not None:
+            reservation_ids = sorted_ids_after(self._ids("book_id", book_id), after)
+        elif status is not None:
+            with self.lock:
+                reservation_ids = sorted_ids_after(self._ids("status", status), after)
+        else:
+            reservation_ids = keys_after(self.reservations, after, self.next_id)
+        for reservation_id in reservation_ids:
+            reservation = self.reservations.get(reservation_id)
+            if reservation is None:
+                continue
+            if ((status is not None and reservation["status"] != status)
+                    or (user_id is not None and reservation["user_id"] != user_id)
+                    or (book_id is not None and reservation["book_id"] != book_id)):
+                continue
+            yield reservation_id, reservation
+
+    def list_reservations_page(self, limit=50, cursor=None, status=None, user_id=None, book_id=None):
+        return take_page(self.iter_reservations(cursor or 0, status, user_id, book_id), limit)
 
     def get_user_reservations(self, user_id):
-        return [res for res_id, res in self.reservations.items()
-              if res["user_id"] == user_id]
+        with self.lock:
+            return [self.reservations[res_id] for res_id in self._ids("user_id", user_id)]
 
     def get_book_reservations(self, book_id):
-        return [res for res_id, res in self.reservations.items()
-              if res["book_id"] == book_id]
+        with self.lock:
+            return [self.reservations[res_id] for res_id in self._ids("book_id", book_id)]
 
     def book_returned(self, book_id):
-        if book_id not in self.book_queues or not self.book_queues[book_id]:
+        with self.lock, atomic(self.reservations):
+            return self._mark_next_ready(book_id, datetime.now())
+
+    def _mark_next_ready(self, book_id, now):
+        next_reservation_id = self._queue_first(book_id)
+        if next_reservation_id is None:
             return False
 
-        next_reservation_id = self.book_queues[book_id][0]
         next_reservation = self.reservations[next_reservation_id]
 
-        next_reservation["status"] = "ready"
-        next_reservation["ready_date"] = datetime.now().isoformat()
-        next_reservation["expiry_date"] = (datetime.now() + timedelta(days=self.reservation_expiry_days)).isoformat()
+        expiry_date = now + timedelta(days=self.reservation_expiry_days)
+        self._set_status(next_reservation_id, next_reservation, "ready")
+        next_reservation["ready_date"] = now.isoformat()
+        next_reservation["expiry_date"] = expiry_date.isoformat()
         next_reservation["notification_sent"] = True
+        self.reservations[next_reservation_id] = next_reservation
+        self._push_expiry(next_reservation_id, next_reservation["expiry_date"])
 
         return next_reservation_id
 
-    def check_expired_reservations(self):
-        now = datetime.now()
-        expired_reservations = []
-
-        for res_id, res in self.reservations.items():
-            if res["status"] == "ready" and "expiry_date" in res:
-                expiry_date = datetime.fromisoformat(res["expiry_date"])
-                if now > expiry_date:
-                    res["status"] = "expired"
-                    book_id = res["book_id"]
-                    if book_id in self.book_queues and res_id in self.book_queues[book_id]:
-                        self.book_queues[book_id].remove(res_id)
-                    expired_reservations.append(res_id)
-
-                    self.book_returned(book_id)
-
-        return expired_reservations
+    def _push_expiry(self, reservation_id, expiry_date):
+        self.heap_expiry[reservation_id] = expiry_date
+        heapq.heappush(self.expiry_heap, (datetime.fromisoformat(expiry_date), reservation_id, expiry_date))
+
+    def _is_current_expiry(self, entry):
+        # wpis jest nieaktualny, gdy rezerwacja zmieniła status albo dostała nowy termin;
+        # gotowa rezerwacja z innym terminem dostaje wtedy nowy wpis, żeby nie utknąć
+        _, reservation_id, expiry_date = entry
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None or reservation["status"] != "ready":
+            if self.heap_expiry.get(reservation_id) == expiry_date:
+                del self.heap_expiry[reservation_id]
+            return False
+        current = reservation.get("expiry_date")
+        if current == expiry_date:
+            return True
+        if current is not None and self.heap_expiry.get(reservation_id) != current:
+            self._push_expiry(reservation_id, current)
+        return False
+
+    def set_expiry_date(self, reservation_id, expiry_date):
+        # zmiana terminu odbioru gotowej rezerwacji; termin zmieniony wprost w rekordzie
+        # działa tylko przy przesunięciu na później (stary wpis w kopcu wstawi nowy)
+        with self.lock:
+            if reservation_id not in self.reservations:
+                raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
+            reservation = self.reservations[reservation_id]
+            if reservation["status"] != "ready":
+                raise ValueError(f"Tylko rezerwacje o statusie 'ready' mają termin odbioru")
+            reservation["expiry_date"] = expiry_date.isoformat()
+            self.reservations[reservation_id] = reservation
+            self._push_expiry(reservation_id, reservation["expiry_date"])
+            return True
+
+    def next_expiry(self):
+        with self.lock:
+            heap = self.expiry_heap
+            while heap and not self._is_current_expiry(heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def check_expired_reservations(self, now=None):
+        with self.lock, atomic(self.reservations):
+            if now is None:
+                now = datetime.now()
+            expired_reservations = []
+            heap = self.expiry_heap
+
+            while heap and heap[0][0] < now:
+                entry = heapq.heappop(heap)
+                if not self._is_current_expiry(entry):
+                    continue
+
+                res_id = entry[1]
+                res = self.reservations[res_id]
+                self._close_reservation(res_id, res, "expired")
+                del self.heap_expiry[res_id]
+                expired_reservations.append(res_id)
+
+                # okno odbioru kolejnej osoby liczymy od chwili przeglądu
+                self._mark_next_ready(res["book_id"], now)
+
+            return expired_reservations
 
     def complete_reservation(self, reservation_id):
-        if reservation_id not in self.reservations:
-            raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
-
-        reservation = self.reservations[reservation_id]
-        book_id = reservation["book_id"]
+        with self.lock:
+            if reservation_id not in self.reservations:
+                raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
 
-        if reservation["status"] != "ready":
-            raise ValueError(f"Tylko rezerwacje o statusie 'ready' mogą być zrealizowane")
+            reservation = self.reservations[reservation_id]
 
-        reservation["status"] = "completed"
-        reservation["completion_date"] = datetime.now().isoformat()
+            if reservation["status"] != "ready":
+                raise ValueError(f"Tylko rezerwacje o statusie 'ready' mogą być zrealizowane")
 
-        if book_id in self.book_queues and reservation_id in self.book_queues[book_id]:
-            self.book_queues[book_id].remove(reservation_id)
+            self._close_reservation(reservation_id, reservation, "completed", "completion_date")
 
-        return True
+            return True
 
     def get_position_in_queue(self, reservation_id):
-        if reservation_id not in self.reservations:
-            raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
-
-        reservation = self.reservations[reservation_id]
-        book_id = reservation["book_id"]
+        with self.lock:
+            if reservation_id not in self.reservations:
+                raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
 
-        if book_id not in self.book_queues:
-            return -1
-
-        try:
-            return self.book_queues[book_id].index(reservation_id) + 1
-        except ValueError:
-            return -1
\ No newline at end of file
+            reservation = self.reservations[reservation_id]
+            return self._queue_position(reservation["book_id"], reservation_id)
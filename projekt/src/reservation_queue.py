@@ -0,0 +1,92 @@
+class ReservationQueue:
+    # Kolejka FIFO z numerami sekwencyjnymi i drzewem Fenwicka liczącym żywe
+    # wpisy: usuwanie z dowolnego miejsca i pozycja w kolejce kosztują O(log n).
+
+    def __init__(self, reservation_ids=()):
+        self.slots = []  # numer sekwencyjny -> ID rezerwacji albo None po usunięciu
+        self.positions = {}  # ID rezerwacji -> numer sekwencyjny
+        self.tree = [0]  # drzewo Fenwicka indeksowane od 1
+        self.head = 0  # pierwszy slot, który może być jeszcze zajęty
+        for reservation_id in reservation_ids:
+            self.append(reservation_id)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __bool__(self):
+        return bool(self.positions)
+
+    def __contains__(self, reservation_id):
+        return reservation_id in self.positions
+
+    def __iter__(self):
+        for reservation_id in self.slots[self.head:]:
+            if reservation_id is not None:
+                yield reservation_id
+
+    def append(self, reservation_id):
+        if reservation_id in self.positions:
+            raise ValueError(f"Rezerwacja o ID {reservation_id} jest już w kolejce")
+        self.positions[reservation_id] = len(self.slots)
+        self.slots.append(reservation_id)
+
+        # nowy węzeł obejmuje przedział (i - lowbit(i), i]
+        i = len(self.slots)
+        self.tree.append(1 + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+
+    def first(self):
+        if not self.positions:
+            return None
+        return self.slots[self.head]
+
+    def remove(self, reservation_id):
+        slot = self.positions.pop(reservation_id, None)
+        if slot is None:
+            return False
+        self.slots[slot] = None
+        self._add(slot + 1, -1)
+
+        while self.head < len(self.slots) and self.slots[self.head] is None:
+            self.head += 1
+        # martwe sloty (przed głową i za nią) ponad połowę - przebudowa, więc
+        # pamięć idzie za długością żywej kolejki
+        dead = len(self.slots) - len(self.positions)
+        if dead > 32 and dead * 2 > len(self.slots):
+            self._compact()
+        return True
+
+    def position(self, reservation_id):
+        slot = self.positions.get(reservation_id)
+        if slot is None:
+            return -1
+        # wszystkie sloty przed głową są puste, więc suma prefiksowa to pozycja
+        return self._prefix(slot + 1)
+
+    def _prefix(self, i):
+        total = 0
+        tree = self.tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _add(self, i, delta):
+        tree = self.tree
+        size = len(tree)
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def _compact(self):
+        live = [reservation_id for reservation_id in self.slots[self.head:]
+                if reservation_id is not None]
+        self.slots = live
+        self.positions = {reservation_id: slot for slot, reservation_id in enumerate(live)}
+        self.head = 0
+
+        tree = [0] + [1] * len(live)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
@@ -0,0 +1,251 @@
+import threading
+from collections.abc import Mapping, MutableMapping
+from contextlib import nullcontext
+
+MISSING = object()  # w historii: rekordu w tej wersji nie było
+
+
+def copy_record(record):
+    # listy w rekordzie (np. "categories") też kopiujemy - zmiana w miejscu
+    # nie może sięgnąć wersji widzianej przez migawkę
+    if not isinstance(record, dict):
+        return dict(record) if isinstance(record, Mapping) else record
+    copy = record.copy()
+    for field, value in copy.items():
+        if type(value) is list:
+            copy[field] = value[:]
+    return copy
+
+
+def atomic(storage):
+    # zapisy w bloku są widoczne w migawkach wszystkie naraz albo wcale
+    transaction = getattr(storage, "transaction", None)
+    return transaction() if transaction is not None else nullcontext()
+
+
+class VersionClock:
+    # Wspólny licznik wersji dla tabel kilku menedżerów (MVCC). Każdy zapis - albo
+    # cała transakcja - dostaje kolejny numer wersji, a migawka zapamiętuje numer
+    # i czyta rekordy w stanie z tej chwili. Zastąpione wartości są trzymane tylko dopóki może ich
+    # potrzebować otwarta migawka. Czytelnik nie blokuje zapisów na czas skanu -
+    # obie strony biorą tylko krótki zamek self.lock na pojedynczy rekord.
+    #
+    #   clock = VersionClock()
+    #   books = BookManager(storage=clock.table())
+    #   loans = LoanManager(books, users, storage=clock.table())
+    #   with clock.snapshot() as snapshot:
+    #       for book_id, book in snapshot.view(books.books).items(): ...
+
+    def __init__(self):
+        self.version = 0
+        self.lock = threading.Lock()
+        self.snapshots = {}  # wersja -> liczba otwartych migawek
+        self.writers = set()  # wersje transakcji w toku
+        self.local = threading.local()  # wersja i głębokość zagnieżdżenia transakcji wątku
+        self.tables = []
+
+    def table(self):
+        table = VersionedTable(self)
+        self.tables.append(table)
+        return table
+
+    def snapshot(self):
+        with self.lock:
+            # transakcje w toku (i późniejsze od nich) pomijamy w całości
+            version = min(self.writers) - 1 if self.writers else self.version
+            self.snapshots[version] = self.snapshots.get(version, 0) + 1
+        return Snapshot(self, version)
+
+    def transaction(self):
+        # wszystkie zapisy transakcji mają jedną wersję, więc migawka widzi je razem
+        return self
+
+    def __enter__(self):
+        local = self.local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            with self.lock:
+                self.version += 1
+                local.version = self.version
+                self.writers.add(self.version)
+        local.depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        local = self.local
+        local.depth -= 1
+        if local.depth == 0:
+            with self.lock:
+                self.writers.discard(local.version)
+                local.version = None
+                if not self.writers and not self.snapshots:
+                    self._prune()
+
+    def _write_version(self):
+        # wywoływane pod self.lock przy każdym zapisie
+        version = getattr(self.local, "version", None)
+        if version is None:
+            self.version += 1
+            version = self.version
+        return version
+
+    def _close_snapshot(self, version):
+        with self.lock:
+            self.snapshots[version] -= 1
+            if self.snapshots[version] == 0:
+                del self.snapshots[version]
+            self._prune()
+
+    def _prune(self):
+        for table in self.tables:
+            table._prune()
+
+    def _needed(self, version, replaced):
+        # wartość zapisana w wersji version i zastąpiona w wersji replaced jest
+        # potrzebna migawce o wersji z przedziału [version, replaced); przyszła
+        # migawka dostanie wersję sprzed którejś z transakcji w toku
+        if any(version <= snapshot < replaced for snapshot in self.snapshots):
+            return True
+        return any(version <= writer - 1 < replaced for writer in self.writers)
+
+
+class VersionedTable(MutableMapping):
+    # Magazyn rekordów z historią wersji. Odczyt zwraca kopię rekordu, więc - jak
+    # w SqliteTable - zmiana w miejscu wymaga ponownego przypisania (menedżery
+    # robią to same), a zapisana wersja nigdy się nie zmienia.
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.current = {}  # klucz -> bieżący rekord
+        self.versions = {}  # klucz -> wersja ostatniego zapisu (także usunięcia)
+        # klucz -> lista (wersja zapisu, wersja zastąpienia, rekord lub MISSING), od najstarszej
+        self.history = {}
+
+    def _write(self, key, record):
+        clock = self.clock
+        with clock.lock:
+            version = clock._write_version()
+            old_version = self.versions.get(key, 0)
+            if clock._needed(old_version, version):
+                self.history.setdefault(key, []).append((old_version, version, self.current.get(key, MISSING)))
+            if record is MISSING:
+                del self.current[key]
+            else:
+                self.current[key] = record
+            self.versions[key] = version
+
+    def __getitem__(self, key):
+        return copy_record(self.current[key])
+
+    def __setitem__(self, key, record):
+        self._write(key, copy_record(record))
+
+    def __delitem__(self, key):
+        if key not in self.current:
+            raise KeyError(key)
+        self._write(key, MISSING)
+
+    def __contains__(self, key):
+        return key in self.current
+
+    def __iter__(self):
+        with self.clock.lock:
+            keys = list(self.current)
+        return iter(keys)
+
+    def __len__(self):
+        return len(self.current)
+
+    def transaction(self):
+        return self.clock.transaction()
+
+    def read(self, key, version):
+        # rekord w stanie z wersji version (bez kopiowania - tylko do odczytu)
+        with self.clock.lock:
+            if self.versions.get(key, 0) <= version:
+                return self.current[key]
+            for written, replaced, record in reversed(self.history.get(key, ())):
+                if written <= version < replaced:
+                    if record is MISSING:
+                        break
+                    return record
+        raise KeyError(key)
+
+    def keys_at(self):
+        # klucze bieżące i usunięte po otwarciu migawki; widoczność sprawdza read()
+        with self.clock.lock:
+            keys = list(self.current)
+            keys.extend(key for key in self.history if key not in self.current)
+        return keys
+
+    def _prune(self):
+        # wywoływane pod zamkiem zegara po zamknięciu migawki; wpisy trzymane dla
+        # zakończonych transakcji zwalnia najbliższe zamknięcie migawki
+        clock = self.clock
+        if not clock.snapshots and not clock.writers:
+            self.history.clear()
+            return
+        for key in list(self.history):
+            kept = [entry for entry in self.history[key] if clock._needed(entry[0], entry[1])]
+            if kept:
+                self.history[key] = kept
+            else:
+                del self.history[key]
+
+
+class Snapshot:
+    # Punkt w czasie wspólny dla wszystkich tabel zegara. Zamknięcie (lub wyjście
+    # z bloku with) pozwala zwolnić historię trzymaną dla tej migawki.
+
+    def __init__(self, clock, version):
+        self.clock = clock
+        self.version = version
+        self.closed = False
+
+    def view(self, table):
+        if getattr(table, "clock", None) is not self.clock:
+            raise ValueError("Tabela nie należy do zegara tej migawki")
+        return SnapshotView(table, self.version)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.clock._close_snapshot(self.version)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SnapshotView(Mapping):
+    # Tylko do odczytu: tabela w stanie z chwili otwarcia migawki.
+
+    def __init__(self, table, version):
+        self.table = table
+        self.version = version
+
+    def __getitem__(self, key):
+        return self.table.read(key, self.version)
+
+    def __iter__(self):
+        for key in self.table.keys_at():
+            try:
+                self.table.read(key, self.version)
+            except KeyError:
+                continue
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def items(self):
+        for key in self.table.keys_at():
+            try:
+                yield key, self.table.read(key, self.version)
+            except KeyError:
+                continue
+
+    def values(self):
+        return (record for _, record in self.items())
@@ -0,0 +1,250 @@
+import json
+import sqlite3
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+
+from src.utils import normalize_email, normalize_isbn
+
+# pola rekordów kopiowane do osobnych, indeksowanych kolumn
+INDEXED_FIELDS = {
+    "books": ("isbn",),
+    "users": ("email",),
+    "loans": ("user_id", "book_id", "returned"),
+    "reservations": ("user_id", "book_id", "status"),
+}
+# pola porównywane po normalizacji - w kolumnie zapisujemy postać znormalizowaną
+NORMALIZERS = {"isbn": normalize_isbn, "email": normalize_email}
+TEXT_KEY_TABLES = ("categories",)
+
+
+class SqliteBackend:
+    # Magazyn rekordów menedżerów w SQLite (tryb WAL). Każda tabela to mapowanie
+    # przekazywane jako storage=, np. BookManager(storage=backend.table("books")).
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # największe usunięte ID każdej tabeli - ID nie wracają do użycia po restarcie
+        self.connection.execute('CREATE TABLE IF NOT EXISTS "key_sequences" '
+                                '(name TEXT PRIMARY KEY, max_deleted INTEGER NOT NULL)')
+        self.batch_depth = 0
+        self.tables = {}
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = SqliteTable(self, name, INDEXED_FIELDS.get(name, ()),
+                                            integer_keys=name not in TEXT_KEY_TABLES)
+        return self.tables[name]
+
+    @contextmanager
+    def batch(self):
+        # wszystkie zapisy w bloku trafiają do jednej transakcji
+        if self.batch_depth == 0:
+            self.connection.execute("BEGIN")
+        self.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.connection.execute("ROLLBACK")
+            raise
+        self.batch_depth -= 1
+        if self.batch_depth == 0:
+            self.connection.execute("COMMIT")
+
+    def snapshot(self):
+        return SqliteSnapshot(self)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteSnapshot:
+    # Odczyt w stanie z chwili otwarcia: osobne połączenie z otwartą transakcją
+    # odczytu. W trybie WAL zapisy z połączenia głównego biegną dalej, a migawka
+    # ich nie widzi aż do zamknięcia.
+
+    def __init__(self, backend):
+        if backend.path == ":memory:":
+            raise ValueError("Migawka wymaga bazy w pliku")
+        self.backend = backend
+        self.connection = sqlite3.connect(backend.path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("BEGIN")
+        # transakcja odczytu zaczyna się od pierwszego zapytania
+        self.connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+    def view(self, table):
+        if table.backend is not self.backend:
+            raise ValueError("Tabela nie należy do bazy tej migawki")
+        return SqliteSnapshotView(self.connection, table)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.execute("ROLLBACK")
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteSnapshotView(Mapping):
+    # tabela w stanie migawki - te same zapytania, połączenie migawki
+
+    def __init__(self, connection, table):
+        self.connection = connection
+        self.table = table
+
+    def __getitem__(self, key):
+        row = self.connection.execute(self.table.sql_get, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __iter__(self):
+        return (key for (key,) in self.connection.execute(self.table.sql_keys))
+
+    def __len__(self):
+        return self.connection.execute(self.table.sql_count).fetchone()[0]
+
+    def items(self):
+        return ((key, json.loads(record)) for key, record in self.connection.execute(self.table.sql_items))
+
+    def values(self):
+        return (record for _, record in self.items())
+
+
+class SqliteTable(MutableMapping):
+    # Rekord jest przechowywany jako JSON; odczyt zwraca nowy słownik, więc zmiana
+    # w miejscu wymaga ponownego przypisania (menedżery robią to same).
+
+    def __init__(self, backend, name, indexed_fields=(), integer_keys=True):
+        self.backend = backend
+        self.name = name
+        self.indexed_fields = indexed_fields
+        self.integer_keys = integer_keys
+        connection = backend.connection
+
+        key_type = "INTEGER" if integer_keys else "TEXT"
+        columns = "".join(f", {field}" for field in indexed_fields)
+        connection.execute(f'CREATE TABLE IF NOT EXISTS "{name}" '
+                           f'(key {key_type} PRIMARY KEY{columns}, record TEXT NOT NULL)')
+        # baza ze starszej wersji: brakujące kolumny uzupełniamy z rekordów JSON
+        # (przez _row, żeby ISBN i email trafiły do kolumny znormalizowane)
+        existing = {row[1] for row in connection.execute(f'PRAGMA table_info("{name}")')}
+        missing = [field for field in indexed_fields if field not in existing]
+        for field in missing:
+            connection.execute(f'ALTER TABLE "{name}" ADD COLUMN {field}')
+        if missing:
+            assignments = ", ".join(f"{field} = ?" for field in indexed_fields)
+            rows = connection.execute(f'SELECT key, record FROM "{name}"').fetchall()
+            connection.executemany(f'UPDATE "{name}" SET {assignments} WHERE key = ?',
+                                   [self._row(key, json.loads(record))[1:-1] + [key] for key, record in rows])
+        for field in indexed_fields:
+            connection.execute(f'CREATE INDEX IF NOT EXISTS "{name}_{field}" ON "{name}" ({field})')
+
+        placeholders = ", ?" * len(indexed_fields)
+        # stałe zapytania - moduł sqlite3 trzyma je w pamięci podręcznej jako przygotowane
+        self.sql_get = f'SELECT record FROM "{name}" WHERE key = ?'
+        self.sql_put = f'INSERT OR REPLACE INTO "{name}" (key{columns}, record) VALUES (?{placeholders}, ?)'
+        self.sql_delete = f'DELETE FROM "{name}" WHERE key = ?'
+        self.sql_keys = f'SELECT key FROM "{name}" ORDER BY key'
+        self.sql_items = f'SELECT key, record FROM "{name}" ORDER BY key'
+        self.sql_keys_after = f'SELECT key FROM "{name}" WHERE key > ? ORDER BY key'
+        self.sql_count = f'SELECT COUNT(*) FROM "{name}"'
+        self.sql_max = f'SELECT MAX(key) FROM "{name}"'
+        self.sql_find = {field: f'SELECT key FROM "{name}" WHERE {field} = ? ORDER BY key'
+                         for field in indexed_fields}
+        self.sql_max_deleted = 'SELECT max_deleted FROM "key_sequences" WHERE name = ?'
+        self.sql_record_deleted = ('INSERT INTO "key_sequences" (name, max_deleted) VALUES (?, ?) '
+                                   'ON CONFLICT(name) DO UPDATE SET max_deleted = MAX(max_deleted, excluded.max_deleted)')
+
+    def _row(self, key, record):
+        values = [key]
+        for field in self.indexed_fields:
+            value = record.get(field)
+            if field in NORMALIZERS and isinstance(value, str):
+                value = NORMALIZERS[field](value)
+            values.append(value)
+        values.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        return values
+
+    def __getitem__(self, key):
+        row = self.backend.connection.execute(self.sql_get, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, record):
+        self.backend.connection.execute(self.sql_put, self._row(key, record))
+
+    def __delitem__(self, key):
+        connection = self.backend.connection
+        with self.backend.batch():
+            if connection.execute(self.sql_delete, (key,)).rowcount == 0:
+                raise KeyError(key)
+            if self.integer_keys:
+                connection.execute(self.sql_record_deleted, (self.name, key))
+
+    def __contains__(self, key):
+        return self.backend.connection.execute(self.sql_get, (key,)).fetchone() is not None
+
+    def __iter__(self):
+        return (key for (key,) in self.backend.connection.execute(self.sql_keys))
+
+    def __len__(self):
+        return self.backend.connection.execute(self.sql_count).fetchone()[0]
+
+    def items(self):
+        return ((key, json.loads(record))
+                for key, record in self.backend.connection.execute(self.sql_items))
+
+    def values(self):
+        return (record for _, record in self.items())
+
+    def keys_after(self, after):
+        return (key for (key,) in self.backend.connection.execute(self.sql_keys_after, (after,)))
+
+    def max_key(self):
+        return self.backend.connection.execute(self.sql_max).fetchone()[0]
+
+    def next_key(self):
+        row = self.backend.connection.execute(self.sql_max_deleted, (self.name,)).fetchone()
+        return max(self.max_key() or 0, row[0] if row else 0) + 1
+
+    def find_keys(self, field, value, **conditions):
+        # klucze rosnąco; kolejne warunki łączy AND, krotka lub lista wartości to IN,
+        # np. find_keys("book_id", 7, status=("waiting", "ready"))
+        if not conditions and field in self.sql_find and not isinstance(value, (tuple, list)):
+            value = NORMALIZERS[field](value) if field in NORMALIZERS else value
+            return [key for (key,) in self.backend.connection.execute(self.sql_find[field], (value,))]
+        clauses, params = [], []
+        for field, value in [(field, value)] + list(conditions.items()):
+            if field not in self.indexed_fields:
+                raise ValueError(f"Pole {field} nie jest indeksowane w tabeli {self.name}")
+            values = list(value) if isinstance(value, (tuple, list)) else [value]
+            if field in NORMALIZERS:
+                values = [NORMALIZERS[field](value) for value in values]
+            clauses.append(f"{field} = ?" if len(values) == 1 else f"{field} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        sql = f'SELECT key FROM "{self.name}" WHERE {" AND ".join(clauses)} ORDER BY key'
+        return [key for (key,) in self.backend.connection.execute(sql, params)]
+
+    def batch(self):
+        return self.backend.batch()
+
+    def put_many(self, items):
+        with self.backend.batch():
+            self.backend.connection.executemany(self.sql_put, (self._row(key, record) for key, record in items))
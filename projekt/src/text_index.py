@@ -0,0 +1,113 @@
+import re
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+class TokenIndex:
+    def __init__(self):
+        self.postings = {}  # słowo -> zbiór ID rekordów
+        self.tokens = {}  # ID rekordu -> zbiór jego słów
+
+    def add(self, record_id, text):
+        words = set(tokenize(text))
+        self.tokens[record_id] = words
+        for word in words:
+            self.postings.setdefault(word, set()).add(record_id)
+
+    def remove(self, record_id):
+        for word in self.tokens.pop(record_id, ()):
+            ids = self.postings[word]
+            ids.discard(record_id)
+            if not ids:
+                del self.postings[word]
+
+    def update(self, record_id, text):
+        self.remove(record_id)
+        self.add(record_id, text)
+
+    def search(self, query):
+        words = set(tokenize(query))
+        if not words:
+            return set()
+
+        # przecinamy listy od najkrótszej, żeby dotykać jak najmniej ID
+        lists = []
+        for word in words:
+            ids = self.postings.get(word)
+            if not ids:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.postings = {}  # trigram -> zbiór ID rekordów
+        self.keys = {}  # ID rekordu -> tekst zamieniony na małe litery
+
+    def add(self, record_id, text):
+        key = text.lower()
+        self.keys[record_id] = key
+        for gram in trigrams(key):
+            self.postings.setdefault(gram, set()).add(record_id)
+
+    def remove(self, record_id):
+        key = self.keys.pop(record_id, None)
+        if key is not None:
+            self._discard(record_id, trigrams(key))
+
+    def update(self, record_id, text):
+        old_grams = trigrams(self.keys.get(record_id, ""))
+        key = text.lower()
+        self.keys[record_id] = key
+        new_grams = trigrams(key)
+        self._discard(record_id, old_grams - new_grams)
+        for gram in new_grams - old_grams:
+            self.postings.setdefault(gram, set()).add(record_id)
+
+    def _discard(self, record_id, grams):
+        for gram in grams:
+            ids = self.postings[gram]
+            ids.discard(record_id)
+            if not ids:
+                del self.postings[gram]
+
+    def search(self, query):
+        query = query.lower()
+        keys = self.keys
+
+        # zbyt krótkie zapytanie nie ma trigramów - sprawdzamy gotowe klucze
+        if len(query) < 3:
+            return {record_id for record_id, key in keys.items() if query in key}
+
+        lists = []
+        for gram in trigrams(query):
+            ids = self.postings.get(gram)
+            if not ids:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+
+        # wspólne trigramy nie gwarantują ciągłego wystąpienia, więc sprawdzamy
+        return {record_id for record_id in candidates if query in keys[record_id]}
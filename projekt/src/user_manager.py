@@ -1,10 +1,34 @@
 
+from src.catalog_import import import_in_batches
+from src.locking import make_locks
+from src.pagination import keys_after, take_page
+from src.text_index import TrigramIndex
+from src.utils import next_key, normalize_email, validate_email
+
+
 class UserManager:
-    def __init__(self):
-        self.users = {}  # słownik z ID jako kluczami
-        self.next_id = 1  # zaczynamy od ID=1
+    def __init__(self, storage=None, unique_email=False, thread_safe=False):
+        self.users = storage if storage is not None else {}  # słownik z ID jako kluczami
+        self.next_id = next_key(self.users)  # zaczynamy od ID=1
+        self.unique_email = unique_email
+        # magazyn z indeksem kolumny email (SQLite) - adresy wyszukuje baza
+        self.find_keys = getattr(self.users, "find_keys", None)
+        self.name_trigrams = TrigramIndex()
+        self.email_index = {}  # znormalizowany email -> lista ID użytkowników
+        # indeksy z istniejących rekordów budujemy przy pierwszym wyszukiwaniu
+        self.indexed = not self.users
+        # thread_safe: zamek na użytkownika (locks) i zamek indeksów (lock)
+        self.locks, self.lock = make_locks(thread_safe, self.users)
 
-    def add_user(self, name, email):
+    def _ensure_indexes(self):
+        with self.lock:
+            if not self.indexed:
+                for user_id, user in self.users.items():
+                    self.name_trigrams.add(user_id, user["name"])
+                    self._index_email(user_id, user["email"])
+                self.indexed = True
+
+    def _validate_user(self, name, email):
         if not name or not isinstance(name, str):
             raise ValueError("Imię musi być niepustym ciągiem znaków")
         if not email or not isinstance(email, str):
@@ -12,48 +36,136 @@ class UserManager:
         if len(name) > 200:  # limit długości imienia
             raise ValueError("Imię jest zbyt długie")
 
+    def _check_email_free(self, email, user_id=None):
+        owners = self._email_ids(email)
+        if any(owner != user_id for owner in owners):
+            raise ValueError(f"Użytkownik o adresie {email} już istnieje")
+
+    def add_user(self, name, email):
+        self._validate_user(name, email)
+        with self.lock:
+            if self.unique_email:
+                self._check_email_free(email)
+            return self._insert_user(name, email)
+
+    def _insert_user(self, name, email):
         user = {
             "name": name,
             "email": email
         }
 
-        user_id = self.next_id
-        self.users[user_id] = user
-        self.next_id += 1
+        with self.lock:
+            user_id = self.next_id
+            self.users[user_id] = user
+            self.next_id += 1
+            if self.indexed:
+                self.name_trigrams.add(user_id, name)
+                self._index_email(user_id, email)
 
         return user_id
 
+    def bulk_add_users(self, records, batch_size=1000, report=None):
+        # import np. zapisów na początku semestru: zły format adresu i adres już
+        # zajęty (także wcześniej w tym samym imporcie) trafiają do raportu
+        def validate(record, batch_emails):
+            if not isinstance(record, dict):
+                raise ValueError("Rekord musi być obiektem z polami name, email")
+            name = record.get("name")
+            email = record.get("email")
+            self._validate_user(name, email)
+            email = email.strip()
+            if not validate_email(email):
+                raise ValueError(f"Nieprawidłowy adres email {email}")
+            email_key = normalize_email(email)
+            if email_key in batch_emails or self._email_ids(email):
+                raise ValueError(f"Użytkownik o adresie {email} już istnieje")
+            batch_emails.add(email_key)
+            return name, email
+
+        return import_in_batches(records, validate, self._insert_user, storage=self.users,
+                                 batch_size=batch_size, report=report)
+
+    def _email_ids(self, email):
+        if self.find_keys is not None:
+            return self.find_keys("email", email)
+        self._ensure_indexes()
+        return self.email_index.get(normalize_email(email), [])
+
+    def _index_email(self, user_id, email):
+        if self.find_keys is None:
+            self.email_index.setdefault(normalize_email(email), []).append(user_id)
+
+    def _unindex_email(self, user_id, email):
+        if self.find_keys is not None:
+            return
+        email_key = normalize_email(email)
+        user_ids = self.email_index[email_key]
+        user_ids.remove(user_id)
+        if not user_ids:
+            del self.email_index[email_key]
+
     def remove_user(self, user_id):
-        if user_id not in self.users:
-            raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
-        del self.users[user_id]
+        with self.locks(user_id), self.lock:
+            if user_id not in self.users:
+                raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
+            if self.indexed:
+                self._unindex_email(user_id, self.users[user_id]["email"])
+                self.name_trigrams.remove(user_id)
+            del self.users[user_id]
 
     def get_user(self, user_id):
         if user_id not in self.users:
             raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
         return self.users[user_id]
 
+    def get_user_by_email(self, email):
+        with self.lock:
+            user_ids = self._email_ids(email)
+            if not user_ids:
+                raise ValueError(f"Użytkownik o adresie {email} nie istnieje")
+            return self.users[user_ids[0]]
+
     def find_users_by_name(self, name):
-        return [user for user_id, user in self.users.items()
-                if name.lower() in user["name"].lower()]
+        self._ensure_indexes()
+        with self.lock:
+            return [self.users[user_id] for user_id in sorted(self.name_trigrams.search(name))]
 
     def update_user(self, user_id, new_name=None, new_email=None):
-        if user_id not in self.users:
-            raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
+        with self.locks(user_id), self.lock:
+            if user_id not in self.users:
+                raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
 
-        user = self.users[user_id]
+            user = self.users[user_id]
 
-        if new_name:
-            if not isinstance(new_name, str) or len(new_name) == 0:
-                raise ValueError("Imię musi być niepustym ciągiem znaków")
-            user["name"] = new_name
+            if new_name:
+                if not isinstance(new_name, str) or len(new_name) == 0:
+                    raise ValueError("Imię musi być niepustym ciągiem znaków")
+                user["name"] = new_name
+                if self.indexed:
+                    self.name_trigrams.update(user_id, new_name)
 
-        if new_email:
-            if not isinstance(new_email, str) or len(new_email) == 0:
-                raise ValueError("Email musi być niepustym ciągiem znaków")
-            user["email"] = new_email
+            if new_email:
+                if not isinstance(new_email, str) or len(new_email) == 0:
+                    raise ValueError("Email musi być niepustym ciągiem znaków")
+                if self.unique_email:
+                    self._check_email_free(new_email, user_id)
+                if self.indexed:
+                    self._unindex_email(user_id, user["email"])
+                    self._index_email(user_id, new_email)
+                user["email"] = new_email
 
-        return True
+            self.users[user_id] = user
+            return True
 
     def list_users(self):
-        return list(self.users.values())
+        with self.lock:
+            return list(self.users.values())
+
+    def iter_users(self, after=0):
+        for user_id in keys_after(self.users, after, self.next_id):
+            user = self.users.get(user_id)
+            if user is not None:
+                yield user_id, user
+
+    def list_users_page(self, limit=50, cursor=None):
+        return take_page(self.iter_users(cursor or 0), limit)
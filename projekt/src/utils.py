@@ -1,22 +1,69 @@
+import os
 import re
 import json
 
+def write_json_atomic(data, file_path, indent=None):
+    # zapis do pliku tymczasowego i podmiana przez rename - przerwany zapis
+    # nigdy nie zostawia w file_path połowy danych
+    tmp_path = f"{file_path}.tmp"
+    separators = None if indent is not None else (',', ':')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent, separators=separators)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(file_path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def next_key(records):
+    # następne wolne ID; magazyn trwały (next_key) pamięta też ID usuniętych rekordów
+    method = getattr(records, "next_key", None)
+    return method() if method is not None else max(records, default=0) + 1
+
 def save_data(data, file_path):
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    write_json_atomic(data, file_path, indent=4)
 
 def load_data(file_path):
+    # brak pliku to pusty zbiór danych; uszkodzony plik zgłasza błąd zamiast go gubić
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+    except FileNotFoundError:
         return []
+EMAIL_PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+
 def validate_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
+
+def normalize_email(email):
+    # wielkość liter i spacje na brzegach nie odróżniają adresów
+    return email.strip().lower()
+
+def normalize_isbn(isbn):
+    # czytniki kodów i katalogi zapisują ISBN z myślnikami lub spacjami
+    return isbn.replace("-", "").replace(" ", "").upper()
 
-def validate_isbn(isbn):
-    return isbn.isdigit() and len(isbn) in (10, 13)
+def validate_isbn(isbn, checksum=False):
+    isbn = normalize_isbn(isbn)
+    if not checksum:
+        return isbn.isdigit() and len(isbn) in (10, 13)
+    if len(isbn) == 10:
+        # ISBN-10: suma cyfr z wagami 10..1 podzielna przez 11, cyfra kontrolna może być X
+        if not isbn[:9].isdigit() or not (isbn[9].isdigit() or isbn[9] == "X"):
+            return False
+        total = sum((10 - i) * int(digit) for i, digit in enumerate(isbn[:9]))
+        total += 10 if isbn[9] == "X" else int(isbn[9])
+        return total % 11 == 0
+    if len(isbn) == 13:
+        # ISBN-13 (EAN-13): wagi na przemian 1 i 3, suma podzielna przez 10
+        if not isbn.isdigit():
+            return False
+        return sum((3 if i % 2 else 1) * int(digit) for i, digit in enumerate(isbn)) % 10 == 0
+    return False
 
 def validate_user_id(user_id):
     return isinstance(user_id, int) and user_id > 0
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.async_library import AsyncLibrary
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+def open_library(**options):
+    books = BookManager(thread_safe=True)
+    users = UserManager(thread_safe=True)
+    loans = LoanManager(books, users, thread_safe=True)
+    reservations = ReservationManager(books, users, thread_safe=True)
+    books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+    books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+    users.add_user("Jan Kowalski", "jan@example.com")
+    users.add_user("Anna Nowak", "anna@example.com")
+    return AsyncLibrary(books, users, loans, reservations, **options)
+
+
+class TestAsyncReads:
+    def test_results_match_managers(self):
+        async def scenario():
+            async with open_library() as library:
+                assert (await library.find_books_by_title("hob"))[0]["title"] == "Hobbit"
+                assert (await library.get_book(2))["author"] == "Bolesław Prus"
+                assert (await library.find_users_by_name("nowak"))[0]["email"] == "anna@example.com"
+                with pytest.raises(ValueError):
+                    await library.get_book_by_isbn("0000000000")
+
+        asyncio.run(scenario())
+
+    def test_identical_searches_are_coalesced(self):
+        calls = []
+        release = threading.Event()
+
+        async def scenario():
+            async with open_library() as library:
+                search = library.books.find_books_by_title
+
+                def slow_search(title, match):
+                    calls.append(title)
+                    release.wait(1)
+                    return search(title, match)
+
+                library.books.find_books_by_title = slow_search
+                waiting = [asyncio.ensure_future(library.find_books_by_title("hob")) for _ in range(10)]
+                other = asyncio.ensure_future(library.find_books_by_title("lal"))
+                await asyncio.sleep(0.05)
+                release.set()
+                results = await asyncio.gather(*waiting)
+                assert (await other)[0]["title"] == "Lalka"
+                assert all(result is results[0] for result in results)
+                assert library.in_flight == {}
+
+        asyncio.run(scenario())
+        assert sorted(calls) == ["hob", "lal"]
+
+    def test_event_loop_is_not_blocked(self):
+        async def scenario():
+            async with open_library() as library:
+                def slow_list():
+                    time.sleep(0.2)
+                    return []
+
+                library.books.list_books = slow_list
+                ticks = 0
+                listing = asyncio.ensure_future(library.list_books())
+                while not listing.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+                assert ticks > 5
+
+        asyncio.run(scenario())
+
+
+class TestAsyncWrites:
+    def test_writes_are_batched_in_order(self):
+        batches = []
+
+        async def scenario():
+            async with open_library(batch_window=0.01) as library:
+                apply_writes = library._apply_writes
+
+                def counting(batch):
+                    batches.append(len(batch))
+                    return apply_writes(batch)
+
+                library._apply_writes = counting
+                book_ids = await asyncio.gather(*(library.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+                                                  for i in range(50)))
+                assert book_ids == list(range(3, 53))
+                loan_id = await library.loan_book(1, 3)
+                assert await library.return_book(loan_id) is True
+
+        asyncio.run(scenario())
+        assert batches[0] == 50
+        assert len(batches) == 3
+
+    def test_errors_reach_only_their_caller(self):
+        async def scenario():
+            async with open_library() as library:
+                first, second, third = await asyncio.gather(
+                    library.loan_book(1, 1), library.loan_book(2, 1), library.loan_book(2, 2),
+                    return_exceptions=True)
+                assert first == 1
+                assert isinstance(second, ValueError)
+                assert third == 2
+                assert library.loans.count_active_loans() == 2
+
+        asyncio.run(scenario())
+
+    def test_flush_on_close(self):
+        async def scenario():
+            library = open_library(batch_window=0.05)
+            future = asyncio.ensure_future(library.add_user("Ewa", "ewa@example.com"))
+            await asyncio.sleep(0)
+            await library.close()
+            assert future.done() and future.result() == 3
+
+        asyncio.run(scenario())
+
+    def test_requires_thread_safe_managers(self):
+        with pytest.raises(ValueError):
+            AsyncLibrary(BookManager(), UserManager())
@@ -0,0 +1,98 @@
+import pytest
+from src.binary_catalog import CatalogStorage, MappedCatalog, write_catalog
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.user_manager import UserManager
+
+BOOKS = {
+    1: {"title": "Władca Pierścieni", "author": "J.R.R. Tolkien", "isbn": "9788328705141",
+        "available": True, "year": 1954},
+    2: {"title": "Hobbit", "author": "J.R.R. Tolkien", "isbn": "9788328704442",
+        "available": False, "categories": ["Fantasy"]},
+    5: {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890",
+        "available": True, "year": "ok. 1890"},
+}
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "books.bin"
+    write_catalog(path, BOOKS)
+    return path
+
+
+class TestMappedCatalog:
+    def test_roundtrip(self, catalog_path):
+        catalog = MappedCatalog(catalog_path)
+        assert len(catalog) == 3
+        assert list(catalog) == [1, 2, 5]
+        assert {book_id: catalog[book_id] for book_id in catalog} == BOOKS
+        assert dict(catalog.items()) == BOOKS
+        catalog.close()
+
+    def test_missing_record(self, catalog_path):
+        catalog = MappedCatalog(catalog_path)
+        assert 3 not in catalog
+        assert "1" not in catalog
+        with pytest.raises(KeyError):
+            catalog[3]
+
+    def test_empty_catalog(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        write_catalog(path, {})
+        catalog = MappedCatalog(path)
+        assert len(catalog) == 0
+        assert list(catalog) == []
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "books.json"
+        path.write_text("{}" * 20, encoding="utf-8")
+        with pytest.raises(ValueError):
+            MappedCatalog(path)
+
+
+class TestCatalogStorage:
+    def test_book_manager_on_catalog(self, catalog_path):
+        manager = BookManager(storage=CatalogStorage(catalog_path))
+        assert manager.next_id == 6
+        assert manager.get_book(5)["title"] == "Lalka"
+        assert [book["title"] for book in manager.find_books_by_author("tolkien")] == [
+            "Władca Pierścieni", "Hobbit"]
+        assert manager.get_book_by_isbn("9788373271890")["year"] == "ok. 1890"
+
+    def test_changes_go_to_overlay_and_save(self, catalog_path, tmp_path):
+        storage = CatalogStorage(catalog_path)
+        books = BookManager(storage=storage)
+        users = UserManager()
+        loans = LoanManager(books, users)
+        user_id = users.add_user("Jan Kowalski", "jan@example.com")
+        loans.loan_book(user_id, 1)
+        books.remove_book(2)
+        new_id = books.add_book("Chłopi", "Władysław Reymont", "9788373271906")
+        assert books.get_book(1)["available"] is False
+        assert list(storage) == [1, 5, new_id]
+        assert len(storage) == 3
+        assert 2 not in storage
+
+        saved_path = tmp_path / "saved.bin"
+        storage.save(saved_path)
+        reopened = BookManager(storage=CatalogStorage(saved_path))
+        assert [book["title"] for book in reopened.list_books()] == ["Władca Pierścieni", "Lalka", "Chłopi"]
+        assert reopened.get_book(1)["available"] is False
+        assert reopened.find_books_by_title("chło") == [reopened.get_book(new_id)]
+
+    def test_category_manager_starts_without_decoding(self, catalog_path, monkeypatch):
+        decoded = []
+        decode = MappedCatalog._decode
+
+        def counting_decode(catalog, position):
+            decoded.append(position)
+            return decode(catalog, position)
+
+        monkeypatch.setattr(MappedCatalog, "_decode", counting_decode)
+        books = BookManager(storage=CatalogStorage(catalog_path))
+        categories = CategoryManager(books)
+        categories.add_category("Fantasy")
+        assert decoded == []
+        assert categories.get_books_by_category("Fantasy") == [2]
@@ -102,4 +102,75 @@ class TestListBooks:
         assert len(books) == 3
         returned_titles = [book["title"] for book in books]
         for title in titles:
-            assert title in returned_titles
\ No newline at end of file
+            assert title in returned_titles
+
+class TestFindBooks:
+    @pytest.fixture
+    def manager(self):
+        manager = BookManager()
+        manager.add_book("Władca Pierścieni", "J.R.R. Tolkien", "9788328705141")
+        manager.add_book("Hobbit, czyli tam i z powrotem", "J.R.R. Tolkien", "9788328704442")
+        manager.add_book("Pan Tadeusz", "Adam Mickiewicz", "9788373271890")
+        return manager
+
+    def test_find_by_title_substring(self, manager):
+        books = manager.find_books_by_title("hob")
+        assert [book["title"] for book in books] == ["Hobbit, czyli tam i z powrotem"]
+
+    def test_find_by_author_substring(self, manager):
+        books = manager.find_books_by_author("KIEWICZ")
+        assert [book["title"] for book in books] == ["Pan Tadeusz"]
+
+    def test_find_by_title_words(self, manager):
+        assert manager.find_books_by_title("hob", match="words") == []
+        books = manager.find_books_by_title("powrotem HOBBIT", match="words")
+        assert [book["isbn"] for book in books] == ["9788328704442"]
+
+    def test_find_by_author_words_keeps_id_order(self, manager):
+        books = manager.find_books_by_author("tolkien", match="words")
+        assert [book["isbn"] for book in books] == ["9788328705141", "9788328704442"]
+
+    def test_index_follows_update_and_remove(self, manager):
+        manager.update_book(3, new_title="Dziady")
+        assert manager.find_books_by_title("tadeusz", match="words") == []
+        assert manager.find_books_by_title("tadeusz") == []
+        assert len(manager.find_books_by_title("dziady", match="words")) == 1
+        manager.remove_book(1)
+        assert len(manager.find_books_by_author("tolkien", match="words")) == 1
+
+    def test_find_unknown_match_mode(self, manager):
+        with pytest.raises(ValueError):
+            manager.find_books_by_title("hobbit", match="regex")
+
+
+class TestIsbnIndex:
+    def test_get_book_by_isbn(self):
+        manager = BookManager()
+        manager.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        book = manager.get_book_by_isbn("978-83-7327-189-0")
+        assert book["title"] == "Lalka"
+
+    def test_get_book_by_isbn_nonexistent(self):
+        manager = BookManager()
+        with pytest.raises(ValueError):
+            manager.get_book_by_isbn("9788373271890")
+
+    def test_get_book_by_isbn_after_removal(self):
+        manager = BookManager()
+        book_id = manager.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        manager.remove_book(book_id)
+        with pytest.raises(ValueError):
+            manager.get_book_by_isbn("9788373271890")
+
+    def test_duplicates_allowed_by_default(self):
+        manager = BookManager()
+        first_id = manager.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        manager.add_book("Lalka (wyd. 2)", "Bolesław Prus", "9788373271890")
+        assert manager.get_book_by_isbn("9788373271890") is manager.get_book(first_id)
+
+    def test_unique_isbn_rejects_duplicate(self):
+        manager = BookManager(unique_isbn=True)
+        manager.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        with pytest.raises(ValueError):
+            manager.add_book("Lalka", "Bolesław Prus", "978-83-7327-189-0")
+        assert len(manager.books) == 1
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+from src.book_manager import BookManager
+from src.catalog_import import ImportReport, import_catalog, import_users, read_catalog_records
+from src.sqlite_storage import SqliteBackend
+from src.user_manager import UserManager
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(record if isinstance(record, str) else json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+
+
+class TestBulkAddBooks:
+    def test_valid_records_are_added(self):
+        manager = BookManager()
+        records = [
+            {"title": "Hobbit", "author": "J.R.R. Tolkien", "isbn": "9788328704442", "year": 1937},
+            {"title": "Lalka", "author": "Bolesław Prus", "isbn": "978-83-7327-189-0"},
+        ]
+        report = manager.bulk_add_books(records)
+        assert report.imported == 2
+        assert report.rejected == 0
+        assert manager.get_book(1)["year"] == 1937
+        assert "year" not in manager.get_book(2)
+        assert manager.find_books_by_title("lalk")[0]["author"] == "Bolesław Prus"
+
+    def test_rejects_are_reported_not_raised(self):
+        manager = BookManager()
+        records = [
+            {"title": "Hobbit", "author": "J.R.R. Tolkien", "isbn": "9788328704442"},
+            {"title": "", "author": "Autor", "isbn": "9788328704442"},
+            {"title": "Zła suma", "author": "Autor", "isbn": "1234567890"},
+            {"title": "Zły rok", "author": "Autor", "isbn": "9788328704442", "year": "dawno"},
+            "nie jest słownikiem",
+            {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890", "year": "1890"},
+        ]
+        report = manager.bulk_add_books(records, batch_size=2)
+        assert report.imported == 2
+        assert report.rejected == 4
+        assert [error["record"] for error in report.errors] == [2, 3, 4, 5]
+        assert "ISBN" in report.errors[1]["error"]
+        assert manager.get_book(2)["year"] == 1890
+
+    def test_isbn_checksum_can_be_disabled(self):
+        manager = BookManager()
+        report = manager.bulk_add_books([{"title": "T", "author": "A", "isbn": "1234567890"}], check_isbn=False)
+        assert report.imported == 1
+
+    def test_unique_isbn_within_and_across_batches(self):
+        manager = BookManager(unique_isbn=True)
+        manager.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        records = [
+            {"title": "Hobbit 2", "author": "A", "isbn": "978-83-287-0444-2"},
+            {"title": "Lalka", "author": "B", "isbn": "9788373271890"},
+            {"title": "Lalka 2", "author": "B", "isbn": "9788373271890"},
+        ]
+        report = manager.bulk_add_books(records)
+        assert report.imported == 1
+        assert [error["record"] for error in report.errors] == [1, 3]
+
+    def test_reads_lazily_in_batches(self):
+        consumed = []
+
+        def records():
+            for i in range(10):
+                consumed.append(i)
+                yield {"title": f"Tytuł {i}", "author": "Autor", "isbn": "9788328704442"}
+
+        manager = BookManager()
+        original_insert = manager._insert_book
+        consumed_at_insert = []
+
+        def insert(*args):
+            consumed_at_insert.append(len(consumed))
+            return original_insert(*args)
+
+        manager._insert_book = insert
+        assert manager.bulk_add_books(records(), batch_size=4).imported == 10
+        # generator jest czytany partiami po 4 rekordy, a nie cały naraz
+        assert consumed_at_insert == [4] * 4 + [8] * 4 + [10] * 2
+
+    def test_error_report_is_bounded(self, tmp_path):
+        error_path = tmp_path / "errors.jsonl"
+        report = ImportReport(max_errors=2, error_path=str(error_path))
+        BookManager().bulk_add_books(({"title": "", "isbn": "x"} for _ in range(5)), report=report)
+        assert report.rejected == 5
+        assert len(report.errors) == 2
+        assert len(error_path.read_text(encoding="utf-8").splitlines()) == 5
+        assert report.records_per_second > 0
+
+
+class TestImportCatalog:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "katalog.csv"
+        path.write_text("title,author,isbn,year,publisher\n"
+                        "Hobbit,J.R.R. Tolkien,9788328704442,1937,Iskry\n"
+                        "\"Lalka, tom 1\",Bolesław Prus,9788373271890,\n"
+                        "Zły,Autor,9788373271891,2000,X\n", encoding="utf-8")
+        manager = BookManager()
+        report = import_catalog(manager, str(path))
+        assert (report.imported, report.rejected) == (2, 1)
+        assert manager.get_book(1) == {"title": "Hobbit", "author": "J.R.R. Tolkien",
+                                       "isbn": "9788328704442", "available": True, "year": 1937}
+        assert manager.get_book(2)["title"] == "Lalka, tom 1"
+        assert "odrzucono 1" in report.summary()
+
+    def test_jsonl_with_corrupt_line(self, tmp_path):
+        path = tmp_path / "katalog.jsonl"
+        write_jsonl(path, [
+            {"title": "Hobbit", "author": "J.R.R. Tolkien", "isbn": "9788328704442"},
+            '{"title": "urwany',
+            {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890"},
+        ])
+        manager = BookManager()
+        report = import_catalog(manager, str(path))
+        assert report.imported == 2
+        assert report.errors[0]["record"] == 2
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            read_catalog_records(str(tmp_path / "katalog.xml"), format="xml")
+
+    def test_batches_use_storage_transactions(self, tmp_path):
+        path = tmp_path / "katalog.jsonl"
+        write_jsonl(path, ({"title": f"Tytuł {i}", "author": "Autor", "isbn": "9788328704442"}
+                           for i in range(50)))
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            manager = BookManager(storage=backend.table("books"))
+            report = import_catalog(manager, str(path), batch_size=20)
+            assert report.imported == 50
+            assert len(backend.table("books")) == 50
+
+    def test_import_users_csv(self, tmp_path):
+        path = tmp_path / "studenci.csv"
+        path.write_text("name,email,index\n"
+                        "Jan Kowalski,jan@uni.edu,1001\n"
+                        "Anna Nowak,anna@uni.edu,1002\n"
+                        "Jan Kowalski,JAN@uni.edu,1003\n", encoding="utf-8")
+        manager = UserManager()
+        report = import_users(manager, str(path))
+        assert (report.imported, report.rejected) == (2, 1)
+        assert manager.get_user(1) == {"name": "Jan Kowalski", "email": "jan@uni.edu"}
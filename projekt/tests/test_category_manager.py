@@ -1,4 +1,5 @@
 import unittest
+from src.book_manager import BookManager
 from src.category_manager import CategoryManager
 
 # Dummy BookManager
@@ -72,5 +73,77 @@ class TestCategoryManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.category_manager.get_books_by_category("Nonexistent")
 
+    def test_remove_category_keeps_other_categories(self):
+        self.category_manager.add_category("Fantasy")
+        self.category_manager.add_category("Polish")
+        self.category_manager.assign_category(1, "Fantasy")
+        self.category_manager.assign_category(1, "Polish")
+        self.category_manager.remove_category("Fantasy")
+        self.assertEqual(self.book_manager.get_book(1)["categories"], ["Polish"])
+        self.assertEqual(self.category_manager.get_books_by_category("Polish"), [1])
+
+    def test_assign_twice_keeps_single_entry(self):
+        self.category_manager.add_category("Drama")
+        self.category_manager.assign_category(1, "Drama")
+        self.category_manager.assign_category(1, "Drama")
+        self.assertEqual(self.book_manager.get_book(1)["categories"], ["Drama"])
+
+    def test_index_built_from_existing_books(self):
+        self.book_manager.books[2]["categories"] = ["Poetry"]
+        category_manager = CategoryManager(self.book_manager)
+        category_manager.add_category("Poetry")
+        self.assertEqual(category_manager.get_books_by_category("Poetry"), [2])
+
+    def test_get_books_by_category_skips_removed_books(self):
+        book_manager = BookManager()
+        category_manager = CategoryManager(book_manager)
+        category_manager.add_category("Fantasy")
+        first_id = book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        second_id = book_manager.add_book("Wiedźmin", "Andrzej Sapkowski", "9788375780635")
+        category_manager.assign_category(first_id, "Fantasy")
+        category_manager.assign_category(second_id, "Fantasy")
+        book_manager.remove_book(first_id)
+        self.assertEqual(category_manager.get_books_by_category("Fantasy"), [second_id])
+
+
+class TestCategoryQuery(unittest.TestCase):
+    def setUp(self):
+        self.book_manager = DummyBookManager()
+        for book_id in range(1, 6):
+            self.book_manager.add_book(book_id)
+        self.category_manager = CategoryManager(self.book_manager)
+        for category in ("Fantasy", "Polish", "Children"):
+            self.category_manager.add_category(category)
+        assignments = {1: ["Fantasy", "Polish"], 2: ["Fantasy", "Polish", "Children"],
+                       3: ["Fantasy"], 4: ["Polish"]}
+        for book_id, categories in assignments.items():
+            for category in categories:
+                self.category_manager.assign_category(book_id, category)
+
+    def test_and_not(self):
+        result = self.category_manager.query_books("Fantasy AND Polish AND NOT Children")
+        self.assertEqual(result, [1])
+
+    def test_or(self):
+        self.assertEqual(self.category_manager.query_books("Children OR Polish"), [1, 2, 4])
+
+    def test_not_includes_uncategorized_books(self):
+        self.assertEqual(self.category_manager.query_books("NOT Fantasy"), [4, 5])
+
+    def test_query_follows_changes(self):
+        self.assertEqual(self.category_manager.query_books("Children"), [2])
+        self.category_manager.remove_category_from_book(2, "Children")
+        self.category_manager.assign_category(5, "Children")
+        self.assertEqual(self.category_manager.query_books("Children"), [5])
+
+    def test_query_skips_removed_books(self):
+        del self.book_manager.books[1]
+        self.assertEqual(self.category_manager.query_books("Fantasy"), [2, 3])
+
+    def test_query_unknown_category(self):
+        with self.assertRaises(ValueError):
+            self.category_manager.query_books("Fantasy AND Horror")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,37 @@
+import pytest
+from src.category_query import parse_query, ids_to_bitmap, bitmap_to_ids
+
+
+class TestParseQuery:
+    def test_single_category(self):
+        assert parse_query("Fantasy") == ("category", "Fantasy")
+
+    def test_precedence(self):
+        assert parse_query("A OR B AND NOT C") == (
+            "or", [("category", "A"), ("and", [("category", "B"), ("not", ("category", "C"))])]
+        )
+
+    def test_parentheses(self):
+        assert parse_query("(A OR B) AND C") == (
+            "and", [("or", [("category", "A"), ("category", "B")]), ("category", "C")]
+        )
+
+    def test_multi_word_and_quoted_names(self):
+        assert parse_query('Science Fiction AND "Literatura polska"') == (
+            "and", [("category", "Science Fiction"), ("category", "Literatura polska")]
+        )
+
+    @pytest.mark.parametrize("expression", ["", "A AND", "(A OR B", "A )", "NOT", '"A'])
+    def test_invalid_queries(self, expression):
+        with pytest.raises(ValueError):
+            parse_query(expression)
+
+
+class TestBitmaps:
+    def test_roundtrip(self):
+        ids = [1, 2, 9, 64, 1000]
+        assert bitmap_to_ids(ids_to_bitmap(ids)) == ids
+
+    def test_empty(self):
+        assert ids_to_bitmap([]) == 0
+        assert bitmap_to_ids(0) == []
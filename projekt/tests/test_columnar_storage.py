@@ -0,0 +1,92 @@
+import pytest
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.columnar_storage import columnar_books, columnar_users
+from src.loan_manager import LoanManager
+from src.user_manager import UserManager
+
+
+class TestColumnarTable:
+    def test_record_roundtrip(self):
+        table = columnar_books()
+        table[3] = {"title": "Hobbit", "author": "J.R.R. Tolkien", "isbn": "9788328704442",
+                    "available": True, "year": 1937, "categories": ["Fantasy"]}
+        table[1] = {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890", "available": False}
+        assert list(table) == [1, 3]
+        assert len(table) == 2
+        assert table[1] == {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890",
+                            "available": False}
+        assert table[3]["categories"] == ["Fantasy"]
+        assert "year" not in table[1]
+        assert 2 not in table and 4 not in table and "1" not in table
+
+    def test_values_outside_column_types(self):
+        table = columnar_books()
+        table[1] = {"title": "T", "year": "ok. 1500", "available": None}
+        table[2] = {"title": "T", "year": 10 ** 12}
+        assert table[1]["year"] == "ok. 1500"
+        assert table[1]["available"] is None
+        assert table[2]["year"] == 10 ** 12
+        table[1]["year"] = 1500
+        assert table[1]["year"] == 1500
+        assert table.extra == {1: {"available": None}, 2: {"year": 10 ** 12}}
+
+    def test_view_writes_through(self):
+        table = columnar_users()
+        table[1] = {"name": "Jan", "email": "jan@example.com"}
+        user = table[1]
+        user["name"] = "Janek"
+        del user["email"]
+        assert table[1] == {"name": "Janek"}
+        with pytest.raises(KeyError):
+            del user["email"]
+
+    def test_delete_and_replace(self):
+        table = columnar_users()
+        table[1] = {"name": "Jan", "email": "jan@example.com"}
+        view = table[1]
+        del table[1]
+        assert len(table) == 0
+        with pytest.raises(KeyError):
+            table[1]
+        with pytest.raises(KeyError):
+            view["name"]
+        table[1] = {"name": "Anna"}
+        assert dict(table[1]) == {"name": "Anna"}
+        table[1] = {"email": "anna@example.com"}
+        assert dict(table[1]) == {"email": "anna@example.com"}
+
+
+class TestManagersOnColumnarStorage:
+    def test_book_manager_contract(self):
+        manager = BookManager(storage=columnar_books())
+        book_id = manager.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442", 1937)
+        assert manager.get_book(book_id) == {"title": "Hobbit", "author": "J.R.R. Tolkien",
+                                             "isbn": "9788328704442", "available": True, "year": 1937}
+        manager.update_book(book_id, new_title="Hobbit, czyli tam i z powrotem")
+        assert manager.find_books_by_title("tam i z")[0]["year"] == 1937
+        assert [dict(book) for book in manager.list_books()] == [dict(manager.get_book(book_id))]
+        manager.remove_book(book_id)
+        assert manager.list_books() == []
+
+    def test_loans_and_categories(self):
+        books = BookManager(storage=columnar_books())
+        users = UserManager(storage=columnar_users())
+        categories = CategoryManager(books)
+        loans = LoanManager(books, users)
+        user_id = users.add_user("Jan Kowalski", "jan@example.com")
+        book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        categories.add_category("Fantasy")
+        categories.assign_category(book_id, "Fantasy")
+        loans.loan_book(user_id, book_id)
+        assert books.get_book(book_id)["available"] is False
+        assert books.get_book(book_id)["categories"] == ["Fantasy"]
+        assert categories.get_books_by_category("Fantasy") == [book_id]
+        assert users.get_user_by_email("JAN@example.com")["name"] == "Jan Kowalski"
+
+    def test_existing_storage_is_reindexed(self):
+        storage = columnar_books()
+        storage[5] = {"title": "Lalka", "author": "Bolesław Prus", "isbn": "9788373271890", "available": True}
+        manager = BookManager(storage=storage)
+        assert manager.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442") == 6
+        assert manager.get_book_by_isbn("978-83-7327-189-0")["title"] == "Lalka"
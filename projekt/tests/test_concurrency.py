@@ -0,0 +1,156 @@
+import random
+import sys
+import threading
+import time
+
+import pytest
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.columnar_storage import columnar_books, columnar_users
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+THREADS = 8
+
+
+@pytest.fixture
+def fast_switching():
+    # częste przełączanie wątków zwiększa szansę trafienia na wyścig
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class SlowStorage(dict):
+    # odczyt oddaje procesor innym wątkom, jak magazyn na dysku (np. SQLite),
+    # co poszerza okno między sprawdzeniem dostępności a wypożyczeniem
+    def __getitem__(self, key):
+        time.sleep(0)
+        return super().__getitem__(key)
+
+
+def open_library(book_count, thread_safe=True):
+    books = BookManager(storage=SlowStorage(), thread_safe=thread_safe)
+    users = UserManager(thread_safe=thread_safe)
+    loans = LoanManager(books, users, thread_safe=thread_safe)
+    reservations = ReservationManager(books, users, thread_safe=thread_safe)
+    for i in range(book_count):
+        books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+    for i in range(THREADS):
+        users.add_user(f"Czytelnik {i}", f"czytelnik{i}@example.com")
+    return books, users, loans, reservations
+
+
+def run_threads(worker):
+    errors = []
+
+    def target(index):
+        try:
+            worker(index)
+        except Exception as error:  # błąd w wątku ma oblać test, a nie zniknąć
+            errors.append(error)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+class TestConcurrentLoans:
+    def test_one_book_many_threads(self, fast_switching):
+        books, users, loans, _ = open_library(1)
+        rounds = 200
+        barrier = threading.Barrier(THREADS)
+        successes = [0] * rounds
+
+        def worker(index):
+            for round_number in range(rounds):
+                barrier.wait()
+                try:
+                    loans.loan_book(index + 1, 1)
+                    successes[round_number] += 1
+                except ValueError:
+                    pass
+                if barrier.wait() == 0:
+                    loans.return_book(loans.active_by_book[1])
+                barrier.wait()
+
+        run_threads(worker)
+        assert successes == [1] * rounds
+        assert len(loans.loans) == rounds
+        assert loans.count_active_loans() == 0
+
+    def test_no_double_loans_under_load(self, fast_switching):
+        books, users, loans, reservations = open_library(16)
+        holders = [0] * 17
+        holders_lock = threading.Lock()
+        max_holders = []
+
+        def worker(index):
+            rng = random.Random(index)
+            user_id = index + 1
+            for _ in range(500):
+                book_id = rng.randint(1, 16)
+                try:
+                    loan_id = loans.loan_book(user_id, book_id)
+                except ValueError:
+                    try:
+                        reservations.reserve_book(user_id, book_id)
+                    except ValueError:
+                        pass
+                    continue
+                with holders_lock:
+                    holders[book_id] += 1
+                    max_holders.append(holders[book_id])
+                with holders_lock:
+                    holders[book_id] -= 1
+                loans.return_book(loan_id)
+                reservations.book_returned(book_id)
+
+        run_threads(worker)
+        assert max(max_holders) == 1
+        assert loans.count_active_loans() == 0
+        assert all(book["available"] for book in books.list_books())
+        # każde wypożyczenie zostało zwrócone dokładnie raz
+        assert all(loan["returned"] for loan in loans.list_loans())
+        assert sum(len(history) for history in loans.user_history.values()) == len(loans.loans)
+        # nikt nie ma dwóch aktywnych rezerwacji tej samej książki
+        active = [(r["user_id"], r["book_id"]) for r in reservations.list_reservations()
+                  if r["status"] in ("waiting", "ready")]
+        assert len(active) == len(set(active)) == len(reservations.active_reservations)
+
+    def test_categories_and_users_in_parallel(self, fast_switching):
+        books, users, loans, _ = open_library(32)
+        categories = CategoryManager(books, thread_safe=True)
+        for name in ("A", "B", "C"):
+            categories.add_category(name)
+
+        def worker(index):
+            for book_id in range(1, 33):
+                categories.assign_category(book_id, "ABC"[(book_id + index) % 3])
+                users.update_user(index + 1, new_name=f"Czytelnik {index} {book_id}")
+            users.add_user(f"Nowy {index}", f"nowy{index}@example.com")
+
+        run_threads(worker)
+        assert len(users.users) == 2 * THREADS
+        assert len(set(users.users)) == 2 * THREADS
+        for book_id in range(1, 33):
+            assigned = books.get_book(book_id)["categories"]
+            assert len(assigned) == len(set(assigned))
+            assert set(categories.book_categories[book_id]) == {
+                books.dictionary.encode(name) for name in assigned}
+
+    def test_thread_safe_requires_locked_managers(self):
+        with pytest.raises(ValueError):
+            LoanManager(BookManager(), UserManager(), thread_safe=True)
+
+    def test_thread_safe_rejects_single_threaded_storage(self):
+        with pytest.raises(ValueError):
+            BookManager(storage=columnar_books(), thread_safe=True)
+        with pytest.raises(ValueError):
+            UserManager(storage=columnar_users(), thread_safe=True)
+        UserManager(storage=columnar_users())
@@ -0,0 +1,95 @@
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.columnar_storage import columnar_books
+from src.interning import StringDictionary
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+class TestStringDictionary:
+    def test_codes_are_stable(self):
+        dictionary = StringDictionary(["waiting", "ready"])
+        assert dictionary.encode("ready") == 1
+        assert dictionary.encode("completed") == 2
+        assert dictionary.encode("waiting") == 0
+        assert dictionary.decode(2) == "completed"
+        assert len(dictionary) == 3
+
+    def test_lookup_does_not_add(self):
+        dictionary = StringDictionary()
+        assert dictionary.lookup("Fantasy") is None
+        assert "Fantasy" not in dictionary
+        assert len(dictionary) == 0
+
+    def test_intern_returns_one_copy(self):
+        dictionary = StringDictionary()
+        first = dictionary.intern("".join(["Bolesław ", "Prus"]))
+        second = dictionary.intern("".join(["Bolesław", " Prus"]))
+        assert first is second
+
+
+class TestSharedDictionary:
+    def test_managers_share_codes(self):
+        books = BookManager()
+        users = UserManager()
+        categories = CategoryManager(books)
+        reservations = ReservationManager(books, users)
+        assert categories.dictionary is books.dictionary
+        assert reservations.dictionary is books.dictionary
+
+        book_id = books.add_book("Hobbit", "Fantasy", "9788328704442")
+        categories.add_category("Fantasy")
+        categories.assign_category(book_id, "Fantasy")
+        # ten sam napis jako autor i kategoria ma jeden kod
+        assert len(books.dictionary) == 1
+        assert books.get_book(book_id)["author"] is books.get_book(book_id)["categories"][0]
+
+    def test_authors_are_interned(self):
+        books = BookManager()
+        first = books.add_book("Lalka", "".join(["Bolesław ", "Prus"]), "9788373271890")
+        second = books.add_book("Faraon", "".join(["Bolesław", " Prus"]), "9788373271890")
+        assert books.get_book(first)["author"] is books.get_book(second)["author"]
+
+    def test_get_books_by_author(self):
+        books = BookManager()
+        hobbit = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        silmarillion = books.add_book("Silmarillion", "J.R.R. Tolkien", "9788328704442")
+        assert [book["title"] for book in books.get_books_by_author("J.R.R. Tolkien")] == ["Hobbit", "Silmarillion"]
+        assert books.get_books_by_author("Tolkien") == []
+        assert books.get_books_by_author("Nieznany") == []
+        assert "Nieznany" not in books.dictionary
+
+        books.update_book(hobbit, new_author="John Ronald Reuel Tolkien")
+        books.remove_book(silmarillion)
+        assert books.get_books_by_author("J.R.R. Tolkien") == []
+        assert books.get_books_by_author("John Ronald Reuel Tolkien")[0]["title"] == "Hobbit"
+
+    def test_reservation_status_index_uses_codes(self):
+        books = BookManager()
+        users = UserManager()
+        loans = LoanManager(books, users)
+        reservations = ReservationManager(books, users)
+        user_id = users.add_user("Jan Kowalski", "jan@example.com")
+        other_id = users.add_user("Anna Nowak", "anna@example.com")
+        book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        loan_id = loans.loan_book(user_id, book_id)
+        reservation_id = reservations.reserve_book(other_id, book_id)
+        loans.return_book(loan_id)
+        reservations.book_returned(book_id)
+
+        ready = books.dictionary.lookup("ready")
+        assert reservations.status_index[ready] == {reservation_id}
+        assert reservations.list_reservations("ready")[0]["user_id"] == other_id
+        assert reservations.list_reservations("nieznany") == []
+
+    def test_columnar_storage_stores_author_codes(self):
+        storage = columnar_books()
+        books = BookManager(storage=storage)
+        assert books.dictionary is storage.dictionary
+        for i in range(10):
+            books.add_book(f"Tytuł {i}", f"Autor {i % 2}", "9788328704442")
+        assert list(storage.coded_columns["author"][1:]) == [0, 1] * 5
+        assert books.get_book(4)["author"] == "Autor 1"
+        assert len(books.get_books_by_author("Autor 0")) == 5
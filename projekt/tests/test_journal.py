@@ -0,0 +1,143 @@
+import json
+import time
+
+import pytest
+from src import journal as journal_module
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.journal import Journal, read_journal, replay_journal
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+def open_library(journal, tables=None):
+    tables = tables or {}
+    books = BookManager(storage=journal.table("books", tables.get("books")))
+    users = UserManager(storage=journal.table("users", tables.get("users")))
+    loans = LoanManager(books, users, storage=journal.table("loans", tables.get("loans")))
+    reservations = ReservationManager(books, users, storage=journal.table("reservations", tables.get("reservations")))
+    categories = CategoryManager(books, storage=journal.table("categories", tables.get("categories")))
+    return books, users, loans, reservations, categories
+
+
+class TestJournal:
+    def test_entries_are_compact_json_lines(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        with Journal(path) as journal:
+            table = journal.table("books")
+            table[1] = {"title": "Lalka"}
+            del table[1]
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines == [
+            '{"table":"books","key":1,"record":{"title":"Lalka"},"seq":1}',
+            '{"table":"books","key":1,"deleted":true,"seq":2}',
+        ]
+
+    def test_group_commit(self, tmp_path, monkeypatch):
+        synced = []
+        monkeypatch.setattr(journal_module.os, "fsync", lambda fd: synced.append(fd))
+        journal = Journal(tmp_path / "journal.jsonl", group_size=3, group_interval=60)
+        for i in range(7):
+            journal.put("books", i, {})
+        assert len(synced) == 2
+        journal.close()
+        assert len(synced) == 3
+
+    def test_entries_reach_the_file_before_fsync(self, tmp_path, monkeypatch):
+        # awaria procesu (bez close) nie gubi wpisów, na które czeka fsync
+        monkeypatch.setattr(journal_module.os, "fsync", lambda fd: None)
+        path = tmp_path / "journal.jsonl"
+        journal = Journal(path, group_size=1000, group_interval=60)
+        for i in range(5):
+            journal.put("books", i, {})
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 5
+        journal.close()
+
+    def test_group_interval_bounds_unsynced_window(self, tmp_path, monkeypatch):
+        synced = []
+        monkeypatch.setattr(journal_module.os, "fsync", lambda fd: synced.append(fd))
+        journal = Journal(tmp_path / "journal.jsonl", group_size=1000, group_interval=0.01)
+        journal.put("books", 1, {})
+        deadline = time.monotonic() + 5
+        while not synced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(synced) == 1
+        assert journal.pending == 0
+        journal.close()
+
+    def test_torn_tail_is_skipped_and_truncated(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        with Journal(path) as journal:
+            journal.put("books", 1, {"title": "Lalka"})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"table":"books","key":2,"rec')
+        assert replay_journal(path) == {"books": {1: {"title": "Lalka"}}}
+
+        with Journal(path) as journal:
+            assert journal.sequence == 1
+            journal.put("books", 3, {"title": "Chłopi"})
+        assert sorted(replay_journal(path)["books"]) == [1, 3]
+        assert replay_journal(path, after_sequence=1) == {"books": {3: {"title": "Chłopi"}}}
+
+    def test_corrupt_entry_in_the_middle_raises(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        path.write_text('{"table":"books","key":1,"record":{}}\nxx\n{"table":"books","key":2,"record":{}}\n',
+                        encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(read_journal(path))
+
+    def test_missing_journal_replays_to_empty_state(self, tmp_path):
+        assert replay_journal(tmp_path / "missing.jsonl") == {}
+
+
+class TestJournaledManagers:
+    def test_state_survives_replay(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        with Journal(path) as journal:
+            books, users, loans, reservations, categories = open_library(journal)
+            jan = users.add_user("Jan Kowalski", "jan@example.com")
+            anna = users.add_user("Anna Nowak", "anna@example.com")
+            hobbit = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            lalka = books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+            books.update_book(lalka, new_year=1890)
+            categories.add_category("Fantasy")
+            categories.assign_category(hobbit, "Fantasy")
+            loan_id = loans.loan_book(jan, hobbit)
+            reservation_id = reservations.reserve_book(anna, hobbit)
+            loans.loan_book(anna, lalka)
+
+        books, users, loans, reservations, categories = open_library(Journal(path), replay_journal(path))
+        assert books.get_book(hobbit)["available"] is False
+        assert books.get_book(lalka)["year"] == 1890
+        assert books.find_books_by_title("hob") == [books.get_book(hobbit)]
+        assert categories.get_books_by_category("Fantasy") == [hobbit]
+        assert loans.get_book_active_loan(hobbit)["user_id"] == jan
+        assert reservations.get_position_in_queue(reservation_id) == 1
+
+        loans.return_book(loan_id)
+        assert reservations.book_returned(hobbit) == reservation_id
+        assert books.add_book("Chłopi", "Władysław Reymont", "9788373271906") == lalka + 1
+        assert users.add_user("Ewa", "ewa@example.com") == anna + 1
+        books.books.journal.close()
+
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert records[-1]["table"] == "users"
+        tables = replay_journal(path)
+        assert tables["reservations"][reservation_id]["status"] == "ready"
+        assert tables["books"][hobbit]["available"] is True
+
+    def test_removed_ids_are_not_reused_after_replay(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        with Journal(path) as journal:
+            books = BookManager(storage=journal.table("books"))
+            books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            removed = books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+            books.remove_book(removed)
+
+        max_deleted = {}
+        tables = replay_journal(path, max_deleted=max_deleted)
+        assert max_deleted == {"books": removed}
+        with Journal(path) as journal:
+            books = BookManager(storage=journal.table("books", tables["books"], max_deleted["books"]))
+            assert books.add_book("Chłopi", "Władysław Reymont", "9788373271906") == removed + 1
@@ -129,4 +129,39 @@ class TestComplexLoanScenarios:
         book = loan_manager.book_manager.get_book(book_id)
         assert book["available"] is True
         loan = loan_manager.get_loan(loan_id)
-        assert loan["returned"] is True
\ No newline at end of file
+        assert loan["returned"] is True
+
+
+class TestLoanIndexes:
+    def test_user_active_loans(self, setup_managers):
+        loan_manager, book_id, user_id, book_manager, _ = setup_managers
+        book_id2 = book_manager.add_book("Animal Farm", "George Orwell", "9780451526342", 1945)
+        loan_id = loan_manager.loan_book(user_id, book_id)
+        loan_id2 = loan_manager.loan_book(user_id, book_id2)
+        loan_manager.return_book(loan_id)
+        assert loan_manager.get_user_active_loans(user_id) == [loan_manager.get_loan(loan_id2)]
+        assert loan_manager.get_user_active_loans(999) == []
+
+    def test_book_active_loan(self, setup_managers):
+        loan_manager, book_id, user_id, *_ = setup_managers
+        assert loan_manager.get_book_active_loan(book_id) is None
+        loan_id = loan_manager.loan_book(user_id, book_id)
+        assert loan_manager.get_book_active_loan(book_id) is loan_manager.get_loan(loan_id)
+        loan_manager.return_book(loan_id)
+        assert loan_manager.get_book_active_loan(book_id) is None
+
+    def test_user_loan_history_keeps_returned_loans(self, setup_managers):
+        loan_manager, book_id, user_id, *_ = setup_managers
+        first_id = loan_manager.loan_book(user_id, book_id)
+        loan_manager.return_book(first_id)
+        second_id = loan_manager.loan_book(user_id, book_id)
+        history = loan_manager.get_user_loan_history(user_id)
+        assert history == [loan_manager.get_loan(first_id), loan_manager.get_loan(second_id)]
+
+    def test_count_active_loans(self, setup_managers):
+        loan_manager, book_id, user_id, *_ = setup_managers
+        assert loan_manager.count_active_loans() == 0
+        loan_id = loan_manager.loan_book(user_id, book_id)
+        assert loan_manager.count_active_loans() == 1
+        loan_manager.return_book(loan_id)
+        assert loan_manager.count_active_loans() == 0
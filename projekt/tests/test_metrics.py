@@ -0,0 +1,105 @@
+import threading
+import urllib.request
+
+import pytest
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.metrics import Metrics
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+def sample(text, line_start):
+    # wartość próbki o podanej nazwie i etykietach z tekstu w formacie Prometheusa
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"brak próbki {line_start}")
+
+
+class TestMetrics:
+    def setup_method(self):
+        self.books = BookManager()
+        self.users = UserManager()
+        self.loans = LoanManager(self.books, self.users)
+        self.reservations = ReservationManager(self.books, self.users)
+        self.user_id = self.users.add_user("Jan Kowalski", "jan@example.com")
+        for i in range(3):
+            self.books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+        self.metrics = Metrics()
+        self.metrics.instrument(self.books, self.users, self.loans, self.reservations)
+
+    def test_counts_calls_errors_and_latency(self):
+        for _ in range(3):
+            self.books.get_book(1)
+        with pytest.raises(ValueError):
+            self.books.update_book(99, new_title="Brak")
+
+        text = self.metrics.render()
+        labels = '{manager="BookManager",method="get_book"}'
+        assert sample(text, f"library_calls_total{labels}") == 3
+        assert sample(text, f"library_call_duration_seconds_count{labels}") == 3
+        assert sample(text, 'library_call_duration_seconds_bucket{manager="BookManager",method="get_book",le="+Inf"}') == 3
+        assert sample(text, 'library_errors_total{manager="BookManager",method="update_book",error="ValueError"}') == 1
+        assert sample(text, 'library_calls_total{manager="BookManager",method="update_book"}') == 1
+
+    def test_nested_manager_calls_are_counted(self):
+        self.loans.loan_book(self.user_id, 1)
+        text = self.metrics.render()
+        assert sample(text, 'library_calls_total{manager="LoanManager",method="loan_book"}') == 1
+        assert sample(text, 'library_calls_total{manager="BookManager",method="set_available"}') == 1
+
+    def test_histogram_buckets_are_cumulative(self):
+        self.books.list_books()
+        buckets = [float(line.rsplit(" ", 1)[1]) for line in self.metrics.render().splitlines()
+                   if line.startswith('library_call_duration_seconds_bucket{manager="BookManager",method="list_books"')]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == 1
+
+    def test_gauges_follow_manager_state(self):
+        other_id = self.users.add_user("Anna Nowak", "anna@example.com")
+        self.loans.loan_book(self.user_id, 1)
+        self.reservations.reserve_book(other_id, 1)
+        text = self.metrics.render()
+        assert sample(text, "library_active_loans") == 1
+        assert sample(text, "library_books") == 3
+        assert sample(text, "library_reservation_queue_length_total") == 1
+        assert sample(text, "library_reservation_queue_length_max") == 1
+        assert sample(text, 'library_reservations{status="waiting"}') == 1
+
+    def test_counts_from_many_threads_add_up(self):
+        def reads():
+            for _ in range(500):
+                self.books.get_book(2)
+
+        threads = [threading.Thread(target=reads) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sample(self.metrics.render(), 'library_calls_total{manager="BookManager",method="get_book"}') == 2000
+
+    def test_uninstrument_restores_plain_methods(self):
+        self.metrics.uninstrument()
+        assert type(self.books) is BookManager
+        self.books.get_book(1)
+        assert "library_active_loans" not in self.metrics.render()
+        assert sample(self.metrics.render(), 'library_calls_total{manager="BookManager",method="get_book"}') == 0
+
+    def test_write_prometheus_file(self, tmp_path):
+        self.books.get_book(1)
+        path = tmp_path / "library.prom"
+        self.metrics.write(str(path))
+        assert sample(path.read_text(encoding="utf-8"), 'library_calls_total{manager="BookManager",method="get_book"}') == 1
+        assert [p.name for p in tmp_path.iterdir()] == ["library.prom"]
+
+    def test_http_endpoint(self):
+        host, port = self.metrics.serve(port=0)
+        try:
+            self.books.get_book(1)
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                text = response.read().decode("utf-8")
+            assert sample(text, 'library_calls_total{manager="BookManager",method="get_book"}') == 1
+        finally:
+            self.metrics.stop()
@@ -0,0 +1,125 @@
+import pytest
+from src.book_manager import BookManager
+from src.columnar_storage import columnar_books
+from src.loan_manager import LoanManager
+from src.pagination import keys_after
+from src.reservation_manager import ReservationManager
+from src.sqlite_storage import SqliteBackend
+from src.user_manager import UserManager
+
+
+def all_pages(list_page, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page = list_page(limit=limit, cursor=cursor, **filters)
+        pages.append([item_id for item_id, _ in page])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class CountingDict(dict):
+    # zlicza sprawdzenia ID - koszt strony ma zależeć od jej rozmiaru
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def __contains__(self, key):
+        self.lookups += 1
+        return super().__contains__(key)
+
+
+class TestBookPages:
+    def setup_method(self):
+        self.books = BookManager()
+        for i in range(10):
+            self.books.add_book(f"Tytuł {i}", "Tolkien" if i % 2 else "Prus", "1234567890")
+
+    def test_pages_cover_all_books_in_order(self):
+        assert all_pages(self.books.list_books_page, 4) == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+    def test_last_full_page_has_no_cursor_after_it(self):
+        page = self.books.list_books_page(limit=10)
+        assert len(page) == 10 and page.next_cursor is None
+
+    def test_cursor_is_stable_after_removal(self):
+        page = self.books.list_books_page(limit=3)
+        self.books.remove_book(2)
+        self.books.remove_book(4)
+        next_page = self.books.list_books_page(limit=3, cursor=page.next_cursor)
+        assert [book_id for book_id, _ in next_page] == [5, 6, 7]
+
+    def test_filters(self):
+        assert all_pages(self.books.list_books_page, 2, author="Tolkien") == [[2, 4], [6, 8], [10]]
+        self.books.set_available(3, False)
+        assert [book_id for book_id, _ in self.books.iter_books(available=False)] == [3]
+        assert list(self.books.iter_books(author="Nieznany")) == []
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError):
+            self.books.list_books_page(limit=0)
+
+    def test_iterator_is_lazy(self):
+        iterator = self.books.iter_books(after=8)
+        self.books.add_book("Nowa", "Autor", "1234567890")
+        assert [book_id for book_id, _ in iterator] == [9, 10, 11]
+
+    def test_page_cost_does_not_grow_with_table(self):
+        storage = CountingDict()
+        books = BookManager(storage=storage)
+        for i in range(5000):
+            books.add_book(f"Tytuł {i}", "Autor", "1234567890")
+        storage.lookups = 0
+        page = books.list_books_page(limit=20, cursor=4000)
+        assert page.items[0][0] == 4001
+        assert storage.lookups <= 21
+
+
+class TestStorageKeysAfter:
+    def test_columnar(self):
+        books = BookManager(storage=columnar_books())
+        for i in range(5):
+            books.add_book(f"Tytuł {i}", "Autor", "1234567890")
+        books.remove_book(3)
+        assert list(keys_after(books.books, 1, books.next_id)) == [2, 4, 5]
+
+    def test_sqlite(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            users = UserManager(storage=backend.table("users"))
+            for i in range(5):
+                users.add_user(f"Jan {i}", f"jan{i}@example.com")
+            users.remove_user(2)
+            assert all_pages(users.list_users_page, 2) == [[1, 3], [4, 5]]
+
+
+class TestLoanAndReservationPages:
+    def setup_method(self):
+        self.books = BookManager()
+        self.users = UserManager()
+        self.loans = LoanManager(self.books, self.users)
+        self.reservations = ReservationManager(self.books, self.users)
+        for i in range(3):
+            self.users.add_user(f"Jan {i}", f"jan{i}@example.com")
+        for i in range(6):
+            self.books.add_book(f"Tytuł {i}", "Autor", "1234567890")
+
+    def test_loans_by_user_and_activity(self):
+        for book_id in range(1, 7):
+            self.loans.loan_book(book_id % 2 + 1, book_id)
+        self.loans.return_book(3)
+        assert all_pages(self.loans.list_loans_page, 2, user_id=2) == [[1, 3], [5]]
+        assert [loan_id for loan_id, _ in self.loans.iter_loans(active=True)] == [1, 2, 4, 5, 6]
+        assert [loan_id for loan_id, _ in self.loans.iter_loans(after=1, active=False)] == [3]
+        assert [loan_id for loan_id, _ in self.loans.iter_loans(after=4, user_id=1)] == [6]
+
+    def test_reservations_by_status_user_and_book(self):
+        self.books.set_available(1, False)
+        self.books.set_available(2, False)
+        for user_id in (1, 2, 3):
+            self.reservations.reserve_book(user_id, 1)
+        self.reservations.reserve_book(1, 2)
+        self.reservations.cancel_reservation(2)
+        assert all_pages(self.reservations.list_reservations_page, 2, status="waiting") == [[1, 3], [4]]
+        assert [res_id for res_id, _ in self.reservations.iter_reservations(user_id=1)] == [1, 4]
+        assert [res_id for res_id, _ in self.reservations.iter_reservations(book_id=1, status="waiting")] == [1, 3]
+        assert [res_id for res_id, _ in self.reservations.iter_reservations(after=2)] == [3, 4]
@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+
+import pytest
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.persistence import LibraryStore
+from src.user_manager import UserManager
+
+
+def open_managers(store):
+    books = BookManager(storage=store.table("books"))
+    users = UserManager(storage=store.table("users"))
+    loans = LoanManager(books, users, storage=store.table("loans"))
+    return books, users, loans
+
+
+class TestLibraryStore:
+    def test_snapshot_and_journal_tail_are_combined(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            books, users, loans = open_managers(store)
+            user_id = users.add_user("Jan Kowalski", "jan@example.com")
+            book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            store.snapshot()
+            assert os.path.getsize(store.journal_path) == 0
+            loan_id = loans.loan_book(user_id, book_id)
+
+        with LibraryStore(tmp_path) as store:
+            books, users, loans = open_managers(store)
+            assert books.get_book(book_id)["available"] is False
+            assert loans.get_book_active_loan(book_id) is loans.get_loan(loan_id)
+            assert users.get_user(user_id)["name"] == "Jan Kowalski"
+
+    def test_snapshot_keeps_key_types(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            store.table("books")[1] = {"title": "Lalka"}
+            store.table("categories")["Fantasy"] = True
+            store.snapshot()
+        with LibraryStore(tmp_path) as store:
+            assert dict(store.table("books")) == {1: {"title": "Lalka"}}
+            assert dict(store.table("categories")) == {"Fantasy": True}
+
+    def test_automatic_snapshot(self, tmp_path):
+        with LibraryStore(tmp_path, snapshot_every=5) as store:
+            books, _, _ = open_managers(store)
+            for i in range(12):
+                books.add_book(f"Tytuł {i}", "Autor", "1234567890")
+            assert store.snapshot_sequence == 10
+            assert store.journal.sequence == 12
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            assert len(books.books) == 12
+            assert books.add_book("Nowa", "Autor", "1234567890") == 13
+
+    def test_crash_before_journal_truncation(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            books.remove_book(book_id)
+            store.sync()
+            with open(store.journal_path, encoding="utf-8") as f:
+                journal_before_snapshot = f.read()
+            books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+            store.snapshot()
+        # migawka zapisana, ale dziennik nie został obcięty
+        with open(tmp_path / "journal.jsonl", "w", encoding="utf-8") as f:
+            f.write(journal_before_snapshot)
+
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            assert [book["title"] for book in books.list_books()] == ["Lalka"]
+            assert store.journal.sequence == 3
+
+    def test_torn_journal_write_keeps_dataset(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            store.snapshot()
+            books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+        with open(tmp_path / "journal.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"table":"books","key":3,"rec')
+
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            assert [book["title"] for book in books.list_books()] == ["Hobbit", "Lalka"]
+
+    def test_corrupt_snapshot_raises(self, tmp_path):
+        with open(tmp_path / "snapshot.json", "w", encoding="utf-8") as f:
+            f.write('{"sequence": 3, "tab')
+        with pytest.raises(ValueError):
+            LibraryStore(tmp_path)
+
+    def test_snapshot_is_compact_json(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            store.table("books")[1] = {"title": "Lalka"}
+            store.snapshot()
+        with open(tmp_path / "snapshot.json", encoding="utf-8") as f:
+            content = f.read()
+        assert json.loads(content) == {"sequence": 1, "tables": {"books": [[1, {"title": "Lalka"}]]}}
+        assert "\n" not in content
+        assert not os.path.exists(tmp_path / "snapshot.json.tmp")
+
+    def test_removed_ids_are_not_reused_after_restart(self, tmp_path):
+        with LibraryStore(tmp_path) as store:
+            books, users, loans = open_managers(store)
+            user_id = users.add_user("Jan Kowalski", "jan@example.com")
+            books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            removed = books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+            loans.return_book(loans.loan_book(user_id, removed))
+            books.remove_book(removed)
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            assert books.add_book("Chłopi", "Władysław Reymont", "9788373271906") == removed + 1
+            store.snapshot()
+            books.remove_book(removed + 1)
+        with LibraryStore(tmp_path) as store:
+            books, _, _ = open_managers(store)
+            assert books.add_book("Potop", "Henryk Sienkiewicz", "9788373271913") == removed + 2
+
+    def test_concurrent_writes_with_automatic_snapshots(self, tmp_path):
+        with LibraryStore(tmp_path, snapshot_every=20) as store:
+            books = BookManager(storage=store.table("books"), thread_safe=True)
+            users = UserManager(storage=store.table("users"), thread_safe=True)
+            loans = LoanManager(books, users, storage=store.table("loans"), thread_safe=True)
+            user_id = users.add_user("Jan Kowalski", "jan@example.com")
+            book_ids = [books.add_book(f"Tytuł {i}", "Autor", "9788328704442") for i in range(8)]
+            errors = []
+
+            def worker(book_id):
+                try:
+                    for _ in range(60):
+                        loans.return_book(loans.loan_book(user_id, book_id))
+                except Exception as error:
+                    errors.append(error)
+
+            threads = [threading.Thread(target=worker, args=(book_id,)) for book_id in book_ids]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert errors == []
+
+        with LibraryStore(tmp_path) as store:
+            books, _, loans = open_managers(store)
+            assert len(loans.loans) == 480
+            assert all(loan["returned"] for loan in loans.loans.values())
+            assert all(books.get_book(book_id)["available"] for book_id in book_ids)
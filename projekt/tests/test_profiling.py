@@ -0,0 +1,98 @@
+import re
+import time
+
+import pytest
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.profiling import Profiler, call_tag, size_class
+from src.user_manager import UserManager
+
+COLLAPSED_LINE = re.compile(r"^[^;\n]+(;[^;\n]+)* \d+$")
+
+
+class SlowBooks(dict):
+    # magazyn, którego odczyt trwa - próbki trafiają w jego ramkę
+    def __getitem__(self, key):
+        time.sleep(0.02)
+        return super().__getitem__(key)
+
+
+def read_collapsed(path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines and all(COLLAPSED_LINE.match(line) for line in lines)
+    return [(line.rsplit(" ", 1)[0].split(";"), int(line.rsplit(" ", 1)[1])) for line in lines]
+
+
+def test_call_tag_describes_argument_and_result_shape():
+    assert size_class(0) == "0"
+    assert size_class(7) == "1-9"
+    assert size_class(250) == "100-999"
+    assert call_tag("BookManager", "find_books_by_title", ("hobbit",), {"match": "words"}, [1] * 12, None) == \
+        "BookManager.find_books_by_title(str,match=str)->list[10-99]"
+    assert call_tag("LoanManager", "loan_book", (1, 2), {}, None, ValueError()) == \
+        "LoanManager.loan_book(int,int)->raise ValueError"
+
+
+class TestSlowestCalls:
+    def setup_method(self):
+        self.books = BookManager()
+        for i in range(2000):
+            self.books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+        self.profiler = Profiler(self.books)
+
+    def test_keeps_n_slowest_calls(self, tmp_path):
+        with self.profiler.capture_slowest(2):
+            for _ in range(10):
+                self.books.get_book(1)
+            self.books.find_books_by_title("tytuł")
+            self.books.list_books()
+        assert type(self.books) is BookManager
+
+        calls = self.profiler.slowest_calls()
+        assert len(calls) == 2
+        assert calls[0][0] >= calls[1][0]
+        assert {tag for _, tag, _ in calls} == {"BookManager.find_books_by_title(str)->list[1000-9999]",
+                                                "BookManager.list_books()->list[1000-9999]"}
+        assert all(stats.total_calls > 0 for _, _, stats in calls)
+
+        path = tmp_path / "slowest.folded"
+        self.profiler.write_slowest(str(path))
+        stacks = read_collapsed(path)
+        assert {stack[0].split(" ")[0] for stack, _ in stacks} == {tag for _, tag, _ in calls}
+        assert any(stack[1].startswith("find_books_by_title (book_manager.py:") for stack, _ in stacks)
+
+    def test_second_mode_needs_stop(self):
+        self.profiler.capture_slowest()
+        with pytest.raises(ValueError):
+            self.profiler.sample()
+        self.profiler.stop()
+        assert type(self.books) is BookManager
+
+
+class TestSampling:
+    def setup_method(self):
+        self.books = BookManager(storage=SlowBooks())
+        self.users = UserManager()
+        self.loans = LoanManager(self.books, self.users)
+        self.user_id = self.users.add_user("Jan Kowalski", "jan@example.com")
+        self.books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+        self.profiler = Profiler(self.books, self.loans)
+
+    def test_samples_are_tagged_with_outermost_call(self, tmp_path):
+        with self.profiler.sample(interval=0.002):
+            self.loans.loan_book(self.user_id, 1)
+        path = tmp_path / "samples.folded"
+        self.profiler.write_samples(str(path))
+        stacks = read_collapsed(path)
+        assert {stack[0] for stack, _ in stacks} == {"LoanManager.loan_book(int,int)->int"}
+        assert any(stack[1].startswith("loan_book (loan_manager.py:") and stack[-1].startswith("__getitem__ (test_profiling.py:")
+                   for stack, _ in stacks)
+        assert not any("profiled" in frame for stack, _ in stacks for frame in stack)
+
+    def test_window_stops_after_duration(self):
+        self.profiler.sample(duration=0.05, interval=0.002)
+        self.books.get_book(1)
+        time.sleep(0.3)
+        assert self.profiler.mode is None
+        assert type(self.books) is BookManager
+        assert sum(self.profiler.samples.values()) > 0
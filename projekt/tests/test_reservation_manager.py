@@ -47,6 +47,20 @@ class TestReservationManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.rm.reserve_book(1, 101)
 
+    def test_reserve_again_after_cancel(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.cancel_reservation(reservation_id)
+        new_id = self.rm.reserve_book(1, 101)
+        self.assertNotEqual(new_id, reservation_id)
+        self.assertIn((1, 101), self.rm.active_reservations)
+
+    def test_reserve_again_after_complete(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.book_returned(101)
+        self.rm.complete_reservation(reservation_id)
+        self.assertNotIn((1, 101), self.rm.active_reservations)
+        self.rm.reserve_book(1, 101)
+
     def test_cancel_reservation(self):
         reservation_id = self.rm.reserve_book(1, 101)
         result = self.rm.cancel_reservation(reservation_id)
@@ -65,11 +79,61 @@ class TestReservationManager(unittest.TestCase):
     def test_expired_reservation(self):
         reservation_id = self.rm.reserve_book(1, 101)
         self.rm.book_returned(101)
-        self.rm.reservations[reservation_id]["expiry_date"] = (datetime.now() - timedelta(days=1)).isoformat()
+        self.rm.set_expiry_date(reservation_id, datetime.now() - timedelta(days=1))
         expired = self.rm.check_expired_reservations()
         self.assertIn(reservation_id, expired)
         self.assertEqual(self.rm.reservations[reservation_id]["status"], "expired")
 
+    def test_expiry_moved_later_in_record(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.book_returned(101)
+        later = datetime.now() + timedelta(days=10)
+        self.rm.reservations[reservation_id]["expiry_date"] = later.isoformat()
+        self.assertEqual(self.rm.check_expired_reservations(now=later - timedelta(days=1)), [])
+        self.assertEqual(self.rm.next_expiry(), later)
+        self.assertEqual(self.rm.check_expired_reservations(now=later + timedelta(days=20)), [reservation_id])
+        self.assertIsNone(self.rm.next_expiry())
+
+    def test_set_expiry_date_requires_ready_reservation(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        with self.assertRaises(ValueError):
+            self.rm.set_expiry_date(reservation_id, datetime.now())
+        with self.assertRaises(ValueError):
+            self.rm.set_expiry_date(999, datetime.now())
+
+    def test_expired_reservation_promotes_next_in_queue(self):
+        self.user_manager.add_user(2)
+        res1 = self.rm.reserve_book(1, 101)
+        res2 = self.rm.reserve_book(2, 101)
+        self.rm.book_returned(101)
+        after_expiry = self.rm.next_expiry() + timedelta(seconds=1)
+        self.assertEqual(self.rm.check_expired_reservations(now=after_expiry), [res1])
+        self.assertEqual(self.rm.get_reservation(res2)["status"], "ready")
+        self.assertEqual(self.rm.get_position_in_queue(res2), 1)
+
+    def test_not_expired_reservation(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.book_returned(101)
+        self.assertEqual(self.rm.check_expired_reservations(), [])
+        self.assertEqual(self.rm.get_reservation(reservation_id)["status"], "ready")
+
+    def test_next_expiry(self):
+        self.assertIsNone(self.rm.next_expiry())
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.book_returned(101)
+        expiry = self.rm.next_expiry()
+        self.assertEqual(expiry.isoformat(), self.rm.get_reservation(reservation_id)["expiry_date"])
+        self.rm.complete_reservation(reservation_id)
+        self.assertIsNone(self.rm.next_expiry())
+
+    def test_cancelled_ready_reservation_does_not_expire(self):
+        reservation_id = self.rm.reserve_book(1, 101)
+        self.rm.book_returned(101)
+        self.rm.cancel_reservation(reservation_id)
+        after_expiry = datetime.now() + timedelta(days=self.rm.reservation_expiry_days + 1)
+        self.assertEqual(self.rm.check_expired_reservations(now=after_expiry), [])
+        self.assertEqual(self.rm.get_reservation(reservation_id)["status"], "cancelled")
+
     def test_position_in_queue(self):
         self.user_manager.add_user(2)
         self.book_manager.add_book(102, available=False)
@@ -78,6 +142,46 @@ class TestReservationManager(unittest.TestCase):
         self.assertEqual(self.rm.get_position_in_queue(res1), 1)
         self.assertEqual(self.rm.get_position_in_queue(res2), 2)
 
+    def test_position_in_queue_after_cancel(self):
+        self.user_manager.add_user(2)
+        self.user_manager.add_user(3)
+        res1 = self.rm.reserve_book(1, 101)
+        res2 = self.rm.reserve_book(2, 101)
+        res3 = self.rm.reserve_book(3, 101)
+        self.rm.cancel_reservation(res2)
+        self.assertEqual(self.rm.get_position_in_queue(res2), -1)
+        self.assertEqual(self.rm.get_position_in_queue(res3), 2)
+        self.rm.cancel_reservation(res1)
+        self.assertEqual(self.rm.get_position_in_queue(res3), 1)
+        self.assertEqual(self.rm.book_returned(101), res3)
+
+    def test_user_and_book_reservations(self):
+        self.user_manager.add_user(2)
+        self.book_manager.add_book(102, available=False)
+        res1 = self.rm.reserve_book(1, 101)
+        res2 = self.rm.reserve_book(1, 102)
+        res3 = self.rm.reserve_book(2, 101)
+        self.assertEqual(self.rm.get_user_reservations(1),
+                         [self.rm.get_reservation(res1), self.rm.get_reservation(res2)])
+        self.assertEqual(self.rm.get_book_reservations(101),
+                         [self.rm.get_reservation(res1), self.rm.get_reservation(res3)])
+        self.assertEqual(self.rm.get_user_reservations(99), [])
+
+    def test_list_reservations_by_status_follows_transitions(self):
+        self.user_manager.add_user(2)
+        res1 = self.rm.reserve_book(1, 101)
+        res2 = self.rm.reserve_book(2, 101)
+        self.rm.book_returned(101)
+        self.assertEqual([r["user_id"] for r in self.rm.list_reservations("ready")], [1])
+        self.assertEqual([r["user_id"] for r in self.rm.list_reservations("waiting")], [2])
+        self.rm.complete_reservation(res1)
+        self.rm.cancel_reservation(res2)
+        self.assertEqual(self.rm.list_reservations("ready"), [])
+        self.assertEqual(self.rm.list_reservations("waiting"), [])
+        self.assertEqual(len(self.rm.list_reservations("completed")), 1)
+        self.assertEqual(len(self.rm.list_reservations("cancelled")), 1)
+        self.assertEqual(len(self.rm.list_reservations()), 2)
+
     def test_reserve_unavailable_book(self):
         self.book_manager.books[101]["available"] = True
         with self.assertRaises(ValueError):
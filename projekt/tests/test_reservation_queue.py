@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from src.reservation_queue import ReservationQueue
+
+
+class TestReservationQueue:
+    def test_append_and_positions(self):
+        queue = ReservationQueue([10, 20, 30])
+        assert len(queue) == 3
+        assert queue.first() == 10
+        assert [queue.position(i) for i in (10, 20, 30)] == [1, 2, 3]
+
+    def test_remove_from_middle(self):
+        queue = ReservationQueue([10, 20, 30])
+        assert queue.remove(20) is True
+        assert list(queue) == [10, 30]
+        assert queue.position(30) == 2
+        assert queue.position(20) == -1
+        assert 20 not in queue
+
+    def test_remove_head(self):
+        queue = ReservationQueue([10, 20])
+        queue.remove(10)
+        assert queue.first() == 20
+        assert queue.position(20) == 1
+
+    def test_remove_missing(self):
+        queue = ReservationQueue([10])
+        assert queue.remove(99) is False
+
+    def test_empty_queue(self):
+        queue = ReservationQueue()
+        assert not queue
+        assert queue.first() is None
+        queue.append(1)
+        queue.remove(1)
+        assert not queue
+        assert queue.first() is None
+
+    def test_duplicate_append(self):
+        queue = ReservationQueue([1])
+        with pytest.raises(ValueError):
+            queue.append(1)
+
+    def test_matches_list_model(self):
+        rng = random.Random(3)
+        queue = ReservationQueue()
+        model = []
+        next_id = 1
+        for _ in range(3000):
+            if model and rng.random() < 0.45:
+                victim = model[0] if rng.random() < 0.5 else rng.choice(model)
+                model.remove(victim)
+                queue.remove(victim)
+            else:
+                model.append(next_id)
+                queue.append(next_id)
+                next_id += 1
+            assert len(queue) == len(model)
+            assert queue.first() == (model[0] if model else None)
+            if model:
+                probe = rng.choice(model)
+                assert queue.position(probe) == model.index(probe) + 1
+        assert list(queue) == model
+
+    def test_removals_behind_live_head_are_reclaimed(self):
+        queue = ReservationQueue([0])
+        for reservation_id in range(1, 10001):
+            queue.append(reservation_id)
+            queue.remove(reservation_id)
+        assert len(queue) == 1
+        assert len(queue.slots) < 100
+        assert queue.first() == 0
+        assert queue.position(0) == 1
@@ -0,0 +1,140 @@
+import sys
+import threading
+
+import pytest
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.snapshots import VersionClock
+from src.sqlite_storage import SqliteBackend
+from src.user_manager import UserManager
+
+
+def open_library(clock, thread_safe=False):
+    books = BookManager(storage=clock.table(), thread_safe=thread_safe)
+    users = UserManager(storage=clock.table(), thread_safe=thread_safe)
+    loans = LoanManager(books, users, storage=clock.table(), thread_safe=thread_safe)
+    return books, users, loans
+
+
+class TestVersionedTable:
+    def setup_method(self):
+        self.clock = VersionClock()
+        self.books, self.users, self.loans = open_library(self.clock)
+        self.user_id = self.users.add_user("Jan Kowalski", "jan@example.com")
+        for i in range(3):
+            self.books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+
+    def test_snapshot_sees_state_from_when_it_was_opened(self):
+        with self.clock.snapshot() as snapshot:
+            self.loans.loan_book(self.user_id, 1)
+            self.books.remove_book(2)
+            self.books.add_book("Nowa", "Autor", "9788328704442")
+            self.books.update_book(3, new_title="Zmieniony")
+
+            view = snapshot.view(self.books.books)
+            assert sorted(view) == [1, 2, 3]
+            assert view[1]["available"] is True
+            assert view[3]["title"] == "Tytuł 2"
+            assert len(snapshot.view(self.loans.loans)) == 0
+            with pytest.raises(KeyError):
+                view[4]
+
+        assert self.books.get_book(1)["available"] is False
+        assert sorted(self.books.books) == [1, 3, 4]
+
+    def test_in_place_change_does_not_leak_into_snapshot(self):
+        categories = CategoryManager(self.books, storage=self.clock.table())
+        categories.add_category("Fantasy")
+        with self.clock.snapshot() as snapshot:
+            categories.assign_category(1, "Fantasy")
+            assert "categories" not in snapshot.view(self.books.books)[1]
+            categories.add_category("Horror")
+            assert list(snapshot.view(categories.categories)) == ["Fantasy"]
+        assert self.books.get_book(1)["categories"] == ["Fantasy"]
+
+    def test_snapshot_skips_transactions_in_progress(self):
+        with self.loans.loans.transaction():
+            self.books.set_available(1, False)
+            with self.clock.snapshot() as snapshot:
+                assert snapshot.view(self.books.books)[1]["available"] is True
+        with self.clock.snapshot() as snapshot:
+            assert snapshot.view(self.books.books)[1]["available"] is False
+
+    def test_history_released_with_last_snapshot(self):
+        first = self.clock.snapshot()
+        self.books.set_available(1, False)
+        second = self.clock.snapshot()
+        self.books.set_available(1, True)
+        self.books.set_available(1, False)
+        assert len(self.books.books.history[1]) == 2
+        first.close()
+        assert len(self.books.books.history[1]) == 1
+        assert snapshot_available(second, self.books, 1) is False
+        second.close()
+        assert self.books.books.history == {}
+
+    def test_view_of_foreign_table(self):
+        with self.clock.snapshot() as snapshot:
+            with pytest.raises(ValueError):
+                snapshot.view(VersionClock().table())
+
+
+def snapshot_available(snapshot, books, book_id):
+    return snapshot.view(books.books)[book_id]["available"]
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_reports_stay_consistent_during_checkouts(fast_switching):
+    # w każdej migawce liczba wypożyczonych książek równa się liczbie aktywnych wypożyczeń
+    clock = VersionClock()
+    books, users, loans = open_library(clock, thread_safe=True)
+    user_id = users.add_user("Jan Kowalski", "jan@example.com")
+    for i in range(20):
+        books.add_book(f"Tytuł {i}", "Autor", "9788328704442")
+
+    def checkouts(book_ids):
+        for _ in range(20):
+            for book_id in book_ids:
+                loans.return_book(loans.loan_book(user_id, book_id))
+
+    writers = [threading.Thread(target=checkouts, args=(range(first, 21, 2),)) for first in (1, 2)]
+    for writer in writers:
+        writer.start()
+    mismatches = 0
+    while any(writer.is_alive() for writer in writers):
+        with clock.snapshot() as snapshot:
+            loaned = sum(1 for book in snapshot.view(books.books).values() if not book["available"])
+            active = sum(1 for loan in snapshot.view(loans.loans).values() if not loan["returned"])
+            mismatches += loaned != active
+    for writer in writers:
+        writer.join()
+    assert mismatches == 0
+    assert len(loans.loans) == 400
+
+
+class TestSqliteSnapshot:
+    def test_snapshot_ignores_later_writes(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            books = BookManager(storage=backend.table("books"))
+            books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            with backend.snapshot() as snapshot:
+                books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+                books.set_available(1, False)
+                view = snapshot.view(books.books)
+                assert list(view) == [1]
+                assert view[1]["available"] is True
+            with backend.snapshot() as snapshot:
+                assert len(snapshot.view(books.books)) == 2
+
+    def test_memory_database_has_no_snapshots(self):
+        with SqliteBackend(":memory:") as backend:
+            with pytest.raises(ValueError):
+                backend.snapshot()
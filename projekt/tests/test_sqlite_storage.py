@@ -0,0 +1,193 @@
+import pytest
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.sqlite_storage import SqliteBackend
+from src.user_manager import UserManager
+
+
+def open_managers(backend):
+    books = BookManager(storage=backend.table("books"))
+    users = UserManager(storage=backend.table("users"))
+    loans = LoanManager(books, users, storage=backend.table("loans"))
+    reservations = ReservationManager(books, users, storage=backend.table("reservations"))
+    return books, users, loans, reservations
+
+
+class TestSqliteTable:
+    def test_mapping_operations(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            table = backend.table("books")
+            table[2] = {"title": "Lalka", "isbn": "978-83-7327-000-1"}
+            table[1] = {"title": "Hobbit", "isbn": "9788328704442"}
+            assert list(table) == [1, 2]
+            assert len(table) == 2
+            assert 1 in table and 3 not in table
+            assert table[2]["title"] == "Lalka"
+            assert table.max_key() == 2
+            del table[1]
+            assert dict(table.items()) == {2: {"title": "Lalka", "isbn": "978-83-7327-000-1"}}
+            with pytest.raises(KeyError):
+                table[1]
+            with pytest.raises(KeyError):
+                del table[1]
+
+    def test_wal_mode(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            assert backend.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_find_keys_uses_indexed_columns(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            books = BookManager(storage=backend.table("books"))
+            book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "978-83-287-0444-2")
+            assert backend.table("books").find_keys("isbn", "9788328704442") == [book_id]
+            with pytest.raises(ValueError):
+                backend.table("books").find_keys("title", "Hobbit")
+
+            loans = backend.table("loans")
+            plan = backend.connection.execute("EXPLAIN QUERY PLAN " + loans.sql_find["user_id"], (1,)).fetchall()
+            assert "loans_user_id" in str(plan)
+
+    def test_text_keys(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            books = BookManager(storage=backend.table("books"))
+            categories = CategoryManager(books, storage=backend.table("categories"))
+            categories.add_category("Fantasy")
+            assert dict(backend.table("categories")) == {"Fantasy": True}
+
+
+class TestSqliteBatch:
+    def test_batch_commits_once(self, tmp_path):
+        path = str(tmp_path / "library.db")
+        with SqliteBackend(path) as backend:
+            books = BookManager(storage=backend.table("books"))
+            with backend.batch():
+                for i in range(100):
+                    books.add_book(f"Tytuł {i}", "Autor", "1234567890")
+                assert backend.connection.in_transaction
+            assert not backend.connection.in_transaction
+        with SqliteBackend(path) as backend:
+            assert len(backend.table("books")) == 100
+
+    def test_batch_rolls_back_on_error(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            table = backend.table("books")
+            table[1] = {"title": "Lalka"}
+            with pytest.raises(RuntimeError):
+                with backend.batch():
+                    table[2] = {"title": "Hobbit"}
+                    with backend.batch():
+                        del table[1]
+                    raise RuntimeError("przerwano")
+            assert list(table) == [1]
+
+    def test_put_many(self, tmp_path):
+        with SqliteBackend(str(tmp_path / "library.db")) as backend:
+            table = backend.table("loans")
+            table.put_many((i, {"user_id": i % 3, "book_id": i}) for i in range(1, 10))
+            assert table.find_keys("user_id", 1) == [1, 4, 7]
+
+
+class TestManagersOnSqlite:
+    def test_state_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "library.db")
+        with SqliteBackend(path) as backend:
+            books, users, loans, reservations = open_managers(backend)
+            user_id = users.add_user("Jan Kowalski", "jan@example.com")
+            other_id = users.add_user("Anna Nowak", "anna@example.com")
+            book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            loan_id = loans.loan_book(user_id, book_id)
+            reservation_id = reservations.reserve_book(other_id, book_id)
+
+        with SqliteBackend(path) as backend:
+            books, users, loans, reservations = open_managers(backend)
+            assert books.get_book(book_id)["available"] is False
+            assert loans.get_book_active_loan(book_id)["user_id"] == user_id
+            assert reservations.get_position_in_queue(reservation_id) == 1
+            assert books.add_book("Lalka", "Bolesław Prus", "9788373271890") == book_id + 1
+
+            loans.return_book(loan_id)
+            reservations.book_returned(book_id)
+            assert backend.table("reservations").find_keys("status", "ready") == [reservation_id]
+            assert backend.table("loans").find_keys("book_id", book_id) == [loan_id]
+
+    def test_removed_ids_are_not_reused_after_reopen(self, tmp_path):
+        path = str(tmp_path / "library.db")
+        with SqliteBackend(path) as backend:
+            books, users, loans, _ = open_managers(backend)
+            user_id = users.add_user("Jan Kowalski", "jan@example.com")
+            books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            removed = books.add_book("Lalka", "Bolesław Prus", "9788373271890")
+            loans.return_book(loans.loan_book(user_id, removed))
+            books.remove_book(removed)
+
+        with SqliteBackend(path) as backend:
+            books, _, _, _ = open_managers(backend)
+            assert books.add_book("Chłopi", "Władysław Reymont", "9788373271906") == removed + 1
+
+    def test_lookups_use_sql_indexes_instead_of_memory(self, tmp_path):
+        path = str(tmp_path / "library.db")
+        with SqliteBackend(path) as backend:
+            books, users, loans, reservations = open_managers(backend)
+            jan = users.add_user("Jan Kowalski", "jan@example.com")
+            anna = users.add_user("Anna Nowak", "anna@example.com")
+            ewa = users.add_user("Ewa Lis", "ewa@example.com")
+            hobbit = books.add_book("Hobbit", "J.R.R. Tolkien", "978-83-287-0444-2")
+            loans.return_book(loans.loan_book(jan, hobbit))
+            loan_id = loans.loan_book(jan, hobbit)
+            first = reservations.reserve_book(anna, hobbit)
+            second = reservations.reserve_book(ewa, hobbit)
+
+        with SqliteBackend(path) as backend:
+            books = BookManager(storage=backend.table("books"), unique_isbn=True)
+            users = UserManager(storage=backend.table("users"))
+            loans = LoanManager(books, users, storage=backend.table("loans"))
+            reservations = ReservationManager(books, users, storage=backend.table("reservations"))
+            assert loans.active_by_book == {} and loans.user_history == {}
+            assert reservations.book_queues == {} and reservations.user_index == {}
+
+            assert books.get_book_by_isbn("9788328704442")["title"] == "Hobbit"
+            assert books.isbn_index == {}
+            assert users.get_user_by_email("ANNA@example.com")["name"] == "Anna Nowak"
+            assert users.email_index == {}
+            with pytest.raises(ValueError):
+                books.add_book("Hobbit", "J.R.R. Tolkien", "9788328704442")
+            assert loans.get_book_active_loan(hobbit) == loans.get_loan(loan_id)
+            assert [loan["returned"] for loan in loans.get_user_loan_history(jan)] == [True, False]
+            assert loans.get_user_active_loans(jan) == [loans.get_loan(loan_id)]
+            assert loans.count_active_loans() == 1
+            assert [item_id for item_id, _ in loans.list_loans_page(active=True)] == [loan_id]
+
+            assert reservations.get_position_in_queue(second) == 2
+            with pytest.raises(ValueError):
+                reservations.reserve_book(anna, hobbit)
+            loans.return_book(loan_id)
+            assert loans.get_book_active_loan(hobbit) is None
+            assert reservations.book_returned(hobbit) == first
+            assert reservations.list_reservations("ready") == [reservations.get_reservation(first)]
+            reservations.complete_reservation(first)
+            assert reservations.get_position_in_queue(second) == 1
+            assert reservations.get_user_reservations(anna)[0]["status"] == "completed"
+
+
+def test_missing_indexed_column_is_backfilled(tmp_path):
+    path = str(tmp_path / "library.db")
+    with SqliteBackend(path) as backend:
+        backend.connection.execute('CREATE TABLE "loans" (key INTEGER PRIMARY KEY, user_id, book_id, record TEXT NOT NULL)')
+        backend.connection.execute('INSERT INTO "loans" VALUES (1, 1, 1, \'{"user_id":1,"book_id":1,"returned":false}\')')
+    with SqliteBackend(path) as backend:
+        assert backend.table("loans").find_keys("returned", False) == [1]
+
+
+def test_backfilled_email_column_is_normalized(tmp_path):
+    path = str(tmp_path / "library.db")
+    with SqliteBackend(path) as backend:
+        backend.connection.execute('CREATE TABLE "users" (key INTEGER PRIMARY KEY, record TEXT NOT NULL)')
+        backend.connection.execute('INSERT INTO "users" VALUES (1, \'{"name":"Jan","email":" Jan@Example.com"}\')')
+    with SqliteBackend(path) as backend:
+        users = UserManager(storage=backend.table("users"), unique_email=True)
+        assert users.get_user_by_email("jan@example.com")["name"] == "Jan"
+        with pytest.raises(ValueError):
+            users.add_user("Jan", "JAN@example.com")
+        assert not users.indexed
@@ -0,0 +1,93 @@
+import random
+
+from src.text_index import TokenIndex, TrigramIndex, tokenize, trigrams
+
+
+class TestTokenize:
+    def test_tokenize_lowercases_and_splits(self):
+        assert tokenize("Władca Pierścieni: Drużyna") == ["władca", "pierścieni", "drużyna"]
+
+    def test_tokenize_empty(self):
+        assert tokenize("  ,. ") == []
+
+
+class TestTokenIndex:
+    def test_search_single_word(self):
+        index = TokenIndex()
+        index.add(1, "Pan Tadeusz")
+        index.add(2, "Pan Wołodyjowski")
+        assert index.search("pan") == {1, 2}
+
+    def test_search_multiple_words_intersects(self):
+        index = TokenIndex()
+        index.add(1, "Pan Tadeusz")
+        index.add(2, "Pan Wołodyjowski")
+        assert index.search("Tadeusz pan") == {1}
+        assert index.search("tadeusz wołodyjowski") == set()
+
+    def test_remove_drops_empty_postings(self):
+        index = TokenIndex()
+        index.add(1, "Lalka")
+        index.remove(1)
+        assert index.search("lalka") == set()
+        assert index.postings == {}
+
+    def test_update_replaces_words(self):
+        index = TokenIndex()
+        index.add(1, "Lalka")
+        index.update(1, "Chłopi")
+        assert index.search("lalka") == set()
+        assert index.search("chłopi") == {1}
+
+    def test_search_empty_query(self):
+        index = TokenIndex()
+        index.add(1, "Lalka")
+        assert index.search("") == set()
+
+
+class TestTrigramIndex:
+    def test_trigrams(self):
+        assert trigrams("kowal") == {"kow", "owa", "wal"}
+        assert trigrams("ab") == set()
+
+    def test_search_substring_case_insensitive(self):
+        index = TrigramIndex()
+        index.add(1, "Jan Kowalski")
+        index.add(2, "Anna Kowalczyk")
+        index.add(3, "Piotr Nowak")
+        assert index.search("KOWAL") == {1, 2}
+        assert index.search("nowak") == {3}
+
+    def test_search_requires_contiguous_match(self):
+        index = TrigramIndex()
+        index.add(1, "abcd bcde")
+        assert index.search("abcde") == set()
+
+    def test_search_short_query(self):
+        index = TrigramIndex()
+        index.add(1, "Ala")
+        index.add(2, "Ola")
+        assert index.search("la") == {1, 2}
+        assert index.search("") == {1, 2}
+
+    def test_update_and_remove(self):
+        index = TrigramIndex()
+        index.add(1, "Pierścień")
+        index.update(1, "Miecz")
+        assert index.search("pierś") == set()
+        assert index.search("miecz") == {1}
+        index.remove(1)
+        assert index.postings == {}
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        alphabet = "abcąćde "
+        texts = {i: "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                 for i in range(200)}
+        index = TrigramIndex()
+        for record_id, text in texts.items():
+            index.add(record_id, text)
+        for _ in range(200):
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 5)))
+            expected = {i for i, text in texts.items() if query.lower() in text.lower()}
+            assert index.search(query) == expected
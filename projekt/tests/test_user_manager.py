@@ -99,3 +99,84 @@ class TestListUsers:
         returned_names = [user["name"] for user in users]
         for name in names:
             assert name in returned_names
+
+
+
+class TestFindUsersByName:
+    def test_find_users_by_name_fragment(self):
+        manager = UserManager()
+        manager.add_user("Jan Kowalski", "jan@example.com")
+        manager.add_user("Anna Nowak", "anna@example.com")
+        manager.add_user("Ewa Kowalczyk", "ewa@example.com")
+        users = manager.find_users_by_name("kowal")
+        assert [user["name"] for user in users] == ["Jan Kowalski", "Ewa Kowalczyk"]
+
+    def test_find_users_by_name_after_update_and_remove(self):
+        manager = UserManager()
+        user_id = manager.add_user("Jan Kowalski", "jan@example.com")
+        other_id = manager.add_user("Anna Nowak", "anna@example.com")
+        manager.update_user(user_id, new_name="Jan Nowak")
+        assert manager.find_users_by_name("kowal") == []
+        manager.remove_user(other_id)
+        assert [user["name"] for user in manager.find_users_by_name("nowak")] == ["Jan Nowak"]
+
+
+class TestUserEmailIndex:
+    def test_get_user_by_email_is_case_insensitive(self):
+        manager = UserManager()
+        user_id = manager.add_user("Alice", "Alice@Example.com")
+        assert manager.get_user_by_email(" alice@example.COM") is manager.get_user(user_id)
+        with pytest.raises(ValueError):
+            manager.get_user_by_email("bob@example.com")
+
+    def test_index_follows_update_and_remove(self):
+        manager = UserManager()
+        user_id = manager.add_user("Alice", "alice@example.com")
+        manager.update_user(user_id, new_email="alice@uni.edu")
+        assert manager.get_user_by_email("alice@uni.edu")["name"] == "Alice"
+        with pytest.raises(ValueError):
+            manager.get_user_by_email("alice@example.com")
+        manager.remove_user(user_id)
+        with pytest.raises(ValueError):
+            manager.get_user_by_email("alice@uni.edu")
+
+    def test_unique_email(self):
+        manager = UserManager(unique_email=True)
+        alice = manager.add_user("Alice", "alice@example.com")
+        bob = manager.add_user("Bob", "bob@example.com")
+        with pytest.raises(ValueError):
+            manager.add_user("Alice 2", "ALICE@example.com")
+        with pytest.raises(ValueError):
+            manager.update_user(bob, new_email="alice@example.com")
+        assert manager.update_user(alice, new_email="Alice@example.com")
+
+    def test_duplicates_allowed_by_default(self):
+        manager = UserManager()
+        manager.add_user("Alice", "alice@example.com")
+        assert manager.add_user("Alice", "alice@example.com") == 2
+
+
+class TestBulkAddUsers:
+    def test_bulk_add_users(self):
+        manager = UserManager()
+        manager.add_user("Istniejący", "stary@example.com")
+        records = [
+            {"name": "Alice", "email": "alice@example.com"},
+            {"name": "Bob", "email": "niepoprawny"},
+            {"name": "Stary", "email": "STARY@example.com"},
+            {"name": "Alice 2", "email": "alice@example.com"},
+            {"name": "", "email": "pusty@example.com"},
+            {"name": "Carol", "email": " carol@example.com "},
+        ]
+        report = manager.bulk_add_users(records, batch_size=2)
+        assert report.imported == 2
+        assert [error["record"] for error in report.errors] == [2, 3, 4, 5]
+        assert manager.get_user_by_email("carol@example.com")["email"] == "carol@example.com"
+
+    def test_semester_enrollment(self):
+        manager = UserManager()
+        records = ({"name": f"Student {i}", "email": f"s{i}@uni.edu"} for i in range(20000))
+        report = manager.bulk_add_users(records)
+        assert report.imported == 20000
+        assert report.elapsed < 10
+        assert manager.get_user_by_email("S19999@uni.edu")["name"] == "Student 19999"
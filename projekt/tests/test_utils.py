@@ -1,5 +1,7 @@
 import pytest
-from src.utils import validate_email, validate_isbn, validate_user_id
+import os
+
+from src.utils import validate_email, validate_isbn, validate_user_id, normalize_isbn, save_data, load_data
 
 
 
@@ -28,6 +30,7 @@ class TestValidateISBN:
         [
             ("1234567890", True),
             ("1234567890123", True),
+            ("978-83-7327-189-0", True),
             ("12345", False),
             ("abc1234567", False),
             ("", False)
@@ -36,11 +39,41 @@ class TestValidateISBN:
     def test_validate_isbn(self, isbn, expected):
         assert validate_isbn(isbn) == expected
 
+    @pytest.mark.parametrize(
+        "isbn,expected",
+        [
+            ("978-83-7327-189-0", True),
+            ("9788328704442", True),
+            ("0-306-40615-2", True),
+            ("080442957X", True),
+            ("1234567890", False),
+            ("9788373271891", False),
+            ("97883732718X0", False),
+            ("X804429575", False),
+            ("12345", False),
+        ]
+    )
+    def test_validate_isbn_checksum(self, isbn, expected):
+        assert validate_isbn(isbn, checksum=True) == expected
+
     def test_validate_isbn_non_string(self):
         with pytest.raises(AttributeError):
             validate_isbn(1234567890)
 
 
+class TestNormalizeISBN:
+    @pytest.mark.parametrize(
+        "isbn,expected",
+        [
+            ("978-83-7327-189-0", "9788373271890"),
+            ("83 7327 189 x", "837327189X"),
+            ("1234567890", "1234567890"),
+        ]
+    )
+    def test_normalize_isbn(self, isbn, expected):
+        assert normalize_isbn(isbn) == expected
+
+
 class TestValidateUserID:
     @pytest.mark.parametrize(
         "user_id,expected",
@@ -56,4 +89,21 @@ class TestValidateUserID:
         assert validate_user_id(user_id) == expected
 
     def test_validate_user_id_none(self):
-        assert validate_user_id(None) is False
\ No newline at end of file
+        assert validate_user_id(None) is False
+
+
+class TestSaveLoadData:
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "data.json"
+        save_data({"1": {"title": "Lalka"}}, path)
+        assert load_data(path) == {"1": {"title": "Lalka"}}
+        assert not os.path.exists(f"{path}.tmp")
+
+    def test_load_missing_file(self, tmp_path):
+        assert load_data(tmp_path / "missing.json") == []
+
+    def test_load_corrupt_file_raises(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text('{"1": {"title": "La', encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_data(path)